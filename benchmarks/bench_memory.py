@@ -0,0 +1,42 @@
+"""
+Measures the memory used by Card and ReviewLog objects.
+
+Run from the repository root with:
+    python benchmarks/bench_memory.py [number of objects]
+"""
+
+import sys
+import tracemalloc
+from datetime import datetime
+
+from leitner_box import Card, Rating, ReviewLog
+
+
+def bytes_per_object(create, number: int) -> float:
+    tracemalloc.start()
+    objects = [create(i) for i in range(number)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # don't count the list holding the objects
+    return (size - sys.getsizeof(objects)) / number
+
+
+def main(number: int = 1_000_000) -> None:
+    due = datetime(2024, 1, 2, 0, 0, 0, 0)
+    review_datetime = datetime(2024, 1, 1, 9, 0, 0, 0)
+
+    card_size = bytes_per_object(lambda i: Card(card_id=i, box=1, due=due), number)
+    review_log_size = bytes_per_object(
+        lambda i: ReviewLog(
+            Card(card_id=i, box=1, due=due), Rating.Pass, review_datetime
+        ),
+        number,
+    )
+
+    print(f"Card: {card_size:.1f} bytes per object")
+    print(f"ReviewLog (including its Card): {review_log_size:.1f} bytes per object")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,41 @@
+"""
+Measures the throughput of reschedule_parallel at different numbers of workers.
+
+Run from the repository root with:
+    python benchmarks/bench_parallel.py [number of cards] [reviews per card]
+"""
+
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from leitner_box import Scheduler, reschedule_parallel
+
+
+def make_review_logs(num_cards: int, num_reviews: int) -> list[tuple]:
+    # raw review log tuples, grouped by card_id
+    rng = random.Random(0)
+    start = datetime(2024, 1, 1, 9, 0, 0, 0)
+    return [
+        (card_id, 1, None, rng.randint(0, 1), start + timedelta(days=day))
+        for card_id in range(num_cards)
+        for day in range(num_reviews)
+    ]
+
+
+def main(num_cards: int = 100_000, num_reviews: int = 10) -> None:
+    scheduler = Scheduler(start_datetime=datetime(2024, 1, 1, 0, 0, 0, 0))
+    review_logs = make_review_logs(num_cards, num_reviews)
+
+    for workers in [1, 2, 4, 8]:
+        start = time.perf_counter()
+        reschedule_parallel(scheduler, review_logs, workers=workers)
+        seconds = time.perf_counter() - start
+
+        throughput = len(review_logs) / seconds
+        print(f"{workers} workers: {throughput:,.0f} review logs per second")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,54 @@
+"""
+Measures the per-review latency of Scheduler.review_card, and of reviewing a batch of
+cards with Scheduler.review_cards compared to calling review_card for each card.
+
+Run from the repository root with:
+    python benchmarks/bench_review.py
+"""
+
+import timeit
+from datetime import datetime
+
+from leitner_box import Scheduler, Card, Rating
+
+
+def main(number: int = 100_000) -> None:
+    scheduler = Scheduler(start_datetime=datetime(2024, 1, 1, 14, 30, 0, 0))
+    card = Card(card_id=1, box=2, due=datetime(2024, 6, 1, 0, 0, 0, 0))
+    review_datetime = datetime(2024, 6, 1, 9, 0, 0, 0)
+
+    seconds = min(
+        timeit.repeat(
+            lambda: scheduler.review_card(card, Rating.Pass, review_datetime),
+            number=number,
+            repeat=5,
+        )
+    )
+
+    print(f"review_card: {seconds / number * 1e6:.2f} us per review")
+
+    num_cards = 20_000
+    cards = [
+        Card(card_id=card_id, box=1 + card_id % 3, due=card.due)
+        for card_id in range(num_cards)
+    ]
+    ratings = [Rating(card_id % 2) for card_id in range(num_cards)]
+    review_datetimes = [review_datetime] * num_cards
+
+    def review_each_card() -> None:
+        for card, rating, review_datetime in zip(cards, ratings, review_datetimes):
+            scheduler.review_card(card, rating, review_datetime)
+
+    for name, function in [
+        ("review_card per card", review_each_card),
+        (
+            "review_cards",
+            lambda: scheduler.review_cards(cards, ratings, review_datetimes),
+        ),
+    ]:
+        seconds = min(timeit.repeat(function, number=5, repeat=5))
+        print(f"{name}: {seconds / (5 * num_cards) * 1e6:.2f} us per review")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Measures how long simulate_grid takes to sweep scheduler configurations.
+
+Run from the repository root with:
+    python benchmarks/bench_simulate.py [number of cards] [days] [workers]
+"""
+
+import sys
+import time
+from datetime import datetime
+
+from leitner_box import Scheduler, simulate_grid
+
+
+def main(num_cards: int = 1_000_000, days: int = 365, workers: int = 1) -> None:
+    schedulers = [
+        Scheduler(
+            box_intervals=box_intervals,
+            start_datetime=datetime(2024, 1, 1, 0, 0, 0, 0),
+            on_fail=on_fail,
+        )
+        for box_intervals in ([1, 2, 7], [1, 3, 7, 14], [1, 2, 4, 8, 16, 32])
+        for on_fail in ("first_box", "prev_box")
+    ]
+
+    start = time.perf_counter()
+    results = simulate_grid(
+        schedulers,
+        num_cards,
+        days,
+        recall_probabilities=[0.75, 0.8, 0.85, 0.9, 0.95, 0.98],
+        new_cards_per_day=num_cards // 100,
+        seed=0,
+        workers=workers,
+    )
+    seconds = time.perf_counter() - start
+
+    for result in results:
+        print(result)
+    print(f"{len(schedulers)} configurations in {seconds:.2f} seconds")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,39 @@
+"""
+Measures the throughput of SQLiteStore.review_and_persist on a local database file.
+
+Run from the repository root with:
+    python benchmarks/bench_sqlite.py [number of reviews] [batch size]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from leitner_box import Card, Rating, Scheduler, SQLiteStore
+
+
+def main(num_reviews: int = 100_000, batch_size: int = 10_000) -> None:
+    scheduler = Scheduler(start_datetime=datetime(2024, 1, 1, 0, 0, 0, 0))
+    cards = [Card(card_id=i) for i in range(num_reviews)]
+    review_datetime = datetime(2024, 1, 1, 9, 0, 0, 0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "cards.db")
+        with SQLiteStore(path, batch_size=batch_size) as store:
+            store.upsert_cards(cards)
+
+            start = time.perf_counter()
+            for i, card in enumerate(cards):
+                store.review_and_persist(
+                    scheduler, card, Rating(i % 2), review_datetime, 3000
+                )
+            store.flush()
+            seconds = time.perf_counter() - start
+
+    print(f"review_and_persist: {num_reviews / seconds:,.0f} reviews per second")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,258 @@
+"""
+Runs the benchmark suite of the scheduler and serialization paths, and writes the
+results as JSON so they can be compared across releases.
+
+Run from the repository root with:
+    python benchmarks/suite.py [--output results.json] [--filter name] [--quick]
+
+Each benchmark is timed with timeit. The JSON holds the environment the suite ran
+in and, per benchmark, the seconds per operation of the fastest and the median of
+the repeats.
+"""
+
+import argparse
+import io
+import json
+import platform
+import statistics
+import sys
+import timeit
+from copy import deepcopy
+from datetime import datetime, timedelta, timezone
+from importlib import metadata
+from typing import Callable
+
+from leitner_box import (
+    Card,
+    Rating,
+    ReviewLog,
+    Scheduler,
+    compute_stats,
+    iter_review_logs,
+    write_review_logs,
+)
+
+# (name, operations per call, function to time)
+Benchmark = tuple[str, int, Callable[[], object]]
+
+# number of cards in the bulk benchmarks
+_BULK_SIZE = 10_000
+
+
+def review_card_benchmarks() -> list[Benchmark]:
+    # how old the scheduler is shouldn't change how long a review takes
+    review_datetime = datetime(2024, 6, 1, 9, 0, 0, 0)
+    card = Card(card_id=1, box=2, due=datetime(2024, 6, 1, 0, 0, 0, 0))
+
+    benchmarks = []
+    for age_days in [0, 365, 3650, 36500]:
+        scheduler = Scheduler(
+            start_datetime=datetime(2024, 6, 1) - timedelta(days=age_days)
+        )
+        benchmarks.append(
+            (
+                f"review_card[start_datetime_age={age_days}d]",
+                1,
+                lambda scheduler=scheduler: scheduler.review_card(
+                    card, Rating.Pass, review_datetime
+                ),
+            )
+        )
+
+    scheduler = Scheduler(start_datetime=datetime(2024, 1, 1))
+    cards = [Card(card_id=i, box=1 + i % 3) for i in range(_BULK_SIZE)]
+    ratings = [Rating(i % 2) for i in range(_BULK_SIZE)]
+    review_datetimes = [review_datetime] * _BULK_SIZE
+    benchmarks.append(
+        (
+            "review_card[bulk]",
+            _BULK_SIZE,
+            lambda: [
+                scheduler.review_card(card, rating, review_datetime)
+                for card, rating in zip(cards, ratings)
+            ],
+        )
+    )
+    benchmarks.append(
+        (
+            "review_cards[bulk]",
+            _BULK_SIZE,
+            lambda: scheduler.review_cards(cards, ratings, review_datetimes),
+        )
+    )
+
+    return benchmarks
+
+
+def serialization_benchmarks() -> list[Benchmark]:
+    card = Card(card_id=1, box=2, due=datetime(2024, 6, 1, 0, 0, 0, 0))
+    review_log = ReviewLog(
+        card,
+        Rating.Pass,
+        datetime(2024, 6, 1, 9, 0, 0, 0, timezone.utc),
+        review_duration=3000,
+    )
+    card_dict = card.to_dict()
+    review_log_dict = review_log.to_dict()
+
+    return [
+        ("Card.to_dict", 1, card.to_dict),
+        ("Card.from_dict", 1, lambda: Card.from_dict(card_dict)),
+        ("Card.to_dict+from_dict", 1, lambda: Card.from_dict(card.to_dict())),
+        ("ReviewLog.to_dict", 1, review_log.to_dict),
+        ("ReviewLog.from_dict", 1, lambda: ReviewLog.from_dict(review_log_dict)),
+        (
+            "ReviewLog.to_dict+from_dict",
+            1,
+            lambda: ReviewLog.from_dict(review_log.to_dict()),
+        ),
+        ("Card.to_bytes+from_bytes", 1, lambda: Card.from_bytes(card.to_bytes())),
+        (
+            "ReviewLog.to_bytes+from_bytes",
+            1,
+            lambda: ReviewLog.from_bytes(review_log.to_bytes()),
+        ),
+    ]
+
+
+def copy_benchmarks() -> list[Benchmark]:
+    card = Card(card_id=1, box=2, due=datetime(2024, 6, 1, 0, 0, 0, 0))
+    review_log = ReviewLog(card, Rating.Pass, datetime(2024, 6, 1, 9, 0, 0, 0))
+    scheduler = Scheduler(start_datetime=datetime(2024, 1, 1))
+    cards = [Card(card_id=i, box=2, due=card.due) for i in range(_BULK_SIZE)]
+
+    return [
+        ("deepcopy[Card]", 1, lambda: deepcopy(card)),
+        ("deepcopy[ReviewLog]", 1, lambda: deepcopy(review_log)),
+        ("deepcopy[Scheduler]", 1, lambda: deepcopy(scheduler)),
+        ("deepcopy[list[Card]]", _BULK_SIZE, lambda: deepcopy(cards)),
+    ]
+
+
+def bulk_load_benchmarks() -> list[Benchmark]:
+    due = datetime(2024, 6, 1, 0, 0, 0, 0)
+    cards = [Card(card_id=i, box=1 + i % 3, due=due) for i in range(_BULK_SIZE)]
+    card_dicts = [card.to_dict() for card in cards]
+    card_buffer = Card.pack_many(cards)
+
+    review_logs_file = io.StringIO()
+    write_review_logs(
+        review_logs_file,
+        (
+            ReviewLog(card, Rating.Pass, datetime(2024, 6, 1, 9, 0, 0, 0))
+            for card in cards
+        ),
+    )
+    review_logs_jsonl = review_logs_file.getvalue()
+
+    return [
+        ("Card.create_many", _BULK_SIZE, lambda: Card.create_many(_BULK_SIZE)),
+        (
+            "Card.from_dict[bulk]",
+            _BULK_SIZE,
+            lambda: [Card.from_dict(card_dict) for card_dict in card_dicts],
+        ),
+        ("Card.pack_many", _BULK_SIZE, lambda: Card.pack_many(cards)),
+        ("Card.unpack_many", _BULK_SIZE, lambda: Card.unpack_many(card_buffer)),
+        (
+            "iter_review_logs",
+            _BULK_SIZE,
+            lambda: list(iter_review_logs(io.StringIO(review_logs_jsonl))),
+        ),
+        (
+            "iter_review_logs[raw]",
+            _BULK_SIZE,
+            lambda: list(iter_review_logs(io.StringIO(review_logs_jsonl), raw=True)),
+        ),
+        (
+            "compute_stats[raw]",
+            _BULK_SIZE,
+            lambda: compute_stats(
+                iter_review_logs(io.StringIO(review_logs_jsonl), raw=True)
+            ),
+        ),
+    ]
+
+
+def all_benchmarks() -> list[Benchmark]:
+    return (
+        review_card_benchmarks()
+        + serialization_benchmarks()
+        + copy_benchmarks()
+        + bulk_load_benchmarks()
+    )
+
+
+def run(
+    benchmark: Benchmark, min_seconds: float, repeat: int
+) -> dict[str, float | int | str]:
+    name, operations, function = benchmark
+
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_seconds / 0.2))
+    times = [
+        seconds / (number * operations) for seconds in timer.repeat(repeat, number)
+    ]
+
+    return {
+        "name": name,
+        "operations": number * operations,
+        "repeat": repeat,
+        "min_seconds_per_op": min(times),
+        "median_seconds_per_op": statistics.median(times),
+    }
+
+
+def environment() -> dict[str, str]:
+    try:
+        version = metadata.version("leitner_box")
+    except metadata.PackageNotFoundError:
+        version = "unknown"
+
+    return {
+        "leitner_box": version,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--output", help="write the JSON results to this file")
+    parser.add_argument(
+        "--filter", help="only run benchmarks whose name contains this text"
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="run shorter, noisier benchmarks"
+    )
+    args = parser.parse_args()
+
+    min_seconds, repeat = (0.05, 3) if args.quick else (0.2, 5)
+
+    results = []
+    for benchmark in all_benchmarks():
+        if args.filter and args.filter not in benchmark[0]:
+            continue
+
+        result = run(benchmark, min_seconds, repeat)
+        results.append(result)
+        print(
+            f"{result['name']}: {result['min_seconds_per_op'] * 1e6:.3f} us per op",
+            file=sys.stderr,
+        )
+
+    report = {"environment": environment(), "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
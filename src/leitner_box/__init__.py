@@ -2,6 +2,75 @@
 leitner-box
 
 The classic Leitner System for Spaced Repetition, implemented as a python package.
+
+The package's classes and functions are imported lazily, the first time they are
+accessed, so that `import leitner_box` stays cheap and optional backends like
+SQLite, asyncio or multiprocessing are only imported by the code that uses them.
 """
 
-from .leitner_box import Scheduler, Card, Rating, ReviewLog
+from importlib import import_module
+
+# typing.TYPE_CHECKING, without importing typing
+TYPE_CHECKING = False
+
+# the module each public name is imported from, relative to this package
+_LAZY_ATTRIBUTES = {
+    "Scheduler": ".leitner_box",
+    "Card": ".leitner_box",
+    "Rating": ".leitner_box",
+    "ReviewLog": ".leitner_box",
+    "BoxCalendar": ".leitner_box",
+    "SnowflakeIdGenerator": ".card_ids",
+    "InstrumentationSink": ".instrumentation",
+    "InMemorySink": ".instrumentation",
+    "CardStore": ".card_store",
+    "DueIndex": ".due_index",
+    "ReviewSession": ".review_session",
+    "DeckFile": ".deck_file",
+    "SQLiteStore": ".sqlite_store",
+    "iter_review_logs": ".jsonl",
+    "write_review_logs": ".jsonl",
+    "ReviewLogArchive": ".archive",
+    "replay": ".replay",
+    "ReviewStats": ".stats",
+    "compute_stats": ".stats",
+    "reschedule_parallel": ".parallel",
+    "AsyncScheduler": ".async_scheduler",
+    "simulate": ".simulate",
+    "simulate_grid": ".simulate",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+if TYPE_CHECKING:
+    from .leitner_box import Scheduler, Card, Rating, ReviewLog, BoxCalendar
+    from .card_ids import SnowflakeIdGenerator
+    from .instrumentation import InstrumentationSink, InMemorySink
+    from .card_store import CardStore
+    from .due_index import DueIndex
+    from .review_session import ReviewSession
+    from .deck_file import DeckFile
+    from .sqlite_store import SQLiteStore
+    from .jsonl import iter_review_logs, write_review_logs
+    from .archive import ReviewLogArchive
+    from .replay import replay
+    from .stats import ReviewStats, compute_stats
+    from .parallel import reschedule_parallel
+    from .async_scheduler import AsyncScheduler
+    from .simulate import simulate, simulate_grid
+
+
+def __getattr__(name: str) -> object:
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(module_name, __name__), name)
+    # cached, so that __getattr__ is only called on the first access
+    globals()[name] = value
+
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
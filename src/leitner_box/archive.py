@@ -0,0 +1,424 @@
+"""
+leitner_box.archive
+
+This module defines the ReviewLogArchive class, an append-only file of compressed, columnar review log segments.
+
+An archive is a sequence of segments, each holding up to segment_size review logs.
+Within a segment, every field of the review logs is stored as its own column of
+fixed-width integers: card_id, the box, due date and due date's utc offset of the
+card before the review, rating, review datetime, utc offset and review duration.
+Card ids and review datetimes are delta-encoded, so that sorted or clustered values
+become runs of small numbers, and the columns are compressed together with zlib or
+lzma.
+
+Each segment starts with a header holding its range of review datetimes and card
+ids, so scans by time range or card_id range skip the segments outside the range
+without decompressing them.
+
+Classes:
+    ReviewLogArchive: An append-only file of compressed, columnar review log segments.
+"""
+
+import lzma
+import os
+import struct
+import sys
+import zlib
+from array import array
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from typing import Iterable, Iterator, Literal
+
+from .leitner_box import (
+    Card,
+    Rating,
+    ReviewLog,
+    _NO_REVIEW_DURATION,
+    _NO_UTC_OFFSET,
+    _ONE_SECOND,
+    _due_from_epoch_seconds,
+    _due_to_epoch_seconds,
+    _from_epoch_microseconds,
+    _to_epoch_microseconds,
+)
+from .jsonl import ReviewLogTuple
+
+_MAGIC = b"LBLOGS"
+_VERSION = 1
+# magic, version, codec, number of review logs, first and last review datetime in
+# epoch microseconds, smallest and largest card_id, compressed size of the columns
+_SEGMENT_HEADER_STRUCT = struct.Struct("<6sBBIqqqqI")
+
+_CODECS = ("zlib", "lzma")  # indexed by their uint8 code
+
+# the array typecodes of the columns, in the order of _Row
+_COLUMN_TYPECODES = "qBqiBqiq"
+
+# (card_id, box, due in epoch seconds, due's utc offset in seconds, rating, review
+# datetime in epoch microseconds, utc offset in seconds, review duration)
+_Row = tuple[int, int, int, int, int, int, int, int]
+
+
+class ReviewLogArchive:
+    """
+    An append-only file of compressed, columnar review log segments.
+
+    Review logs are buffered as they are appended, and written as a segment once segment_size of them have been
+    appended, or when the archive is flushed or closed. Use it as a context manager, or call close when done.
+
+    Due dates must be whole seconds. Like review datetimes, they are stored as epoch seconds of their wall clock
+    time, with their utc offset, so timezone-aware due dates and review datetimes are read back with a fixed utc
+    offset.
+
+    Attributes:
+        path (str | os.PathLike): The path of the archive file.
+        codec (str): The compression of new segments, either 'zlib' or 'lzma'.
+        segment_size (int): The maximum number of review logs in a segment.
+    """
+
+    __slots__ = ("path", "codec", "segment_size", "_pending")
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        codec: Literal["zlib", "lzma"] = "zlib",
+        segment_size: int = 65536,
+    ) -> None:
+        """
+        Opens the archive at path, which is created when the first segment is written.
+
+        Args:
+            path (str | os.PathLike): The path of the archive file.
+            codec (str): The compression of new segments, either 'zlib' or 'lzma'. Segments can be read whatever their codec.
+            segment_size (int): The maximum number of review logs in a segment.
+
+        Raises:
+            ValueError: If the codec is unknown or segment_size is less than 1.
+        """
+
+        if codec not in _CODECS:
+            raise ValueError(f"codec must be one of {_CODECS}, but got {codec!r}.")
+        if segment_size < 1:
+            raise ValueError(
+                f"segment_size must be at least 1, but got {segment_size}."
+            )
+
+        self.path = path
+        self.codec = codec
+        self.segment_size = segment_size
+        self._pending: list[_Row] = []
+
+    def __enter__(self) -> "ReviewLogArchive":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def append(self, review_logs: Iterable[ReviewLog]) -> int:
+        """
+        Appends review logs to the archive.
+
+        Args:
+            review_logs (Iterable[ReviewLog]): The review logs to append. They are consumed one at a time.
+
+        Returns:
+            int: The number of review logs appended.
+
+        Raises:
+            ValueError: If the due date of a review log's card isn't a whole number of seconds.
+        """
+
+        num_review_logs = 0
+        pending = self._pending
+        for review_log in review_logs:
+            pending.append(_row(review_log))
+            num_review_logs += 1
+            if len(pending) == self.segment_size:
+                self.flush()
+
+        return num_review_logs
+
+    def flush(self) -> None:
+        """
+        Writes the buffered review logs as a segment.
+        """
+
+        if not self._pending:
+            return
+
+        with open(self.path, "ab") as file:
+            file.write(_encode_segment(self._pending, self.codec))
+        self._pending.clear()
+
+    def close(self) -> None:
+        """
+        Writes the buffered review logs as a segment. An archive holds no open files, so this is the same as flush.
+        """
+
+        self.flush()
+
+    def scan(
+        self,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        min_card_id: int | None = None,
+        max_card_id: int | None = None,
+    ) -> Iterator[ReviewLog]:
+        """
+        Lazily reads the review logs in a range of review datetimes and card ids, in the order they were appended.
+
+        Review datetimes are compared by their wall clock time, ignoring their timezones. Buffered review logs
+        aren't read until they are flushed.
+
+        Args:
+            start (datetime | None): If specified, only review logs reviewed at or after start are read.
+            end (datetime | None): If specified, only review logs reviewed before end are read.
+            min_card_id (int | None): If specified, only review logs of cards with at least this card_id are read.
+            max_card_id (int | None): If specified, only review logs of cards with at most this card_id are read.
+
+        Returns:
+            Iterator[ReviewLog]: The review logs in the range.
+
+        Raises:
+            ValueError: If the file isn't a review log archive, or is truncated.
+        """
+
+        for row in self._scan_rows(start, end, min_card_id, max_card_id):
+            yield _review_log_from_row(row)
+
+    def scan_raw(
+        self,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        min_card_id: int | None = None,
+        max_card_id: int | None = None,
+    ) -> Iterator[ReviewLogTuple]:
+        """
+        Lazily reads the review logs in a range like scan, as ReviewLogTuples instead of ReviewLog objects.
+
+        Returns:
+            Iterator[ReviewLogTuple]: The review logs in the range, with their due dates and review datetimes as datetimes.
+        """
+
+        for row in self._scan_rows(start, end, min_card_id, max_card_id):
+            card_id, box, _, _, rating, _, _, review_duration = row
+            yield (
+                card_id,
+                box,
+                _due_from_row(row),
+                rating,
+                _review_datetime_from_row(row),
+                None if review_duration == _NO_REVIEW_DURATION else review_duration,
+            )
+
+    def _scan_rows(
+        self,
+        start: datetime | None,
+        end: datetime | None,
+        min_card_id: int | None,
+        max_card_id: int | None,
+    ) -> Iterator[_Row]:
+        start_microseconds = (
+            -(2**63) if start is None else _to_epoch_microseconds(start)
+        )
+        end_microseconds = 2**63 if end is None else _to_epoch_microseconds(end)
+        if min_card_id is None:
+            min_card_id = -(2**63)
+        if max_card_id is None:
+            max_card_id = 2**63
+
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, "rb") as file:
+            while header := file.read(_SEGMENT_HEADER_STRUCT.size):
+                if len(header) < _SEGMENT_HEADER_STRUCT.size:
+                    raise ValueError(f"{self.path} is truncated.")
+
+                (
+                    magic,
+                    version,
+                    codec,
+                    num_review_logs,
+                    first_microseconds,
+                    last_microseconds,
+                    segment_min_card_id,
+                    segment_max_card_id,
+                    payload_size,
+                ) = _SEGMENT_HEADER_STRUCT.unpack(header)
+                if magic != _MAGIC:
+                    raise ValueError(f"{self.path} is not a review log archive.")
+                if version != _VERSION:
+                    raise ValueError(
+                        f"Unsupported review log archive version {version}."
+                    )
+
+                if (
+                    last_microseconds < start_microseconds
+                    or first_microseconds >= end_microseconds
+                    or segment_max_card_id < min_card_id
+                    or segment_min_card_id > max_card_id
+                ):
+                    file.seek(payload_size, os.SEEK_CUR)
+                    continue
+
+                payload = file.read(payload_size)
+                if len(payload) < payload_size:
+                    raise ValueError(f"{self.path} is truncated.")
+
+                for row in _decode_segment(payload, codec, num_review_logs):
+                    if (
+                        start_microseconds <= row[5] < end_microseconds
+                        and min_card_id <= row[0] <= max_card_id
+                    ):
+                        yield row
+
+
+def _row(review_log: ReviewLog) -> _Row:
+    due = review_log.card.due
+    due_utc_offset = None if due is None else due.utcoffset()
+    utc_offset = review_log.review_datetime.utcoffset()
+
+    return (
+        review_log.card.card_id,
+        review_log.card.box,
+        _due_to_epoch_seconds(None if due is None else due.replace(tzinfo=None)),
+        _NO_UTC_OFFSET if due_utc_offset is None else due_utc_offset // _ONE_SECOND,
+        review_log.rating,
+        _to_epoch_microseconds(review_log.review_datetime),
+        _NO_UTC_OFFSET if utc_offset is None else utc_offset // _ONE_SECOND,
+        (
+            _NO_REVIEW_DURATION
+            if review_log.review_duration is None
+            else review_log.review_duration
+        ),
+    )
+
+
+def _due_from_row(row: _Row) -> datetime | None:
+    due = _due_from_epoch_seconds(row[2])
+    if due is not None and row[3] != _NO_UTC_OFFSET:
+        due = due.replace(tzinfo=timezone(timedelta(seconds=row[3])))
+
+    return due
+
+
+def _review_datetime_from_row(row: _Row) -> datetime:
+    review_datetime = _from_epoch_microseconds(row[5])
+    if row[6] != _NO_UTC_OFFSET:
+        review_datetime = review_datetime.replace(
+            tzinfo=timezone(timedelta(seconds=row[6]))
+        )
+
+    return review_datetime
+
+
+def _review_log_from_row(row: _Row) -> ReviewLog:
+    card_id, box, _, _, rating, _, _, review_duration = row
+
+    return ReviewLog(
+        card=Card(card_id=card_id, box=box, due=_due_from_row(row)),
+        rating=Rating(rating),
+        review_datetime=_review_datetime_from_row(row),
+        review_duration=(
+            None if review_duration == _NO_REVIEW_DURATION else review_duration
+        ),
+    )
+
+
+def _deltas(values: Iterable[int]) -> Iterator[int]:
+    previous = 0
+    for value in values:
+        yield value - previous
+        previous = value
+
+
+def _little_endian(column: array) -> bytes:
+    if sys.byteorder == "big":
+        column.byteswap()
+
+    return column.tobytes()
+
+
+def _encode_segment(rows: list[_Row], codec: str) -> bytes:
+    (
+        card_ids,
+        boxes,
+        dues,
+        due_utc_offsets,
+        ratings,
+        review_times,
+        utc_offsets,
+        durations,
+    ) = zip(*rows)
+
+    columns = b"".join(
+        [
+            _little_endian(array("q", _deltas(card_ids))),
+            _little_endian(array("B", boxes)),
+            _little_endian(array("q", dues)),
+            _little_endian(array("i", due_utc_offsets)),
+            _little_endian(array("B", ratings)),
+            _little_endian(array("q", _deltas(review_times))),
+            _little_endian(array("i", utc_offsets)),
+            _little_endian(array("q", durations)),
+        ]
+    )
+    if codec == "zlib":
+        payload = zlib.compress(columns, 6)
+    else:
+        payload = lzma.compress(columns)
+
+    header = _SEGMENT_HEADER_STRUCT.pack(
+        _MAGIC,
+        _VERSION,
+        _CODECS.index(codec),
+        len(rows),
+        min(review_times),
+        max(review_times),
+        min(card_ids),
+        max(card_ids),
+        len(payload),
+    )
+
+    return header + payload
+
+
+def _decode_segment(payload: bytes, codec: int, num_rows: int) -> Iterator[_Row]:
+    if _CODECS[codec] == "zlib":
+        columns = memoryview(zlib.decompress(payload))
+    else:
+        columns = memoryview(lzma.decompress(payload))
+
+    decoded = []
+    offset = 0
+    for typecode in _COLUMN_TYPECODES:
+        column = array(typecode)
+        size = column.itemsize * num_rows
+        column.frombytes(columns[offset : offset + size])
+        if sys.byteorder == "big":
+            column.byteswap()
+        decoded.append(column)
+        offset += size
+
+    (
+        card_id_deltas,
+        boxes,
+        dues,
+        due_utc_offsets,
+        ratings,
+        review_time_deltas,
+        utc_offsets,
+        durations,
+    ) = decoded
+
+    return zip(
+        accumulate(card_id_deltas),
+        boxes,
+        dues,
+        due_utc_offsets,
+        ratings,
+        accumulate(review_time_deltas),
+        utc_offsets,
+        durations,
+    )
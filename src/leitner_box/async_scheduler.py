@@ -0,0 +1,255 @@
+"""
+leitner_box.async_scheduler
+
+This module defines the AsyncScheduler class, an asyncio wrapper around Scheduler.
+
+Classes:
+    AsyncScheduler: Reviews cards for asyncio code by coalescing concurrent reviews into micro-batches.
+"""
+
+import asyncio
+from datetime import datetime
+from typing import Awaitable, Callable, NamedTuple
+
+from .leitner_box import Card, Rating, ReviewLog, Scheduler
+
+Persist = Callable[[list[Card], list[ReviewLog]], Awaitable[None]]
+"""An async callable that persists the reviewed cards and review logs of a micro-batch."""
+
+
+class _Review(NamedTuple):
+    card: Card
+    rating: Rating
+    review_datetime: datetime | None
+    review_duration: int | None
+    future: asyncio.Future
+
+
+class AsyncScheduler:
+    """
+    Reviews cards for asyncio code by coalescing concurrent reviews into micro-batches.
+
+    Reviews are queued and processed by a single background task, which drains up to max_batch_size queued
+    reviews at a time, reviews them with one Scheduler.review_cards call per round and persists the results with
+    one persist call per micro-batch. A review only completes once its micro-batch has been persisted.
+    A review that raises fails only its own caller, while a failed persist call fails every review it was
+    persisting.
+
+    Reviews of the same card are applied in the order they were requested, each to the result of the one before,
+    so concurrent reviews of a card never race. Once max_pending reviews are queued, review waits for room in the
+    queue, which applies backpressure to callers.
+
+    Attributes:
+        scheduler (Scheduler): The scheduler reviewing the cards.
+        persist (Persist | None): Called with the reviewed cards and review logs of each micro-batch, if specified.
+        max_batch_size (int): The maximum number of reviews processed together.
+        max_pending (int): The maximum number of queued reviews.
+    """
+
+    __slots__ = (
+        "scheduler",
+        "persist",
+        "max_batch_size",
+        "max_pending",
+        "_queue",
+        "_worker",
+        "_pending",
+        "_latest",
+    )
+
+    def __init__(
+        self,
+        scheduler: Scheduler,
+        persist: Persist | None = None,
+        max_batch_size: int = 256,
+        max_pending: int = 1024,
+    ) -> None:
+        if max_batch_size < 1 or max_pending < 1:
+            raise ValueError("max_batch_size and max_pending must be at least 1.")
+
+        self.scheduler = scheduler
+        self.persist = persist
+        self.max_batch_size = max_batch_size
+        self.max_pending = max_pending
+
+        self._queue: asyncio.Queue[_Review] = asyncio.Queue(maxsize=max_pending)
+        self._worker: asyncio.Task | None = None
+        self._pending: dict[int, int] = {}  # card_id -> number of unfinished reviews
+        # card_id -> result of its last review, kept while more reviews are pending
+        self._latest: dict[int, Card] = {}
+
+    async def __aenter__(self) -> "AsyncScheduler":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
+
+    async def review(
+        self,
+        card: Card,
+        rating: Rating,
+        review_datetime: datetime | None = None,
+        review_duration: int | None = None,
+    ) -> tuple[Card, ReviewLog]:
+        """
+        Reviews a card with a given rating at a specified time, like Scheduler.review_card.
+
+        Args:
+            card (Card): The card being reviewed.
+            rating (Rating): The chosen rating for the card being reviewed.
+            review_datetime (datetime | None): The date and time of the review. Defaults to when its micro-batch is processed.
+            review_duration (int | None): The amount of time in miliseconds it took to review the card, if specified.
+
+        Returns:
+            tuple: A tuple containing the updated, reviewed card and its corresponding review log.
+
+        Raises:
+            RuntimeError: If the given card is reviewed at a time where it is not yet due.
+        """
+
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[card.card_id] = self._pending.get(card.card_id, 0) + 1
+        try:
+            await self._queue.put(
+                _Review(card, rating, review_datetime, review_duration, future)
+            )
+        except BaseException:
+            self._finish(card.card_id)
+            raise
+
+        return await future
+
+    async def close(self) -> None:
+        """
+        Waits for every queued review to finish, then stops the background task.
+        """
+
+        if self._worker is None:
+            return
+
+        await self._queue.join()
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            try:
+                await self._process(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _process(self, batch: list[_Review]) -> None:
+        # reviews of the same card are split into consecutive rounds, so that each one
+        # is applied to the result of the one before
+        rounds: list[list[_Review]] = []
+        occurrences: dict[int, int] = {}
+        for review in batch:
+            occurrence = occurrences.get(review.card.card_id, 0)
+            occurrences[review.card.card_id] = occurrence + 1
+            if occurrence == len(rounds):
+                rounds.append([])
+            rounds[occurrence].append(review)
+
+        # restored if the micro-batch can't be persisted
+        latest_before = {card_id: self._latest.get(card_id) for card_id in occurrences}
+
+        try:
+            # reviews that fail are resolved right away, so only reviews that succeeded
+            # wait for the persist call
+            results: list[tuple[_Review, Card, ReviewLog]] = []
+            for reviews in rounds:
+                for review, new_card, review_log in self._review_round(reviews):
+                    if review.future.done():
+                        continue
+
+                    if review_log is None:
+                        # a card that wasn't due is returned unchanged by review_cards
+                        review.future.set_exception(
+                            RuntimeError(
+                                f"Card is not due for review until {new_card.due}."
+                            )
+                        )
+                    else:
+                        results.append((review, new_card, review_log))
+                        self._latest[new_card.card_id] = new_card
+
+            if self.persist is not None and results:
+                await self.persist(
+                    [new_card for _, new_card, _ in results],
+                    [review_log for _, _, review_log in results],
+                )
+
+        except Exception as e:
+            for card_id, card in latest_before.items():
+                if card is None:
+                    self._latest.pop(card_id, None)
+                else:
+                    self._latest[card_id] = card
+
+            for review in batch:
+                if not review.future.done():
+                    review.future.set_exception(e)
+
+        else:
+            for review, new_card, review_log in results:
+                if not review.future.done():
+                    review.future.set_result((new_card, review_log))
+
+        finally:
+            for review in batch:
+                self._finish(review.card.card_id)
+
+    def _review_round(
+        self, reviews: list[_Review]
+    ) -> list[tuple[_Review, Card, ReviewLog | None]]:
+        # reviews a round of reviews of distinct cards with one review_cards call. if a
+        # review raises, the round is retried one review at a time, so that the error
+        # only fails the review that caused it and not the others in the micro-batch
+        cards = [self._latest.get(r.card.card_id, r.card) for r in reviews]
+        try:
+            new_cards, review_logs, _ = self.scheduler.review_cards(
+                cards,
+                [review.rating for review in reviews],
+                [review.review_datetime for review in reviews],
+                [review.review_duration for review in reviews],
+            )
+            return list(zip(reviews, new_cards, review_logs))
+        except Exception as e:
+            if len(reviews) == 1:
+                reviews[0].future.set_exception(e)
+                return [(reviews[0], cards[0], None)]
+
+        results: list[tuple[_Review, Card, ReviewLog | None]] = []
+        for review, card in zip(reviews, cards):
+            try:
+                (new_card,), (review_log,), _ = self.scheduler.review_cards(
+                    [card],
+                    [review.rating],
+                    [review.review_datetime],
+                    [review.review_duration],
+                )
+            except Exception as e:
+                review.future.set_exception(e)
+                results.append((review, card, None))
+            else:
+                results.append((review, new_card, review_log))
+
+        return results
+
+    def _finish(self, card_id: int) -> None:
+        self._pending[card_id] -= 1
+        if self._pending[card_id] == 0:
+            del self._pending[card_id]
+            self._latest.pop(card_id, None)
@@ -0,0 +1,139 @@
+"""
+leitner_box.card_ids
+
+This module defines the generators that assign ids to new cards.
+
+Classes:
+    CardIdGenerator: The interface of a card id generator.
+    SnowflakeIdGenerator: Generates unique, increasing 64-bit card ids from the current time.
+"""
+
+import threading
+import time
+from typing import Protocol
+
+# the layout of a snowflake id, from the most to the least significant bits
+_TIMESTAMP_BITS = 41
+_NODE_ID_BITS = 10
+_SEQUENCE_BITS = 12
+
+_MAX_NODE_ID = (1 << _NODE_ID_BITS) - 1
+_SEQUENCE_MASK = (1 << _SEQUENCE_BITS) - 1
+
+# milliseconds are counted from 2024-01-01 00:00:00 UTC, so the 41 bit timestamp
+# lasts until 2093 and ids stay positive 64-bit signed integers
+SNOWFLAKE_EPOCH_MS = 1_704_067_200_000
+
+
+class CardIdGenerator(Protocol):
+    """
+    The interface of a card id generator. Set Card.id_generator to change how new cards get their ids.
+    """
+
+    def next_id(self) -> int:
+        """Returns a new card id."""
+        ...
+
+    def next_ids(self, n: int) -> list[int]:
+        """Returns n new card ids."""
+        ...
+
+
+class SnowflakeIdGenerator:
+    """
+    Generates unique, increasing 64-bit card ids from the current time.
+
+    An id is made of the milliseconds since SNOWFLAKE_EPOCH_MS in its top 41 bits, followed by a 10 bit node_id
+    and a 12 bit sequence number that counts the ids made in the same millisecond. Once the sequence numbers of a
+    millisecond run out, ids are taken from the following millisecond instead of waiting for it, and if the clock
+    goes backwards ids keep counting from the last one. Every id is therefore greater than the ones before it, and
+    generators are thread-safe.
+
+    Ids are only unique between generators with different node_ids, e.g. in processes that create cards
+    concurrently.
+
+    Attributes:
+        node_id (int): The id of this generator, from 0 to 1023.
+    """
+
+    __slots__ = ("node_id", "_node_bits", "_last", "_lock")
+
+    def __init__(self, node_id: int = 0) -> None:
+        if not 0 <= node_id <= _MAX_NODE_ID:
+            raise ValueError(
+                f"node_id must be between 0 and {_MAX_NODE_ID}, but got {node_id}."
+            )
+
+        self.node_id = node_id
+        self._node_bits = node_id << _SEQUENCE_BITS
+        # the timestamp and sequence number of the last id, as a single counter
+        self._last = -1
+        self._lock = threading.Lock()
+
+    def next_id(self) -> int:
+        """
+        Returns a new card id.
+
+        Returns:
+            int: An id greater than every id this generator made before.
+        """
+
+        with self._lock:
+            self._last = counter = max(self._last + 1, self._now() << _SEQUENCE_BITS)
+
+        return (
+            (counter >> _SEQUENCE_BITS) << (_NODE_ID_BITS + _SEQUENCE_BITS)
+            | self._node_bits
+            | counter & _SEQUENCE_MASK
+        )
+
+    def next_ids(self, n: int) -> list[int]:
+        """
+        Returns n new card ids, reserved as a single block.
+
+        Args:
+            n (int): The number of ids.
+
+        Returns:
+            list[int]: The ids in increasing order, each greater than every id this generator made before.
+        """
+
+        if n <= 0:
+            return []
+
+        with self._lock:
+            start = max(self._last + 1, self._now() << _SEQUENCE_BITS)
+            self._last = start + n - 1
+
+        node_bits = self._node_bits
+        shift = _NODE_ID_BITS + _SEQUENCE_BITS
+        ids: list[int] = []
+        # each millisecond of the block holds a consecutive run of ids
+        counter = start
+        end = start + n
+        while counter < end:
+            timestamp = counter >> _SEQUENCE_BITS
+            run_end = min(end, (timestamp + 1) << _SEQUENCE_BITS)
+            first_id = timestamp << shift | node_bits | counter & _SEQUENCE_MASK
+            ids.extend(range(first_id, first_id + run_end - counter))
+            counter = run_end
+
+        return ids
+
+    @staticmethod
+    def timestamp_ms(card_id: int) -> int:
+        """
+        Returns the unix epoch milliseconds that a snowflake id was made at.
+
+        Args:
+            card_id (int): A snowflake id.
+
+        Returns:
+            int: The unix epoch milliseconds encoded in the id.
+        """
+
+        return (card_id >> (_NODE_ID_BITS + _SEQUENCE_BITS)) + SNOWFLAKE_EPOCH_MS
+
+    @staticmethod
+    def _now() -> int:
+        return time.time_ns() // 1_000_000 - SNOWFLAKE_EPOCH_MS
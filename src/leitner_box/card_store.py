@@ -0,0 +1,321 @@
+"""
+leitner_box.card_store
+
+This module defines the CardStore class, a compact container of cards that is indexed by due date.
+
+Classes:
+    CardStore: A collection of cards stored in parallel arrays with a sorted index on their due dates.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, tzinfo
+from typing import Iterable, Iterator
+
+from .leitner_box import (
+    Card,
+    Rating,
+    ReviewLog,
+    Scheduler,
+    _NO_DUE,
+    _ONE_SECOND,
+    _UTC_EPOCH,
+    _aware_due_from_epoch_seconds,
+    _aware_due_to_epoch_seconds,
+    _due_from_epoch_seconds,
+    _due_to_epoch_seconds,
+    _to_epoch_seconds,
+)
+
+
+class CardStore:
+    """
+    A collection of cards stored in parallel arrays with a sorted index on their due dates.
+
+    Card ids and due dates are stored as int64s and boxes as uint8s, so the store holds no Card objects.
+    Due dates are stored as epoch seconds and must be whole seconds. Without a timezone, they must be
+    timezone-naive, like the due dates set by a Scheduler without a timezone. With a timezone, they must be
+    timezone-aware, like the due dates set by a Scheduler with a timezone, are stored by their utc time and
+    are read back in the store's timezone. Cards without a due date are always due and come before every other card in the due date index.
+
+    Finding the cards that are due takes O(log n + k) time for k cards. Building a store, or adding cards
+    with extend, sorts the due date index once for all the new cards.
+
+    Attributes:
+        timezone (tzinfo | None): The timezone of the stored due dates, or None if they are timezone-naive.
+    """
+
+    __slots__ = (
+        "timezone",
+        "_card_ids",
+        "_boxes",
+        "_dues",
+        "_positions",
+        "_due_index",
+    )
+
+    def __init__(
+        self, cards: Iterable[Card] = (), timezone: tzinfo | None = None
+    ) -> None:
+        """
+        Creates a store holding the given cards.
+
+        Args:
+            cards (Iterable[Card]): The cards to add. The store keeps a copy of their values.
+            timezone (tzinfo | None): The timezone of the stored due dates. Defaults to None, for timezone-naive
+                due dates.
+
+        Raises:
+            ValueError: If a card can't be stored.
+        """
+
+        self.timezone = timezone
+        self._card_ids = array("q")
+        self._boxes = array("B")
+        self._dues = array("q")
+        self._positions: dict[int, int] = {}  # card_id -> position in the arrays
+        # positions, sorted by due date then position
+        self._due_index = array("q")
+
+        self.extend(cards)
+
+    def __len__(self) -> int:
+        return len(self._card_ids)
+
+    def __contains__(self, card_id: object) -> bool:
+        return card_id in self._positions
+
+    def __iter__(self) -> Iterator[Card]:
+        for position in range(len(self._card_ids)):
+            yield self._card_at(position)
+
+    def add(self, card: Card) -> None:
+        """
+        Adds a card to the store.
+
+        Args:
+            card (Card): The card to add. The store keeps a copy of its values.
+
+        Raises:
+            ValueError: If a card with the same card_id is already in the store, or the card can't be stored.
+        """
+
+        if card.card_id in self._positions:
+            raise ValueError(f"Card {card.card_id} is already in the store.")
+
+        _check_box(card.box)
+        due = self._due_to_epoch_seconds(card.due)
+        position = len(self._card_ids)
+
+        self._card_ids.append(card.card_id)
+        self._boxes.append(card.box)
+        self._dues.append(due)
+        self._positions[card.card_id] = position
+        self._insert_into_index(position)
+
+    def extend(self, cards: Iterable[Card]) -> None:
+        """
+        Adds cards to the store, sorting the due date index once for all of them.
+
+        Args:
+            cards (Iterable[Card]): The cards to add. The store keeps a copy of their values.
+
+        Raises:
+            ValueError: If a card with the same card_id is already in the store, or a card can't be stored.
+                The cards before it are still added.
+        """
+
+        start = len(self._card_ids)
+        try:
+            for card in cards:
+                if card.card_id in self._positions:
+                    raise ValueError(f"Card {card.card_id} is already in the store.")
+
+                _check_box(card.box)
+                due = self._due_to_epoch_seconds(card.due)
+
+                self._positions[card.card_id] = len(self._card_ids)
+                self._card_ids.append(card.card_id)
+                self._boxes.append(card.box)
+                self._dues.append(due)
+        finally:
+            # the sort is stable, so cards with the same due date stay ordered by position.
+            # the existing index is already sorted, so it's merged in as one run
+            positions = list(self._due_index)
+            positions.extend(range(start, len(self._card_ids)))
+            positions.sort(key=self._dues.__getitem__)
+            self._due_index = array("q", positions)
+
+    def get(self, card_id: int) -> Card:
+        """
+        Returns the card with the given card_id.
+
+        Raises:
+            KeyError: If there is no card with the given card_id in the store.
+        """
+
+        return self._card_at(self._positions[card_id])
+
+    def update(self, card: Card) -> None:
+        """
+        Updates the box and due date of a card that is already in the store.
+
+        Raises:
+            KeyError: If there is no card with the given card_id in the store.
+        """
+
+        position = self._positions[card.card_id]
+        _check_box(card.box)
+        due = self._due_to_epoch_seconds(card.due)
+
+        self._boxes[position] = card.box
+        self._move(position, due)
+
+    def remove(self, card_id: int) -> None:
+        """
+        Removes the card with the given card_id from the store.
+
+        Raises:
+            KeyError: If there is no card with the given card_id in the store.
+        """
+
+        position = self._positions.pop(card_id)
+        self._remove_from_index(position)
+
+        # fill the gap with the last card so the arrays stay contiguous
+        last_position = len(self._card_ids) - 1
+        if position != last_position:
+            self._remove_from_index(last_position)
+
+            self._card_ids[position] = self._card_ids[last_position]
+            self._boxes[position] = self._boxes[last_position]
+            self._dues[position] = self._dues[last_position]
+            self._positions[self._card_ids[position]] = position
+            self._insert_into_index(position)
+
+        del self._card_ids[last_position]
+        del self._boxes[last_position]
+        del self._dues[last_position]
+
+    def due_cards(
+        self, now: datetime | None = None, limit: int | None = None
+    ) -> list[Card]:
+        """
+        Returns the cards that are due for review, ordered by due date.
+
+        Args:
+            now (datetime | None): The date and time to check against. Defaults to now. If the store has a
+                timezone, a timezone-naive now is the wall clock time in that timezone.
+            limit (int | None): The maximum number of cards to return, if specified.
+
+        Returns:
+            list[Card]: The cards that are due at the given time.
+        """
+
+        if now is None:
+            now = datetime.now(self.timezone)
+
+        if self.timezone is None:
+            now_seconds = _to_epoch_seconds(now)
+        else:
+            if now.tzinfo is None:
+                now = now.replace(tzinfo=self.timezone)
+            now_seconds = (now - _UTC_EPOCH) // _ONE_SECOND
+
+        # due dates are whole seconds, so rounding now down doesn't change what is due
+        end = bisect_right(self._due_index, now_seconds, key=self._dues.__getitem__)
+        if limit is not None:
+            end = min(end, limit)
+
+        return [self._card_at(position) for position in self._due_index[:end]]
+
+    def review_card(
+        self,
+        scheduler: Scheduler,
+        card_id: int,
+        rating: Rating,
+        review_datetime: datetime | None = None,
+        review_duration: int | None = None,
+    ) -> tuple[Card, ReviewLog]:
+        """
+        Reviews a card in the store with Scheduler.review_card and updates it in place.
+
+        Args:
+            scheduler (Scheduler): The scheduler reviewing the card.
+            card_id (int): The id of the card being reviewed.
+            rating (Rating): The chosen rating for the card being reviewed.
+            review_datetime (datetime | None): The date and time of the review.
+            review_duration (int | None): The amount of time in miliseconds it took to review the card, if specified.
+
+        Returns:
+            tuple: A tuple containing the updated, reviewed card and its corresponding review log.
+
+        Raises:
+            KeyError: If there is no card with the given card_id in the store.
+            RuntimeError: If the card is reviewed at a time where it is not yet due.
+            ValueError: If the scheduler has a timezone and the store doesn't, or the other way around, in which
+                case the card isn't reviewed.
+        """
+
+        if (scheduler.timezone is None) != (self.timezone is None):
+            raise ValueError(
+                f"The scheduler's timezone is {scheduler.timezone}, but the store's "
+                f"timezone is {self.timezone}. Create the store with the scheduler's timezone."
+            )
+
+        position = self._positions[card_id]
+        card, review_log = scheduler.review_card(
+            self._card_at(position), rating, review_datetime, review_duration
+        )
+
+        # encoded before the store is changed, so a card that can't be stored leaves it as it was
+        due = self._due_to_epoch_seconds(card.due)
+        self._boxes[position] = card.box
+        self._move(position, due)
+
+        return card, review_log
+
+    def _due_to_epoch_seconds(self, due: datetime | None) -> int:
+        if self.timezone is None or due is None:
+            return _due_to_epoch_seconds(due)
+
+        return _aware_due_to_epoch_seconds(due)
+
+    def _card_at(self, position: int) -> Card:
+        seconds = self._dues[position]
+        if self.timezone is None or seconds == _NO_DUE:
+            due = _due_from_epoch_seconds(seconds)
+        else:
+            due = _aware_due_from_epoch_seconds(seconds, self.timezone)
+
+        return Card(
+            card_id=self._card_ids[position], box=self._boxes[position], due=due
+        )
+
+    def _move(self, position: int, due: int) -> None:
+        old_due = self._dues[position]
+        if due == old_due:
+            return
+
+        self._remove_from_index(position)
+        self._dues[position] = due
+        self._insert_into_index(position)
+
+    def _index_key(self, position: int) -> tuple[int, int]:
+        return self._dues[position], position
+
+    def _insert_into_index(self, position: int) -> None:
+        insort(self._due_index, position, key=self._index_key)
+
+    def _remove_from_index(self, position: int) -> None:
+        index = bisect_left(
+            self._due_index, self._index_key(position), key=self._index_key
+        )
+        del self._due_index[index]
+
+
+def _check_box(box: int) -> None:
+    if not 0 <= box <= 255:
+        raise ValueError(
+            f"Box {box} must be between 0 and 255 to be stored as a uint8."
+        )
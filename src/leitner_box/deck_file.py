@@ -0,0 +1,249 @@
+"""
+leitner_box.deck_file
+
+This module defines the DeckFile class, a memory-mapped file of fixed-width card records.
+
+A deck file is a 16 byte header followed by one Card.to_bytes record per card.
+Opening a deck file only maps it into memory, so it takes the same time regardless
+of how many cards it holds. Cards are decoded one at a time as they are accessed,
+and reviewed cards are written back into their record in place.
+
+Classes:
+    DeckFile: A memory-mapped deck file of fixed-width card records.
+"""
+
+import mmap
+import os
+import struct
+from datetime import datetime
+from typing import Iterable, Iterator
+
+from .card_store import _check_box
+from .leitner_box import (
+    Card,
+    Rating,
+    ReviewLog,
+    Scheduler,
+    _CARD_STRUCT,
+    _due_from_record,
+    _due_to_record,
+)
+
+_MAGIC = b"LBDECK"
+_VERSION = 1
+_HEADER_STRUCT = struct.Struct("<6sHQ")  # magic, version, number of cards
+_BOX_AND_DUE_STRUCT = struct.Struct("<Bqi")  # the rest of a card record after card_id
+_CARD_ID_SIZE = 8
+
+# number of cards written to the file at a time by DeckFile.create
+_WRITE_CHUNK_SIZE = 65536
+
+
+class DeckFile:
+    """
+    A memory-mapped deck file of fixed-width card records.
+
+    Cards are addressed by their position in the file. Use it as a context manager, or call close when done.
+
+    Due dates are stored like Card.to_bytes stores them, so timezone-aware due dates, like the ones set by a
+    Scheduler with a timezone, are read back with a fixed utc offset.
+
+    Attributes:
+        path (str | os.PathLike): The path of the deck file.
+        writable (bool): Whether cards in the file can be updated.
+    """
+
+    __slots__ = ("path", "writable", "_file", "_mmap", "_num_cards")
+
+    def __init__(self, path: str | os.PathLike, writable: bool = False) -> None:
+        """
+        Opens an existing deck file.
+
+        Args:
+            path (str | os.PathLike): The path of the deck file.
+            writable (bool): Whether cards in the file can be updated. Defaults to read-only.
+
+        Raises:
+            ValueError: If the file isn't a deck file.
+        """
+
+        self.path = path
+        self.writable = writable
+
+        self._file = open(path, "r+b" if writable else "rb")
+        try:
+            self._mmap = mmap.mmap(
+                self._file.fileno(),
+                0,
+                access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ,
+            )
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path} is not a deck file.")
+
+        try:
+            self._num_cards = _read_header(self._mmap, path)
+        except ValueError:
+            self.close()
+            raise
+
+    @staticmethod
+    def create(path: str | os.PathLike, cards: Iterable[Card]) -> None:
+        """
+        Writes cards to a new deck file, replacing any existing file at the path.
+
+        Args:
+            path (str | os.PathLike): The path of the deck file.
+            cards (Iterable[Card]): The cards to write, in order. They are written in chunks, so they can be
+                streamed from a generator.
+
+        Raises:
+            ValueError: If a card's box isn't between 0 and 255, or its due date can't be encoded by Card.to_bytes.
+        """
+
+        num_cards = 0
+        with open(path, "wb") as file:
+            file.write(_HEADER_STRUCT.pack(_MAGIC, _VERSION, 0))
+
+            chunk: list[Card] = []
+            for card in cards:
+                _check_box(card.box)
+                chunk.append(card)
+                if len(chunk) == _WRITE_CHUNK_SIZE:
+                    file.write(Card.pack_many(chunk))
+                    num_cards += len(chunk)
+                    chunk.clear()
+
+            file.write(Card.pack_many(chunk))
+            num_cards += len(chunk)
+
+            file.seek(0)
+            file.write(_HEADER_STRUCT.pack(_MAGIC, _VERSION, num_cards))
+
+    def __enter__(self) -> "DeckFile":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._num_cards
+
+    def __getitem__(self, index: int) -> Card:
+        card_id, box, due, utc_offset = _CARD_STRUCT.unpack_from(
+            self._mmap, self._offset(index)
+        )
+
+        return Card(card_id=card_id, box=box, due=_due_from_record(due, utc_offset))
+
+    def __iter__(self) -> Iterator[Card]:
+        for index in range(self._num_cards):
+            yield self[index]
+
+    def update(self, index: int, card: Card) -> None:
+        """
+        Writes the box and due date of a card into its record in place.
+
+        Args:
+            index (int): The position of the card in the file.
+            card (Card): The new state of the card.
+
+        Raises:
+            ValueError: If the card_id of the card doesn't match the one stored at index, its box isn't between 0
+                and 255, or the deck file isn't writable.
+        """
+
+        if not self.writable:
+            raise ValueError(f"{self.path} was not opened as writable.")
+        _check_box(card.box)
+
+        offset = self._offset(index)
+        (card_id,) = struct.unpack_from("<q", self._mmap, offset)
+        if card_id != card.card_id:
+            raise ValueError(
+                f"Card {card.card_id} doesn't match card {card_id} stored at index {index}."
+            )
+
+        _BOX_AND_DUE_STRUCT.pack_into(
+            self._mmap,
+            offset + _CARD_ID_SIZE,
+            card.box,
+            *_due_to_record(card.due),
+        )
+
+    def review_card(
+        self,
+        scheduler: Scheduler,
+        index: int,
+        rating: Rating,
+        review_datetime: datetime | None = None,
+        review_duration: int | None = None,
+    ) -> tuple[Card, ReviewLog]:
+        """
+        Reviews the card at index with Scheduler.review_card and updates its record in place.
+
+        Args:
+            scheduler (Scheduler): The scheduler reviewing the card.
+            index (int): The position of the card in the file.
+            rating (Rating): The chosen rating for the card being reviewed.
+            review_datetime (datetime | None): The date and time of the review.
+            review_duration (int | None): The amount of time in miliseconds it took to review the card, if specified.
+
+        Returns:
+            tuple: A tuple containing the updated, reviewed card and its corresponding review log.
+
+        Raises:
+            RuntimeError: If the card is reviewed at a time where it is not yet due.
+            ValueError: If the deck file isn't writable.
+        """
+
+        if not self.writable:
+            raise ValueError(f"{self.path} was not opened as writable.")
+
+        card, review_log = scheduler.review_card(
+            self[index], rating, review_datetime, review_duration
+        )
+        self.update(index, card)
+
+        return card, review_log
+
+    def flush(self) -> None:
+        """
+        Flushes updated records to disk.
+        """
+
+        if self.writable:
+            self._mmap.flush()
+
+    def close(self) -> None:
+        """
+        Flushes updated records to disk and closes the file.
+        """
+
+        if not self._mmap.closed:
+            self.flush()
+            self._mmap.close()
+        self._file.close()
+
+    def _offset(self, index: int) -> int:
+        if index < 0:
+            index += self._num_cards
+        if not 0 <= index < self._num_cards:
+            raise IndexError(f"Deck file index {index} out of range.")
+
+        return _HEADER_STRUCT.size + index * _CARD_STRUCT.size
+
+
+def _read_header(buffer: mmap.mmap, path: str | os.PathLike) -> int:
+    if len(buffer) < _HEADER_STRUCT.size:
+        raise ValueError(f"{path} is not a deck file.")
+
+    magic, version, num_cards = _HEADER_STRUCT.unpack_from(buffer)
+    if magic != _MAGIC:
+        raise ValueError(f"{path} is not a deck file.")
+    if version != _VERSION:
+        raise ValueError(f"Unsupported deck file version {version}.")
+    if len(buffer) != _HEADER_STRUCT.size + num_cards * _CARD_STRUCT.size:
+        raise ValueError(f"{path} is truncated or corrupted.")
+
+    return num_cards
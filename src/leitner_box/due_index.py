@@ -0,0 +1,405 @@
+"""
+leitner_box.due_index
+
+This module defines the DueIndex class, which buckets the cards of many tenants by the day they are due.
+
+Every due date set by Scheduler.review_card is the beginning of a day, so a deck's
+cards fall into a small number of day buckets. A DueIndex keeps, for each tenant
+(e.g. a user and their scheduler), a bucket of card positions per due day and the
+sorted list of days that have a bucket. Counting or listing the cards due on or
+before a day only visits the buckets of those days, and moving a card to another
+bucket after a review takes O(1) time.
+
+Classes:
+    DueIndex: An index of the cards of many tenants, bucketed by the day they are due.
+"""
+
+from array import array
+from bisect import bisect_right, insort
+from datetime import date, datetime
+from typing import Hashable, Iterator
+
+from .card_store import _check_box
+from .leitner_box import (
+    Card,
+    Rating,
+    ReviewLog,
+    Scheduler,
+    _NO_DUE,
+    _from_epoch_day,
+    _local_midnight,
+    _to_epoch_day,
+)
+
+
+class _Tenant:
+    # the cards of one tenant, stored in parallel arrays, and their day buckets
+
+    __slots__ = (
+        "scheduler",
+        "card_ids",
+        "boxes",
+        "days",
+        "slots",
+        "positions",
+        "buckets",
+        "bucket_days",
+    )
+
+    def __init__(self, scheduler: Scheduler) -> None:
+        self.scheduler = scheduler
+        self.card_ids = array("q")
+        self.boxes = array("B")
+        self.days = array("q")  # the day each card is due, or _NO_DUE
+        self.slots = array("q")  # the index of each card in its bucket
+        self.positions: dict[int, int] = {}  # card_id -> position in the arrays
+        self.buckets: dict[int, array] = {}  # day -> positions of the cards due then
+        self.bucket_days: list[int] = []  # the sorted days that have a bucket
+
+    def due_day(self, due: datetime | None) -> int:
+        # the day a card is due, which must be the beginning of a day
+        if due is None:
+            return _NO_DUE
+
+        day = _to_epoch_day(self.scheduler._local_datetime(due))
+        if self.due_from_day(day) != due:
+            raise ValueError(
+                f"The due date {due} isn't the beginning of a day in the scheduler's "
+                "timezone."
+            )
+
+        return day
+
+    def due_from_day(self, day: int) -> datetime | None:
+        if day == _NO_DUE:
+            return None
+        if self.scheduler.timezone is None:
+            return _from_epoch_day(day)
+
+        return _local_midnight(self.scheduler.timezone, day)
+
+    def card_at(self, position: int) -> Card:
+        return Card(
+            card_id=self.card_ids[position],
+            box=self.boxes[position],
+            due=self.due_from_day(self.days[position]),
+        )
+
+    def link(self, position: int, day: int) -> None:
+        # puts the card at position in the bucket of the given day
+        bucket = self.buckets.get(day)
+        if bucket is None:
+            bucket = self.buckets[day] = array("q")
+            # the only step that isn't O(1), taken once per new due day
+            insort(self.bucket_days, day)
+
+        self.days[position] = day
+        self.slots[position] = len(bucket)
+        bucket.append(position)
+
+    def unlink(self, position: int) -> None:
+        # takes the card at position out of its bucket, moving the bucket's last card
+        # into its slot
+        day = self.days[position]
+        bucket = self.buckets[day]
+        last_position = bucket.pop()
+        if last_position != position:
+            slot = self.slots[position]
+            bucket[slot] = last_position
+            self.slots[last_position] = slot
+
+        if not bucket:
+            del self.buckets[day]
+            del self.bucket_days[bisect_right(self.bucket_days, day) - 1]
+
+    def due_buckets(self, day: int) -> Iterator[array]:
+        # the buckets of the cards due on or before the given day, in order of their day
+        buckets = self.buckets
+        for bucket_day in self.bucket_days[: bisect_right(self.bucket_days, day)]:
+            yield buckets[bucket_day]
+
+
+class DueIndex:
+    """
+    An index of the cards of many tenants, bucketed by the day they are due.
+
+    Each tenant has its own scheduler and its own cards, and card ids only need to be unique within a tenant.
+    Cards are stored in parallel arrays per tenant, so the index holds no Card objects. Cards without a due
+    date are always due and come before every other card.
+
+    Due dates must be the beginning of a day in the tenant's scheduler's timezone, like every due date set by
+    Scheduler.review_card: midnight for schedulers without a timezone, and local midnight for schedulers with one.
+
+    Counting or listing the cards due on or before a day takes time proportional to the number of those cards.
+    Adding, updating, reviewing or removing a card takes O(1) time, except that the first card due on a new day
+    inserts that day in the tenant's sorted list of days.
+    """
+
+    __slots__ = ("_tenants",)
+
+    def __init__(self) -> None:
+        self._tenants: dict[Hashable, _Tenant] = {}
+
+    def __len__(self) -> int:
+        return sum(len(tenant.card_ids) for tenant in self._tenants.values())
+
+    def __contains__(self, tenant: object) -> bool:
+        return tenant in self._tenants
+
+    def add_tenant(self, tenant: Hashable, scheduler: Scheduler) -> None:
+        """
+        Adds a tenant, without any cards.
+
+        Args:
+            tenant (Hashable): The key of the tenant, e.g. a user id.
+            scheduler (Scheduler): The scheduler reviewing the tenant's cards.
+
+        Raises:
+            ValueError: If the tenant is already in the index.
+        """
+
+        if tenant in self._tenants:
+            raise ValueError(f"Tenant {tenant!r} is already in the index.")
+
+        self._tenants[tenant] = _Tenant(scheduler)
+
+    def remove_tenant(self, tenant: Hashable) -> None:
+        """
+        Removes a tenant and all of its cards.
+
+        Raises:
+            KeyError: If the tenant isn't in the index.
+        """
+
+        del self._tenants[tenant]
+
+    def num_cards(self, tenant: Hashable) -> int:
+        """
+        Returns the number of cards of a tenant.
+
+        Raises:
+            KeyError: If the tenant isn't in the index.
+        """
+
+        return len(self._tenants[tenant].card_ids)
+
+    def add(self, tenant: Hashable, card: Card) -> None:
+        """
+        Adds a card to a tenant.
+
+        Args:
+            tenant (Hashable): The key of the tenant.
+            card (Card): The card to add. The index keeps a copy of its values.
+
+        Raises:
+            KeyError: If the tenant isn't in the index.
+            ValueError: If the tenant already has a card with the same card_id, or the card can't be stored.
+        """
+
+        tenant_ = self._tenants[tenant]
+        if card.card_id in tenant_.positions:
+            raise ValueError(
+                f"Card {card.card_id} is already in the index for tenant {tenant!r}."
+            )
+
+        _check_box(card.box)
+        day = tenant_.due_day(card.due)
+        position = len(tenant_.card_ids)
+
+        tenant_.card_ids.append(card.card_id)
+        tenant_.boxes.append(card.box)
+        tenant_.days.append(day)
+        tenant_.slots.append(0)
+        tenant_.positions[card.card_id] = position
+        tenant_.link(position, day)
+
+    def get(self, tenant: Hashable, card_id: int) -> Card:
+        """
+        Returns the card of a tenant with the given card_id.
+
+        Raises:
+            KeyError: If the tenant isn't in the index, or has no card with the given card_id.
+        """
+
+        tenant_ = self._tenants[tenant]
+
+        return tenant_.card_at(tenant_.positions[card_id])
+
+    def update(self, tenant: Hashable, card: Card) -> None:
+        """
+        Updates the box and due date of a card that the tenant already has.
+
+        Raises:
+            KeyError: If the tenant isn't in the index, or has no card with the card's card_id.
+            ValueError: If the card can't be stored.
+        """
+
+        tenant_ = self._tenants[tenant]
+        position = tenant_.positions[card.card_id]
+        _check_box(card.box)
+        day = tenant_.due_day(card.due)
+
+        tenant_.boxes[position] = card.box
+        if day != tenant_.days[position]:
+            tenant_.unlink(position)
+            tenant_.link(position, day)
+
+    def remove(self, tenant: Hashable, card_id: int) -> None:
+        """
+        Removes the card of a tenant with the given card_id.
+
+        Raises:
+            KeyError: If the tenant isn't in the index, or has no card with the given card_id.
+        """
+
+        tenant_ = self._tenants[tenant]
+        position = tenant_.positions.pop(card_id)
+        tenant_.unlink(position)
+
+        # fill the gap with the last card so the arrays stay contiguous
+        last_position = len(tenant_.card_ids) - 1
+        if position != last_position:
+            slot = tenant_.slots[last_position]
+            tenant_.buckets[tenant_.days[last_position]][slot] = position
+
+            tenant_.card_ids[position] = tenant_.card_ids[last_position]
+            tenant_.boxes[position] = tenant_.boxes[last_position]
+            tenant_.days[position] = tenant_.days[last_position]
+            tenant_.slots[position] = slot
+            tenant_.positions[tenant_.card_ids[position]] = position
+
+        del tenant_.card_ids[last_position]
+        del tenant_.boxes[last_position]
+        del tenant_.days[last_position]
+        del tenant_.slots[last_position]
+
+    def count_due(self, tenant: Hashable, day: date | None = None) -> int:
+        """
+        Returns the number of cards of a tenant that are due on or before a day.
+
+        Args:
+            tenant (Hashable): The key of the tenant.
+            day (date | None): The day to check against, as a date or datetime. Datetimes are converted to the
+                tenant's scheduler's timezone. Defaults to today in the tenant's scheduler's timezone.
+
+        Returns:
+            int: The number of cards due on or before the day.
+
+        Raises:
+            KeyError: If the tenant isn't in the index.
+        """
+
+        tenant_ = self._tenants[tenant]
+
+        return sum(map(len, tenant_.due_buckets(_day_number(tenant_, day))))
+
+    def due_card_ids(
+        self, tenant: Hashable, day: date | None = None, limit: int | None = None
+    ) -> list[int]:
+        """
+        Returns the ids of the cards of a tenant that are due on or before a day, ordered by due date.
+
+        Args:
+            tenant (Hashable): The key of the tenant.
+            day (date | None): The day to check against, as a date or datetime. Datetimes are converted to the
+                tenant's scheduler's timezone. Defaults to today in the tenant's scheduler's timezone.
+            limit (int | None): The maximum number of card ids to return, if specified.
+
+        Returns:
+            list[int]: The ids of the cards due on or before the day.
+
+        Raises:
+            KeyError: If the tenant isn't in the index.
+        """
+
+        tenant_ = self._tenants[tenant]
+        card_ids = tenant_.card_ids
+
+        due_card_ids: list[int] = []
+        for bucket in tenant_.due_buckets(_day_number(tenant_, day)):
+            if limit is not None and len(due_card_ids) + len(bucket) >= limit:
+                due_card_ids.extend(
+                    card_ids[position]
+                    for position in bucket[: limit - len(due_card_ids)]
+                )
+                break
+            due_card_ids.extend(card_ids[position] for position in bucket)
+
+        return due_card_ids
+
+    def due_cards(
+        self, tenant: Hashable, day: date | None = None, limit: int | None = None
+    ) -> list[Card]:
+        """
+        Returns the cards of a tenant that are due on or before a day, ordered by due date.
+
+        Args:
+            tenant (Hashable): The key of the tenant.
+            day (date | None): The day to check against, as a date or datetime. Datetimes are converted to the
+                tenant's scheduler's timezone. Defaults to today in the tenant's scheduler's timezone.
+            limit (int | None): The maximum number of cards to return, if specified.
+
+        Returns:
+            list[Card]: The cards due on or before the day.
+
+        Raises:
+            KeyError: If the tenant isn't in the index.
+        """
+
+        tenant_ = self._tenants[tenant]
+        positions = tenant_.positions
+
+        return [
+            tenant_.card_at(positions[card_id])
+            for card_id in self.due_card_ids(tenant, day, limit)
+        ]
+
+    def review_card(
+        self,
+        tenant: Hashable,
+        card_id: int,
+        rating: Rating,
+        review_datetime: datetime | None = None,
+        review_duration: int | None = None,
+    ) -> tuple[Card, ReviewLog]:
+        """
+        Reviews a card of a tenant with the tenant's Scheduler.review_card, and moves it to its new due day.
+
+        Args:
+            tenant (Hashable): The key of the tenant.
+            card_id (int): The id of the card being reviewed.
+            rating (Rating): The chosen rating for the card being reviewed.
+            review_datetime (datetime | None): The date and time of the review.
+            review_duration (int | None): The amount of time in miliseconds it took to review the card, if specified.
+
+        Returns:
+            tuple: A tuple containing the updated, reviewed card and its corresponding review log.
+
+        Raises:
+            KeyError: If the tenant isn't in the index, or has no card with the given card_id.
+            RuntimeError: If the card is reviewed at a time where it is not yet due.
+        """
+
+        tenant_ = self._tenants[tenant]
+        position = tenant_.positions[card_id]
+        card, review_log = tenant_.scheduler.review_card(
+            tenant_.card_at(position), rating, review_datetime, review_duration
+        )
+
+        tenant_.boxes[position] = card.box
+        day = tenant_.due_day(card.due)
+        if day != tenant_.days[position]:
+            tenant_.unlink(position)
+            tenant_.link(position, day)
+
+        return card, review_log
+
+
+def _day_number(tenant: _Tenant, day: date | None) -> int:
+    # the day number of a day, in the tenant's scheduler's timezone
+    if day is None:
+        day = datetime.now(tenant.scheduler.timezone)
+    if isinstance(day, datetime):
+        day = tenant.scheduler._local_datetime(day)
+
+    return _to_epoch_day(day)
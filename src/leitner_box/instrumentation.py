@@ -0,0 +1,116 @@
+"""
+leitner_box.instrumentation
+
+This module defines the sinks that collect instrumentation from a Scheduler.
+
+A scheduler created with a sink reports every review to it: a callback before and
+after the review, counters of reviews per rating and of box transitions, and the
+time spent copying cards and computing due dates. Schedulers without a sink skip
+all of it.
+
+Counters:
+    reviews: Every review.
+    reviews.pass, reviews.fail: Reviews with each rating.
+    reviews.not_due: Attempted reviews of cards that weren't due yet.
+    box_transitions.<box>-><next box>: Reviews that moved a card from one box to another.
+
+Timers, in seconds:
+    review: A whole review, excluding the time spent in the sink.
+    copy: Copying the card for its review log and for the reviewed card.
+    due: Computing the reviewed card's box and due date.
+
+Classes:
+    InstrumentationSink: The interface of a sink.
+    InMemorySink: A sink that keeps every counter and timing in memory.
+"""
+
+from datetime import datetime
+from typing import TYPE_CHECKING, Protocol
+
+if TYPE_CHECKING:
+    from .leitner_box import Card, Rating, ReviewLog
+
+
+class InstrumentationSink(Protocol):
+    """
+    The interface of a sink, which collects the instrumentation of a Scheduler.
+    """
+
+    def before_review(
+        self, card: "Card", rating: "Rating", review_datetime: datetime
+    ) -> None:
+        """Called before a card is reviewed."""
+        ...
+
+    def after_review(
+        self, card: "Card", new_card: "Card", review_log: "ReviewLog"
+    ) -> None:
+        """Called after a card is reviewed, with the card before and after the review."""
+        ...
+
+    def increment(self, name: str, value: int = 1) -> None:
+        """Adds value to a counter."""
+        ...
+
+    def record_time(self, name: str, seconds: float) -> None:
+        """Records a timing."""
+        ...
+
+
+class InMemorySink:
+    """
+    A sink that keeps every counter and timing in memory, e.g. for tests.
+
+    The before_review and after_review callbacks do nothing, and can be overridden in a subclass.
+
+    Attributes:
+        counters (dict[str, int]): The value of each counter.
+        timings (dict[str, list[float]]): Every recorded timing of each timer, in seconds.
+    """
+
+    __slots__ = ("counters", "timings")
+
+    def __init__(self) -> None:
+        self.counters: dict[str, int] = {}
+        self.timings: dict[str, list[float]] = {}
+
+    def before_review(
+        self, card: "Card", rating: "Rating", review_datetime: datetime
+    ) -> None:
+        pass
+
+    def after_review(
+        self, card: "Card", new_card: "Card", review_log: "ReviewLog"
+    ) -> None:
+        pass
+
+    def increment(self, name: str, value: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def record_time(self, name: str, seconds: float) -> None:
+        timings = self.timings.get(name)
+        if timings is None:
+            self.timings[name] = [seconds]
+        else:
+            timings.append(seconds)
+
+    def total_time(self, name: str) -> float:
+        """
+        Returns the total of every recorded timing of a timer.
+
+        Args:
+            name (str): The name of the timer.
+
+        Returns:
+            float: The total in seconds, or 0.0 if the timer has no timings.
+        """
+
+        return sum(self.timings.get(name, ()))
+
+    def reset(self) -> None:
+        """
+        Clears every counter and timing.
+        """
+
+        self.counters.clear()
+        self.timings.clear()
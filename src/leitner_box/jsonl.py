@@ -0,0 +1,97 @@
+"""
+leitner_box.jsonl
+
+This module defines functions that stream ReviewLog objects to and from JSON Lines files.
+
+Each line of a JSON Lines file holds one ReviewLog.to_dict, so review histories
+can be written and read one log at a time, without holding the whole history in memory.
+
+Functions:
+    write_review_logs: Writes review logs to a JSON Lines file.
+    iter_review_logs: Lazily reads review logs from a JSON Lines file.
+"""
+
+import json
+from typing import IO, Any, Iterable, Iterator, Literal, overload
+
+from .leitner_box import ReviewLog
+
+ReviewLogTuple = tuple[int, int, Any, int, Any, int | None]
+"""
+A review log flattened to (card_id, box, due, rating, review_datetime, review_duration).
+
+box and due are those of the card before it was reviewed.
+"""
+
+
+def write_review_logs(fileobj: IO[str], review_logs: Iterable[ReviewLog]) -> int:
+    """
+    Writes review logs to a JSON Lines file, one ReviewLog.to_dict per line.
+
+    Args:
+        fileobj (IO[str]): A file opened for writing in text mode.
+        review_logs (Iterable[ReviewLog]): The review logs to write. They are consumed one at a time.
+
+    Returns:
+        int: The number of review logs written.
+    """
+
+    num_review_logs = 0
+    dumps = json.dumps
+    for review_log in review_logs:
+        fileobj.write(dumps(review_log.to_dict()))
+        fileobj.write("\n")
+        num_review_logs += 1
+
+    return num_review_logs
+
+
+@overload
+def iter_review_logs(
+    fileobj: Iterable[str], raw: Literal[False] = False
+) -> Iterator[ReviewLog]: ...
+
+
+@overload
+def iter_review_logs(
+    fileobj: Iterable[str], raw: Literal[True]
+) -> Iterator[ReviewLogTuple]: ...
+
+
+def iter_review_logs(
+    fileobj: Iterable[str], raw: bool = False
+) -> Iterator[ReviewLog] | Iterator[ReviewLogTuple]:
+    """
+    Lazily reads review logs from a JSON Lines file written by write_review_logs.
+
+    Args:
+        fileobj (Iterable[str]): A file opened for reading in text mode, or any other iterable of lines.
+        raw (bool): If True, yield ReviewLogTuples instead of ReviewLog objects. The due and review_datetime
+            in each tuple are the ISO 8601 strings from the file, left unparsed.
+
+    Returns:
+        Iterator[ReviewLog] | Iterator[ReviewLogTuple]: The review logs, in the order they were written.
+    """
+
+    if raw:
+        return _iter_review_log_tuples(fileobj)
+
+    return (ReviewLog.from_dict(json.loads(line)) for line in fileobj if line.strip())
+
+
+def _iter_review_log_tuples(fileobj: Iterable[str]) -> Iterator[ReviewLogTuple]:
+    loads = json.loads
+    for line in fileobj:
+        if not line.strip():
+            continue
+
+        source_dict = loads(line)
+        card_dict = source_dict["card"]
+        yield (
+            card_dict["card_id"],
+            card_dict["box"],
+            card_dict["due"],
+            source_dict["rating"],
+            source_dict["review_datetime"],
+            source_dict["review_duration"],
+        )
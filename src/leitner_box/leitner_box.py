@@ -7,13 +7,219 @@ Classes:
     Rating: Enum representing the two possible ratings when reviewing a card.
     Card: Represents a flashcard in the Leitner System.
     ReviewLog: Represents the log entry of a Card object that has been reviewed.
+    BoxCalendar: The review days of each box of a Scheduler configuration.
     Scheduler: The Leitner System scheduler.
 """
 
 from enum import IntEnum
-from datetime import datetime, timedelta, timezone
-from typing import Any, Literal
-from copy import deepcopy
+from datetime import date, datetime, timedelta, timezone, tzinfo
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, ClassVar, Iterable, Literal, Sequence
+import math
+import struct
+import time
+
+from .card_ids import CardIdGenerator, SnowflakeIdGenerator
+from .instrumentation import InstrumentationSink
+
+# random and zoneinfo are imported where they are used, to keep the import cheap
+if TYPE_CHECKING:
+    import random
+
+# days and seconds are counted from 1970-01-01, the same epoch as unix timestamps
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_ORDINAL = _EPOCH.toordinal()
+_UTC_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_ONE_SECOND = timedelta(seconds=1)
+
+_ONE_MICROSECOND = timedelta(microseconds=1)
+
+# stands in for a due date of None wherever due dates are stored as epoch seconds
+_NO_DUE = -(2**63)
+
+# fixed-width little-endian binary records. see Card.to_bytes, ReviewLog.to_bytes and Scheduler.to_bytes
+_CARD_STRUCT = struct.Struct("<qBqi")  # card_id, box, due, due's utc offset
+_REVIEW_LOG_STRUCT = struct.Struct(
+    "<qBqiBqiq"
+)  # card_id, box, due, due's utc offset, rating, review_datetime, utc offset, review_duration
+_SCHEDULER_STRUCT = struct.Struct("<qBH")  # start_datetime, on_fail, number of boxes
+_NO_UTC_OFFSET = -(2**31)  # utc offset of timezone-naive datetimes
+_NO_REVIEW_DURATION = -(2**63)
+_ON_FAIL_VALUES = ("first_box", "prev_box")  # indexed by their uint8 code
+
+
+def _to_epoch_day(dt: date) -> int:
+    # the day number of the (timezone-naive) date of dt
+    return dt.toordinal() - _EPOCH_ORDINAL
+
+
+def _from_epoch_day(day: int) -> datetime:
+    # the beginning of the given day
+    return datetime.fromordinal(day + _EPOCH_ORDINAL)
+
+
+@lru_cache(maxsize=4096)
+def _local_midnight(tz: tzinfo, day: int) -> datetime:
+    # the first instant of the given local day in tz. if the clocks skip midnight that
+    # day, normalizing through utc moves it to the first local time that exists
+    midnight = _from_epoch_day(day).replace(tzinfo=tz)
+    return midnight.astimezone(timezone.utc).astimezone(tz)
+
+
+def _timezone_name(tz: tzinfo) -> str:
+    if tz is timezone.utc:
+        return "UTC"
+
+    from zoneinfo import ZoneInfo
+
+    if isinstance(tz, ZoneInfo) and tz.key is not None:
+        return tz.key
+
+    raise ValueError(
+        f"Only a ZoneInfo timezone or timezone.utc can be serialized, but got {tz!r}."
+    )
+
+
+def _timezone_from_name(name: str) -> tzinfo:
+    if name == "UTC":
+        return timezone.utc
+
+    from zoneinfo import ZoneInfo
+
+    return ZoneInfo(name)
+
+
+def _to_epoch_seconds(dt: datetime) -> int:
+    # whole seconds since the epoch of the timezone-naive dt, rounded down
+    return (dt.replace(tzinfo=None) - _EPOCH) // _ONE_SECOND
+
+
+def _due_to_epoch_seconds(due: datetime | None) -> int:
+    if due is None:
+        return _NO_DUE
+
+    if due.tzinfo is not None or due.microsecond != 0:
+        raise ValueError(
+            f"Due date {due} must be timezone-naive and a whole number of seconds to be stored as epoch seconds."
+        )
+
+    return (due - _EPOCH) // _ONE_SECOND
+
+
+def _due_from_epoch_seconds(seconds: int) -> datetime | None:
+    if seconds == _NO_DUE:
+        return None
+
+    return _EPOCH + timedelta(seconds=seconds)
+
+
+def _aware_due_to_epoch_seconds(due: datetime) -> int:
+    # whole seconds since the epoch in utc of a timezone-aware due date
+    if due.utcoffset() is None or due.microsecond != 0:
+        raise ValueError(
+            f"Due date {due} must be timezone-aware and a whole number of seconds to be stored as utc epoch seconds."
+        )
+
+    return (due - _UTC_EPOCH) // _ONE_SECOND
+
+
+def _aware_due_from_epoch_seconds(seconds: int, tz: tzinfo) -> datetime:
+    return (_UTC_EPOCH + timedelta(seconds=seconds)).astimezone(tz)
+
+
+def _due_to_record(due: datetime | None) -> tuple[int, int]:
+    # a due date as epoch seconds and a utc offset in seconds. timezone-naive due dates
+    # are stored by their wall clock time without an offset, and timezone-aware ones by
+    # their utc time with their offset
+    if due is None or due.tzinfo is None:
+        return _due_to_epoch_seconds(due), _NO_UTC_OFFSET
+
+    utc_offset = due.utcoffset()
+    if utc_offset is None:
+        return _due_to_epoch_seconds(due), _NO_UTC_OFFSET
+
+    return _aware_due_to_epoch_seconds(due), utc_offset // _ONE_SECOND
+
+
+def _due_from_record(seconds: int, utc_offset: int) -> datetime | None:
+    if utc_offset == _NO_UTC_OFFSET:
+        return _due_from_epoch_seconds(seconds)
+
+    return _aware_due_from_epoch_seconds(
+        seconds, timezone(timedelta(seconds=utc_offset))
+    )
+
+
+def _to_epoch_microseconds(dt: datetime) -> int:
+    # microseconds since the epoch of the wall-clock time of dt, ignoring its timezone
+    return (dt.replace(tzinfo=None) - _EPOCH) // _ONE_MICROSECOND
+
+
+def _from_epoch_microseconds(microseconds: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=microseconds)
+
+
+def _binomial(rng: "random.Random", n: int, p: float) -> int:
+    # the number of successes in n trials with success probability p
+    if hasattr(rng, "binomialvariate"):  # python 3.12+
+        return rng.binomialvariate(n, p)
+
+    if p <= 0.0 or n == 0:
+        return 0
+    if p >= 1.0:
+        return n
+    if p > 0.5:
+        return n - _binomial(rng, n, 1.0 - p)
+
+    random_ = rng.random
+    if n * p < 10.0:
+        # counts the successes by skipping over the geometrically distributed gaps
+        # between them, which takes about n * p < 10 steps
+        log_1_minus_p = math.log1p(-p)
+        count = 0
+        position = int(math.log(1.0 - random_()) / log_1_minus_p) + 1
+        while position <= n:
+            count += 1
+            position += int(math.log(1.0 - random_()) / log_1_minus_p) + 1
+
+        return count
+
+    # transformed rejection with squeeze (Hormann's BTRS), the same sampler as
+    # random.binomialvariate in python 3.12+, which takes O(1) expected time
+    spq = math.sqrt(n * p * (1.0 - p))
+    b = 1.15 + 2.53 * spq
+    a = -0.0873 + 0.0248 * b + 0.01 * p
+    c = n * p + 0.5
+    vr = 0.92 - 4.2 / b
+    alpha = (2.83 + 5.1 / b) * spq
+    lpq = math.log(p / (1.0 - p))
+    m = math.floor((n + 1) * p)  # the mode of the distribution
+    h = math.lgamma(m + 1) + math.lgamma(n - m + 1)
+
+    while True:
+        u = random_() - 0.5
+        us = 0.5 - abs(u)
+        k = math.floor((2.0 * a / us + b) * u + c)
+        if k < 0 or k > n:
+            continue
+
+        v = random_()
+        if us >= 0.07 and v <= vr:
+            return k
+
+        v *= alpha / (a / (us * us) + b)
+        if (
+            math.log(v)
+            <= h - math.lgamma(k + 1) - math.lgamma(n - k + 1) + (k - m) * lpq
+        ):
+            return k
+
+
+def _check_buffer_size(buffer: bytes, size: int, name: str) -> None:
+    if len(buffer) != size:
+        raise ValueError(
+            f"Expected {size} bytes for a {name}, but got {len(buffer)} bytes."
+        )
 
 
 class Rating(IntEnum):
@@ -30,25 +236,68 @@ class Card:
     Represents a flashcard in the Leitner System.
 
     Attributes:
-        card_id (int): The id of the card. Defaults to the epoch miliseconds of when the card was created.
+        card_id (int): The id of the card. Defaults to a new id from Card.id_generator.
         box (int): The box that the card is currently in.
         due (datetime | None): When the card is due for review.
     """
 
+    __slots__ = ("card_id", "box", "due")
+
     card_id: int
     box: int
     due: datetime | None
 
+    id_generator: ClassVar[CardIdGenerator] = SnowflakeIdGenerator()
+    """Assigns the ids of new cards. Replace it to use a different scheme, e.g. a SnowflakeIdGenerator with a node_id per process."""
+
     def __init__(
         self, card_id: int | None = None, box: int = 1, due: datetime | None = None
     ) -> None:
         if card_id is None:
-            card_id = int(datetime.now(timezone.utc).timestamp() * 1000)
+            card_id = Card.id_generator.next_id()
         self.card_id = card_id
 
         self.box = box
         self.due = due
 
+    @staticmethod
+    def create_many(n: int, box: int = 1, due: datetime | None = None) -> list["Card"]:
+        """
+        Creates n new cards, with ids allocated from Card.id_generator in a single block.
+
+        Args:
+            n (int): The number of cards.
+            box (int): The box that the cards start in.
+            due (datetime | None): When the cards are due for review.
+
+        Returns:
+            list[Card]: The new cards, in the order of their ids.
+        """
+
+        return [
+            Card(card_id=card_id, box=box, due=due)
+            for card_id in Card.id_generator.next_ids(n)
+        ]
+
+    def copy(self) -> "Card":
+        """
+        Returns a copy of the card.
+
+        A card only holds immutable values, so this shallow copy is as independent as a deepcopy
+        of the card while being much cheaper to make.
+
+        Returns:
+            Card: A new card with the same card_id, box and due date.
+        """
+
+        return Card(card_id=self.card_id, box=self.box, due=self.due)
+
+    def __copy__(self) -> "Card":
+        return self.copy()
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> "Card":
+        return self.copy()
+
     def to_dict(self) -> dict[str, int | str | None]:
         return_dict: dict[str, int | str | None] = {
             "card_id": self.card_id,
@@ -76,6 +325,84 @@ class Card:
 
         return Card(card_id=card_id, box=box, due=due)
 
+    def to_bytes(self) -> bytes:
+        """
+        Encodes the card as a fixed-width 21 byte record.
+
+        The record holds the card_id as an int64, the box as a uint8, the due date as int64 epoch seconds and
+        its utc offset in seconds as an int32, all little-endian. Timezone-naive due dates are encoded by their
+        wall clock time, and timezone-aware ones by their utc time. Cards without a due date and timezone-naive
+        due dates are encoded with sentinel values.
+
+        Like review datetimes in ReviewLog.to_bytes, timezone-aware due dates are decoded with a fixed utc
+        offset, so named timezones like ZoneInfo("America/Los_Angeles") are not preserved.
+
+        Returns:
+            bytes: The encoded card.
+
+        Raises:
+            ValueError: If the due date is not a whole number of seconds.
+        """
+
+        return _CARD_STRUCT.pack(self.card_id, self.box, *_due_to_record(self.due))
+
+    @staticmethod
+    def from_bytes(buffer: bytes) -> "Card":
+        """
+        Decodes a card encoded with Card.to_bytes.
+
+        Raises:
+            ValueError: If the buffer isn't exactly one card record long.
+        """
+
+        _check_buffer_size(buffer, _CARD_STRUCT.size, "Card")
+        card_id, box, due, utc_offset = _CARD_STRUCT.unpack(buffer)
+
+        return Card(card_id=card_id, box=box, due=_due_from_record(due, utc_offset))
+
+    @staticmethod
+    def pack_many(cards: Iterable["Card"]) -> bytes:
+        """
+        Encodes cards as one contiguous buffer of Card.to_bytes records.
+
+        Args:
+            cards (Iterable[Card]): The cards to encode.
+
+        Returns:
+            bytes: The encoded cards.
+        """
+
+        pack = _CARD_STRUCT.pack
+        return b"".join(
+            [pack(card.card_id, card.box, *_due_to_record(card.due)) for card in cards]
+        )
+
+    @staticmethod
+    def unpack_many(buffer: bytes) -> list["Card"]:
+        """
+        Decodes a buffer of cards encoded with Card.pack_many.
+
+        Raises:
+            ValueError: If the buffer isn't a whole number of card records long.
+        """
+
+        if len(buffer) % _CARD_STRUCT.size != 0:
+            raise ValueError(
+                f"Buffer of {len(buffer)} bytes isn't a whole number of {_CARD_STRUCT.size} byte Card records."
+            )
+
+        # due dates cluster on a few midnights, so each distinct one is only decoded once
+        dues: dict[tuple[int, int], datetime | None] = {}
+        cards = []
+        for card_id, box, due, utc_offset in _CARD_STRUCT.iter_unpack(buffer):
+            key = (due, utc_offset)
+            if key not in dues:
+                dues[key] = _due_from_record(due, utc_offset)
+
+            cards.append(Card(card_id=card_id, box=box, due=dues[key]))
+
+        return cards
+
 
 class ReviewLog:
     """
@@ -88,6 +415,8 @@ class ReviewLog:
         review_duration (int | None): The amount of time in miliseconds it took to review the card, if specified.
     """
 
+    __slots__ = ("card", "rating", "review_datetime", "review_duration")
+
     card: Card
     rating: Rating
     review_datetime: datetime
@@ -100,7 +429,7 @@ class ReviewLog:
         review_datetime: datetime,
         review_duration: int | None = None,
     ) -> None:
-        self.card = deepcopy(card)
+        self.card = card.copy()
         self.rating = rating
         self.review_datetime = review_datetime
         self.review_duration = review_duration
@@ -129,6 +458,174 @@ class ReviewLog:
             review_duration=review_duration,
         )
 
+    def to_bytes(self) -> bytes:
+        """
+        Encodes the review log as a fixed-width 42 byte record.
+
+        The record starts with the Card.to_bytes record of the reviewed card, followed by the rating as a uint8,
+        the review datetime as int64 epoch microseconds, its utc offset in seconds as an int32 and the review
+        duration as an int64, all little-endian. Timezone-naive review datetimes and missing review durations
+        are encoded with sentinel values.
+
+        Timezone-aware due dates and review datetimes are decoded with a fixed utc offset, so named timezones like
+        ZoneInfo("America/Los_Angeles") are not preserved.
+
+        Returns:
+            bytes: The encoded review log.
+
+        Raises:
+            ValueError: If the due date of the card can't be encoded by Card.to_bytes.
+        """
+
+        utc_offset = self.review_datetime.utcoffset()
+
+        return _REVIEW_LOG_STRUCT.pack(
+            self.card.card_id,
+            self.card.box,
+            *_due_to_record(self.card.due),
+            self.rating,
+            _to_epoch_microseconds(self.review_datetime),
+            _NO_UTC_OFFSET if utc_offset is None else utc_offset // _ONE_SECOND,
+            (
+                _NO_REVIEW_DURATION
+                if self.review_duration is None
+                else self.review_duration
+            ),
+        )
+
+    @staticmethod
+    def from_bytes(buffer: bytes) -> "ReviewLog":
+        """
+        Decodes a review log encoded with ReviewLog.to_bytes.
+
+        Raises:
+            ValueError: If the buffer isn't exactly one review log record long.
+        """
+
+        _check_buffer_size(buffer, _REVIEW_LOG_STRUCT.size, "ReviewLog")
+        (
+            card_id,
+            box,
+            due,
+            due_utc_offset,
+            rating,
+            review_microseconds,
+            utc_offset,
+            review_duration,
+        ) = _REVIEW_LOG_STRUCT.unpack(buffer)
+
+        review_datetime = _from_epoch_microseconds(review_microseconds)
+        if utc_offset != _NO_UTC_OFFSET:
+            review_datetime = review_datetime.replace(
+                tzinfo=timezone(timedelta(seconds=utc_offset))
+            )
+
+        return ReviewLog(
+            card=Card(
+                card_id=card_id, box=box, due=_due_from_record(due, due_utc_offset)
+            ),
+            rating=Rating(rating),
+            review_datetime=review_datetime,
+            review_duration=(
+                None if review_duration == _NO_REVIEW_DURATION else review_duration
+            ),
+        )
+
+
+class BoxCalendar:
+    """
+    The review days of each box of a Scheduler configuration.
+
+    Cards in a box are due on the days that are a whole multiple of the box's interval after begin_day, the day
+    before the scheduler was created. Each box's phase within its interval is computed once, so both methods take
+    O(1) time.
+
+    Calendars are cached and shared by every Scheduler with the same box_intervals and start day. Use
+    Scheduler.box_calendar or BoxCalendar.get rather than creating them directly.
+
+    Attributes:
+        box_intervals (tuple[int, ...]): The interval lengths --in days-- of each box.
+        begin_day (int): The day before the scheduler was created, counted in days since 1970-01-01.
+    """
+
+    __slots__ = ("box_intervals", "begin_day", "_phases")
+
+    box_intervals: tuple[int, ...]
+    begin_day: int
+
+    def __init__(self, box_intervals: tuple[int, ...], begin_day: int) -> None:
+        self.box_intervals = box_intervals
+        self.begin_day = begin_day
+        self._phases = tuple(begin_day % interval for interval in box_intervals)
+
+    @staticmethod
+    def get(box_intervals: Sequence[int], start_datetime: datetime) -> "BoxCalendar":
+        """
+        Returns the shared, cached calendar of a scheduler configuration.
+
+        Args:
+            box_intervals (Sequence[int]): The interval lengths --in days-- of each box.
+            start_datetime (datetime): When the scheduler was created. Only its day matters.
+
+        Returns:
+            BoxCalendar: The calendar of the configuration.
+        """
+
+        return _get_box_calendar(
+            tuple(box_intervals), _to_epoch_day(start_datetime) - 1
+        )
+
+    def next_due(self, box: int, after: datetime) -> datetime:
+        """
+        Returns the first review day of the box that begins strictly after the given datetime.
+
+        Args:
+            box (int): The box.
+            after (datetime): The (timezone-naive) date and time to search from.
+
+        Returns:
+            datetime: The beginning of the next review day of the box.
+        """
+
+        return _from_epoch_day(self._next_due_day(box, _to_epoch_day(after)))
+
+    def _next_due_day(self, box: int, day: int) -> int:
+        # the first review day of the box after the given day, as day numbers
+        interval = self.box_intervals[box - 1]
+        elapsed_days = day - self.begin_day
+
+        # review days are never on or before begin_day
+        if elapsed_days < 0:
+            return self.begin_day + interval
+
+        # whole days are enough: a review day begins at midnight, so any time during
+        # a review day is already past it
+        return self.begin_day + interval * (elapsed_days // interval + 1)
+
+    def is_review_day(self, box: int, day: date) -> bool:
+        """
+        Returns whether cards in the box are reviewed on the given day.
+
+        Args:
+            box (int): The box.
+            day (date): The day, as a date or (timezone-naive) datetime.
+
+        Returns:
+            bool: Whether the day is one of the box's review days.
+        """
+
+        day_number = _to_epoch_day(day)
+
+        return (
+            day_number > self.begin_day
+            and day_number % self.box_intervals[box - 1] == self._phases[box - 1]
+        )
+
+
+@lru_cache(maxsize=1024)
+def _get_box_calendar(box_intervals: tuple[int, ...], begin_day: int) -> BoxCalendar:
+    return BoxCalendar(box_intervals, begin_day)
+
 
 class Scheduler:
     """
@@ -140,17 +637,27 @@ class Scheduler:
         box_intervals (list[int]): List of integers representing the interval lengths --in days-- of each box. The number of boxes is equal to the number of the length of box_intervals.
         start_datetime (datetime): The date and time that the Scheduler object was created. This is needed for scheduling purposes.
         on_fail (str): What to do when a card is failed. Possible values are 'first_box' to move the card back to box 1, and 'prev_box' to move the card to the next lowest box.
+        sink (InstrumentationSink | None): Collects the instrumentation of every review, if specified. It isn't serialized with the scheduler.
+        timezone (tzinfo | None): The timezone whose midnights begin each day, if specified. Review datetimes are converted to it, naive datetimes are taken to already be in it,
+            and cards become due at local midnight as timezone-aware datetimes, also across DST transitions. Without a timezone, datetimes are scheduled by their
+            timezone-naive wall clock time and due dates are timezone-naive.
     """
 
+    __slots__ = ("box_intervals", "start_datetime", "on_fail", "sink", "timezone")
+
     box_intervals: list[int]
     start_datetime: datetime
     on_fail: str
+    sink: InstrumentationSink | None
+    timezone: tzinfo | None
 
     def __init__(
         self,
         box_intervals: list[int] = [1, 2, 7],
         start_datetime: datetime | None = None,
         on_fail: Literal["first_box", "prev_box"] = "first_box",
+        sink: InstrumentationSink | None = None,
+        timezone: tzinfo | None = None,
     ) -> None:
         if box_intervals[0] != 1:
             raise ValueError(
@@ -159,12 +666,18 @@ class Scheduler:
 
         self.box_intervals = box_intervals  # how many days in between you review each box; default box1 - everyday, box2 - every 2 days, box3, every seven days
         if start_datetime is None:
-            self.start_datetime = datetime.now()
-        else:
+            self.start_datetime = datetime.now(timezone)
+        elif timezone is None:
             start_datetime = start_datetime.replace(tzinfo=None)
             self.start_datetime = start_datetime
+        elif start_datetime.tzinfo is None:
+            self.start_datetime = start_datetime.replace(tzinfo=timezone)
+        else:
+            self.start_datetime = start_datetime.astimezone(timezone)
 
         self.on_fail = on_fail
+        self.sink = sink
+        self.timezone = timezone
 
     def review_card(
         self,
@@ -190,56 +703,411 @@ class Scheduler:
         """
 
         if review_datetime is None:
-            review_datetime = datetime.now()
+            review_datetime = datetime.now(self.timezone)
 
-        review_log = ReviewLog(
+        review = (
+            self._review_card if self.sink is None else self._review_card_instrumented
+        )
+        reviewed = review(
             card=card,
             rating=rating,
             review_datetime=review_datetime,
             review_duration=review_duration,
+            calendar=self.box_calendar,
         )
 
-        review_datetime = review_datetime.replace(
-            tzinfo=None
-        )  # review log datetimes can log timezone info, but it is dropped immediately after
+        if reviewed is None:
+            raise RuntimeError(f"Card is not due for review until {card.due}.")
 
-        # the card to be returned after review
-        new_card = deepcopy(card)
+        return reviewed
 
-        if new_card.due is None:
-            new_card.due = review_datetime.replace(
-                hour=0, minute=0, second=0, microsecond=0
-            )  # beginning of the day of review
+    def review_cards(
+        self,
+        cards: Sequence[Card],
+        ratings: Sequence[Rating],
+        review_datetimes: Sequence[datetime | None] | None = None,
+        review_durations: Sequence[int | None] | None = None,
+    ) -> tuple[list[Card], list[ReviewLog | None], list[bool]]:
+        """
+        Reviews a batch of cards in a single pass.
 
-        card_is_due = review_datetime >= new_card.due
-        if not card_is_due:
-            raise RuntimeError(f"Card is not due for review until {new_card.due}.")
+        Each card is reviewed exactly as by review_card, but cards that are not yet due
+        are reported in the returned mask instead of raising an error. The work that only
+        depends on the scheduler is done once per batch, and the due dates of cards moved
+        to the same box on the same day are computed once, so a batch is faster than
+        calling review_card for each card.
 
-        if rating == Rating.Fail:
-            if self.on_fail == "first_box":
-                new_card.box = 1
-            elif self.on_fail == "prev_box" and new_card.box > 1:
-                new_card.box -= 1
+        Args:
+            cards (Sequence[Card]): The cards being reviewed.
+            ratings (Sequence[Rating]): The chosen rating for each card.
+            review_datetimes (Sequence[datetime | None] | None): The date and time of each review. Reviews without a datetime happen now.
+            review_durations (Sequence[int | None] | None): The amount of time in miliseconds it took to review each card, if specified.
 
-        elif rating == Rating.Pass:
-            if new_card.box < len(self.box_intervals):
-                new_card.box += 1
+        Returns:
+            tuple: A tuple containing the list of updated cards, the list of review logs and a mask of which cards were reviewed.
+                Cards that were not due are returned unchanged, with None in place of their review log and False in the mask.
+
+        Raises:
+            ValueError: If the given sequences do not all have the same length.
+        """
+
+        num_cards = len(cards)
+        if review_datetimes is None:
+            review_datetimes = [None] * num_cards
+        if review_durations is None:
+            review_durations = [None] * num_cards
+
+        if not (
+            len(ratings) == len(review_datetimes) == len(review_durations) == num_cards
+        ):
+            raise ValueError(
+                "cards, ratings, review_datetimes and review_durations must all have the same length."
+            )
+
+        now = datetime.now(self.timezone)
+        calendar = self.box_calendar
+        if self.sink is not None:
+            return self._review_cards_instrumented(
+                cards, ratings, review_datetimes, review_durations, now, calendar
+            )
+
+        tz = self.timezone
+        num_boxes = len(self.box_intervals)
+        # the box a card moves to, for each (box, rating)
+        next_boxes = {
+            (box, rating): self._next_box(box, rating)
+            for box in range(1, num_boxes + 1)
+            for rating in Rating
+        }
+        # the next due date of each (box, local review day). cards reviewed on the same
+        # day share their due dates, so each one is only computed once per batch
+        next_dues: dict[tuple[int, int], datetime] = {}
+
+        new_cards: list[Card] = []
+        review_logs: list[ReviewLog | None] = []
+        reviewed_mask: list[bool] = []
+        last_review_datetime = None
+        local_review_datetime = now
+        review_day = 0
+        for card, rating, review_datetime, review_duration in zip(
+            cards, ratings, review_datetimes, review_durations
+        ):
+            if review_datetime is None:
+                review_datetime = now
+
+            # batches usually share their review datetimes, which are converted once
+            if review_datetime is not last_review_datetime:
+                last_review_datetime = review_datetime
+                if tz is None or review_datetime.tzinfo is None:
+                    local_review_datetime = review_datetime.replace(tzinfo=None)
+                else:
+                    local_review_datetime = review_datetime.astimezone(tz).replace(
+                        tzinfo=None
+                    )
+                review_day = _to_epoch_day(local_review_datetime)
+
+            due = card.due
+            if due is not None:
+                if tz is not None and due.tzinfo is not None:
+                    due = due.astimezone(tz).replace(tzinfo=None)
+                if local_review_datetime < due:
+                    new_cards.append(card)
+                    review_logs.append(None)
+                    reviewed_mask.append(False)
+                    continue
+
+            box = card.box
+            next_box = next_boxes.get((box, rating))
+            if next_box is None:
+                next_box = self._next_box(box, rating)
+
+            next_due = next_dues.get((next_box, review_day))
+            if next_due is None:
+                next_due = self._next_due(next_box, local_review_datetime, calendar)
+                next_dues[next_box, review_day] = next_due
+
+            new_cards.append(Card(card.card_id, next_box, next_due))
+            review_logs.append(
+                ReviewLog(card, rating, review_datetime, review_duration)
+            )
+            reviewed_mask.append(True)
+
+        return new_cards, review_logs, reviewed_mask
+
+    def _review_cards_instrumented(
+        self,
+        cards: Sequence[Card],
+        ratings: Sequence[Rating],
+        review_datetimes: Sequence[datetime | None],
+        review_durations: Sequence[int | None],
+        now: datetime,
+        calendar: BoxCalendar,
+    ) -> tuple[list[Card], list[ReviewLog | None], list[bool]]:
+        # review_cards, reviewing each card with _review_card_instrumented so that the
+        # sink sees every review
+        new_cards: list[Card] = []
+        review_logs: list[ReviewLog | None] = []
+        reviewed_mask: list[bool] = []
+        for card, rating, review_datetime, review_duration in zip(
+            cards, ratings, review_datetimes, review_durations
+        ):
+            reviewed = self._review_card_instrumented(
+                card,
+                rating,
+                now if review_datetime is None else review_datetime,
+                review_duration,
+                calendar,
+            )
+
+            if reviewed is None:
+                new_cards.append(card)
+                review_logs.append(None)
+                reviewed_mask.append(False)
+            else:
+                new_cards.append(reviewed[0])
+                review_logs.append(reviewed[1])
+                reviewed_mask.append(True)
+
+        return new_cards, review_logs, reviewed_mask
+
+    def forecast(
+        self,
+        cards: Iterable[Card],
+        days: int,
+        pass_rate: float = 0.9,
+        start_datetime: datetime | None = None,
+        num_simulations: int | None = None,
+        seed: int | None = None,
+    ) -> list[list[float]]:
+        """
+        Projects how many reviews will be due on each of the coming days, per box.
+
+        Cards are reviewed on the day they become due and pass with probability pass_rate. Overdue and new cards
+        are counted as due on the first day. After the cards are counted by box and due day, the projection takes
+        time proportional to days * len(box_intervals), independent of the number of cards.
+
+        By default the expected number of reviews is computed exactly. If num_simulations is specified, the
+        reviews are sampled randomly instead and averaged over that many simulations.
+
+        Args:
+            cards (Iterable[Card]): The cards to project.
+            days (int): The number of days to project, starting with the day of start_datetime.
+            pass_rate (float): The probability that a review passes.
+            start_datetime (datetime | None): When the projection starts. Defaults to now.
+            num_simulations (int | None): The number of Monte Carlo simulations to average, if specified.
+            seed (int | None): The random seed of the Monte Carlo simulations, if specified.
+
+        Returns:
+            list[list[float]]: The number of reviews of each box on each day. forecast[day][box - 1] is the number of
+                reviews of cards in the given box on the given day, where day 0 is the day of start_datetime.
+        """
+
+        if start_datetime is None:
+            start_datetime = datetime.now(self.timezone)
+        local_datetime = self._local_datetime
+        start_day = _to_epoch_day(local_datetime(start_datetime))
+        num_boxes = len(self.box_intervals)
+
+        # number of cards due on each day, per box
+        due_counts = [[0] * num_boxes for _ in range(days)]
+        for card in cards:
+            if card.due is None:
+                day = 0
+            else:
+                day = max(_to_epoch_day(local_datetime(card.due)) - start_day, 0)
+            if day < days:
+                due_counts[day][card.box - 1] += 1
 
-        interval = self.box_intervals[new_card.box - 1]
+        if num_simulations is None:
+            return self._project(due_counts, start_day, pass_rate, None)
 
-        begin_datetime = (self.start_datetime - timedelta(days=1)).replace(
-            hour=0, minute=0, second=0, microsecond=0
+        import random
+
+        rng = random.Random(seed)
+        forecast = [[0.0] * num_boxes for _ in range(days)]
+        for _ in range(num_simulations):
+            simulation = self._project(due_counts, start_day, pass_rate, rng)
+            for day in range(days):
+                for box in range(num_boxes):
+                    forecast[day][box] += simulation[day][box] / num_simulations
+
+        return forecast
+
+    def _project(
+        self,
+        due_counts: list[list[int]],
+        start_day: int,
+        pass_rate: float,
+        rng: "random.Random | None",
+    ) -> list[list[float]]:
+        # reviews every cohort of cards on the day it is due, moving the ones that pass and
+        # fail to their next due day. cohorts are split by their expected size, or sampled
+        # with rng if given
+        calendar = self.box_calendar
+        days = len(due_counts)
+        pending = [[float(count) for count in counts] for counts in due_counts]
+
+        for day in range(days):
+            for box, count in enumerate(pending[day], start=1):
+                if not count:
+                    continue
+
+                if rng is None:
+                    num_passed: float = count * pass_rate
+                else:
+                    num_passed = float(_binomial(rng, int(count), pass_rate))
+
+                for rating, num_cards in (
+                    (Rating.Pass, num_passed),
+                    (Rating.Fail, count - num_passed),
+                ):
+                    next_box = self._next_box(box, rating)
+                    next_day = (
+                        calendar._next_due_day(next_box, start_day + day) - start_day
+                    )
+                    if next_day < days:
+                        pending[next_day][next_box - 1] += num_cards
+
+        # cohorts are reviewed on the day they are due, so the projection is what was pending
+        return pending
+
+    @property
+    def box_calendar(self) -> BoxCalendar:
+        """
+        The review days of each box of this scheduler, shared with every equivalent scheduler.
+        """
+
+        return BoxCalendar.get(self.box_intervals, self.start_datetime)
+
+    def _review_card(
+        self,
+        card: Card,
+        rating: Rating,
+        review_datetime: datetime,
+        review_duration: int | None,
+        calendar: BoxCalendar,
+    ) -> tuple[Card, ReviewLog] | None:
+        # reviews the card, returning None instead of raising if it is not yet due
+        local_review_datetime = self._due_review_datetime(card, review_datetime)
+        if local_review_datetime is None:
+            return None
+
+        review_log = ReviewLog(
+            card=card,
+            rating=rating,
+            review_datetime=review_datetime,
+            review_duration=review_duration,
+        )
+
+        # the card to be returned after review
+        new_card = card.copy()
+        self._reschedule(new_card, rating, local_review_datetime, calendar)
+
+        return new_card, review_log
+
+    def _review_card_instrumented(
+        self,
+        card: Card,
+        rating: Rating,
+        review_datetime: datetime,
+        review_duration: int | None,
+        calendar: BoxCalendar,
+    ) -> tuple[Card, ReviewLog] | None:
+        # _review_card, reporting the review to the sink. it runs the same steps, so
+        # that a sink never changes the result of a review
+        sink = self.sink
+        assert sink is not None
+        perf_counter = time.perf_counter
+
+        sink.before_review(card, rating, review_datetime)
+        start = perf_counter()
+
+        local_review_datetime = self._due_review_datetime(card, review_datetime)
+        if local_review_datetime is None:
+            sink.increment("reviews.not_due")
+            return None
+
+        copy_start = perf_counter()
+        review_log = ReviewLog(
+            card=card,
+            rating=rating,
+            review_datetime=review_datetime,
+            review_duration=review_duration,
         )
-        i = 1
-        next_due_date = begin_datetime + (timedelta(days=interval) * i)
-        while next_due_date <= review_datetime:
-            next_due_date = begin_datetime + (timedelta(days=interval) * i)
-            i += 1
+        new_card = card.copy()
+        due_start = perf_counter()
+        self._reschedule(new_card, rating, local_review_datetime, calendar)
+        end = perf_counter()
 
-        new_card.due = next_due_date
+        sink.record_time("copy", due_start - copy_start)
+        sink.record_time("due", end - due_start)
+        sink.record_time("review", end - start)
+        sink.increment("reviews")
+        sink.increment(f"reviews.{rating.name.lower()}")
+        sink.increment(f"box_transitions.{card.box}->{new_card.box}")
+        sink.after_review(card, new_card, review_log)
 
         return new_card, review_log
 
+    def _due_review_datetime(
+        self, card: Card, review_datetime: datetime
+    ) -> datetime | None:
+        # the local wall clock time the card is scheduled from, or None if it is not yet due
+        if self.timezone is None:
+            # review log datetimes can log timezone info, but it is dropped for scheduling
+            local_review_datetime = review_datetime.replace(tzinfo=None)
+            due = card.due
+        else:
+            local_review_datetime = self._local_datetime(review_datetime)
+            due = None if card.due is None else self._local_datetime(card.due)
+
+        if due is not None and local_review_datetime < due:
+            return None
+
+        return local_review_datetime
+
+    def _reschedule(
+        self,
+        card: Card,
+        rating: Rating,
+        local_review_datetime: datetime,
+        calendar: BoxCalendar,
+    ) -> None:
+        # moves the card to its next box and due date after a review, in place
+        card.box = self._next_box(card.box, rating)
+        card.due = self._next_due(card.box, local_review_datetime, calendar)
+
+    def _local_datetime(self, dt: datetime) -> datetime:
+        # the timezone-naive wall clock time of dt, in the scheduler's timezone if it has one
+        if self.timezone is None or dt.tzinfo is None:
+            return dt.replace(tzinfo=None)
+
+        return dt.astimezone(self.timezone).replace(tzinfo=None)
+
+    def _next_due(
+        self, box: int, local_datetime: datetime, calendar: BoxCalendar
+    ) -> datetime:
+        # when a card in the given box, reviewed at the given local wall clock time, is next due
+        if self.timezone is None:
+            return calendar.next_due(box, local_datetime)
+
+        next_day = calendar._next_due_day(box, _to_epoch_day(local_datetime))
+        return _local_midnight(self.timezone, next_day)
+
+    def _next_box(self, box: int, rating: Rating) -> int:
+        # the box that a card in the given box moves to after a review
+        if rating == Rating.Fail:
+            if self.on_fail == "first_box":
+                return 1
+            elif self.on_fail == "prev_box" and box > 1:
+                return box - 1
+
+        elif rating == Rating.Pass:
+            if box < len(self.box_intervals):
+                return box + 1
+
+        return box
+
     def to_dict(self) -> dict[str, list[int] | int | str]:
         return_dict: dict[str, list[int] | int | str] = {
             "box_intervals": self.box_intervals,
@@ -247,6 +1115,9 @@ class Scheduler:
             "on_fail": self.on_fail,
         }
 
+        if self.timezone is not None:
+            return_dict["timezone"] = _timezone_name(self.timezone)
+
         return return_dict
 
     @staticmethod
@@ -255,6 +1126,83 @@ class Scheduler:
         start_datetime = datetime.fromisoformat(source_dict["start_datetime"])
         on_fail = source_dict["on_fail"]
 
+        timezone_name = source_dict.get("timezone")
+        if timezone_name is None:
+            timezone_ = None
+        else:
+            timezone_ = _timezone_from_name(timezone_name)
+
+        return Scheduler(
+            box_intervals=box_intervals,
+            start_datetime=start_datetime,
+            on_fail=on_fail,
+            timezone=timezone_,
+        )
+
+    def to_bytes(self) -> bytes:
+        """
+        Encodes the scheduler as a binary record.
+
+        The record holds the start datetime as int64 epoch microseconds, on_fail as a uint8 and the number of
+        boxes as a uint16, followed by the interval of each box as a uint32, all little-endian. A scheduler with a
+        timezone ends with the timezone's name, in UTF-8 and prefixed with its length as a uint8.
+
+        Returns:
+            bytes: The encoded scheduler.
+
+        Raises:
+            ValueError: If the scheduler's timezone isn't a ZoneInfo timezone or timezone.utc.
+        """
+
+        buffer = _SCHEDULER_STRUCT.pack(
+            _to_epoch_microseconds(self.start_datetime),
+            _ON_FAIL_VALUES.index(self.on_fail),
+            len(self.box_intervals),
+        ) + struct.pack(f"<{len(self.box_intervals)}I", *self.box_intervals)
+
+        if self.timezone is not None:
+            timezone_name = _timezone_name(self.timezone).encode()
+            buffer += bytes([len(timezone_name)]) + timezone_name
+
+        return buffer
+
+    @staticmethod
+    def from_bytes(buffer: bytes) -> "Scheduler":
+        """
+        Decodes a scheduler encoded with Scheduler.to_bytes.
+
+        Raises:
+            ValueError: If the buffer isn't exactly one scheduler record long.
+        """
+
+        if len(buffer) < _SCHEDULER_STRUCT.size:
+            raise ValueError(
+                f"Expected at least {_SCHEDULER_STRUCT.size} bytes for a Scheduler, but got {len(buffer)} bytes."
+            )
+
+        start_microseconds, on_fail_code, num_boxes = _SCHEDULER_STRUCT.unpack_from(
+            buffer
+        )
+        intervals_struct = struct.Struct(f"<{num_boxes}I")
+        intervals_end = _SCHEDULER_STRUCT.size + intervals_struct.size
+
+        timezone_: tzinfo | None = None
+        if len(buffer) > intervals_end:
+            timezone_name_end = intervals_end + 1 + buffer[intervals_end]
+            _check_buffer_size(buffer, timezone_name_end, "Scheduler")
+            timezone_ = _timezone_from_name(
+                bytes(buffer[intervals_end + 1 : timezone_name_end]).decode()
+            )
+        else:
+            _check_buffer_size(buffer, intervals_end, "Scheduler")
+
+        box_intervals = list(
+            intervals_struct.unpack_from(buffer, _SCHEDULER_STRUCT.size)
+        )
+
         return Scheduler(
-            box_intervals=box_intervals, start_datetime=start_datetime, on_fail=on_fail
+            box_intervals=box_intervals,
+            start_datetime=_from_epoch_microseconds(start_microseconds),
+            on_fail=_ON_FAIL_VALUES[on_fail_code],  # type: ignore[arg-type]
+            timezone=timezone_,
         )
@@ -0,0 +1,147 @@
+"""
+leitner_box.parallel
+
+This module defines functions that replay review history across multiple processes.
+
+Review logs are sharded by card_id, so every review of a card is replayed by the
+same process. Shards are sent to worker processes as compact binary records
+instead of pickled objects, and the results come back as Card.pack_many buffers.
+
+Functions:
+    reschedule_parallel: Replays review logs across a pool of processes.
+"""
+
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Iterable, Iterator, Mapping
+
+from .leitner_box import (
+    Card,
+    ReviewLog,
+    Scheduler,
+    _from_epoch_microseconds,
+    _local_midnight,
+    _to_epoch_day,
+    _to_epoch_microseconds,
+)
+from .replay import ReplayableLog, replay
+
+# card_id, box, rating, review_datetime in epoch microseconds
+_LOG_STRUCT = struct.Struct("<qBBq")
+
+# shards per worker, so that uneven shards still keep every worker busy
+_SHARDS_PER_WORKER = 4
+
+
+def reschedule_parallel(
+    scheduler: Scheduler,
+    review_logs: Iterable[ReplayableLog],
+    workers: int = 1,
+    initial_cards: Mapping[int, Card] | None = None,
+) -> list[Card]:
+    """
+    Replays review logs across a pool of processes, like replay.
+
+    The review logs of each card must be contiguous and in the order they were reviewed, as for replay.
+    They are encoded into compact shards by card_id, which are held in memory until they are replayed.
+
+    Review datetimes are encoded as their timezone-naive wall clock time, in the scheduler's timezone if it has one,
+    which is all that Scheduler.review_card uses of them.
+
+    Args:
+        scheduler (Scheduler): The scheduler whose rules are replayed.
+        review_logs (Iterable[ReplayableLog]): The review logs, grouped by card_id.
+        workers (int): The number of worker processes. With one worker, everything is replayed in this process.
+        initial_cards (Mapping[int, Card] | None): The state of each card before its first review log, keyed by card_id.
+
+    Returns:
+        list[Card]: The final state of each card, sorted by card_id.
+
+    Raises:
+        ValueError: If workers is less than 1.
+    """
+
+    if workers < 1:
+        raise ValueError(f"workers must be at least 1, but got {workers}.")
+
+    num_shards = workers * _SHARDS_PER_WORKER
+    log_shards = [bytearray() for _ in range(num_shards)]
+    pack = _LOG_STRUCT.pack
+    local_datetime = scheduler._local_datetime
+    for review_log in review_logs:
+        if isinstance(review_log, ReviewLog):
+            card_id = review_log.card.card_id
+            box = review_log.card.box
+            rating = review_log.rating
+            review_datetime = review_log.review_datetime
+        else:
+            card_id, box, _, rating, review_datetime = review_log[:5]
+            if isinstance(review_datetime, str):
+                review_datetime = datetime.fromisoformat(review_datetime)
+
+        log_shards[card_id % num_shards] += pack(
+            card_id,
+            box,
+            rating,
+            _to_epoch_microseconds(local_datetime(review_datetime)),
+        )
+
+    initial_card_shards: list[list[Card]] = [[] for _ in range(num_shards)]
+    if initial_cards is not None:
+        for card_id, card in initial_cards.items():
+            if card.due is not None and card.due.tzinfo is not None:
+                card = Card(card_id, card.box, local_datetime(card.due))
+            initial_card_shards[card_id % num_shards].append(card)
+
+    scheduler_bytes = scheduler.to_bytes()
+    shard_args = [
+        (scheduler_bytes, bytes(log_shard), Card.pack_many(initial_card_shard))
+        for log_shard, initial_card_shard in zip(log_shards, initial_card_shards)
+        if log_shard
+    ]
+
+    if workers == 1:
+        results = [_replay_shard(*args) for args in shard_args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_replay_shard, *args) for args in shard_args]
+            results = [future.result() for future in futures]
+
+    cards = [card for result in results for card in Card.unpack_many(result)]
+    cards.sort(key=lambda card: card.card_id)
+
+    if scheduler.timezone is not None:
+        # due dates come back as local wall clock times
+        for card in cards:
+            if card.due is not None:
+                card.due = _local_midnight(scheduler.timezone, _to_epoch_day(card.due))
+
+    return cards
+
+
+def _replay_shard(
+    scheduler_bytes: bytes, log_shard: bytes, initial_card_shard: bytes
+) -> bytes:
+    # runs in a worker process, replaying one shard and returning the packed final cards
+    scheduler = Scheduler.from_bytes(scheduler_bytes)
+    initial_cards = {
+        card.card_id: card for card in Card.unpack_many(initial_card_shard)
+    }
+
+    cards = replay(scheduler, _iter_logs(log_shard), initial_cards)
+    if scheduler.timezone is not None:
+        # pack due dates as local wall clock times, which Card.to_bytes can encode
+        local_datetime = scheduler._local_datetime
+        cards = (
+            Card(card.card_id, card.box, card.due and local_datetime(card.due))
+            for card in cards
+        )
+
+    return Card.pack_many(cards)
+
+
+def _iter_logs(log_shard: bytes) -> Iterator[tuple]:
+    for card_id, box, rating, review_microseconds in _LOG_STRUCT.iter_unpack(log_shard):
+        review_datetime = _from_epoch_microseconds(review_microseconds)
+        yield card_id, box, None, rating, review_datetime
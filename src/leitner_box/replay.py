@@ -0,0 +1,102 @@
+"""
+leitner_box.replay
+
+This module defines functions that rebuild the state of cards from their review history.
+
+Replaying a card's review logs applies the box and due date rules of
+Scheduler.review_card to each review in turn, without building intermediate Card
+or ReviewLog objects. This is useful after changing a scheduler's box_intervals
+or on_fail, when every card has to be rescheduled under the new rules.
+
+Functions:
+    replay: Folds streams of review logs into the final state of each card.
+"""
+
+from datetime import datetime
+from typing import Iterable, Iterator, Mapping, Sequence, Union
+
+from .leitner_box import Card, ReviewLog, Scheduler
+
+ReplayableLog = Union[ReviewLog, Sequence]
+"""
+A ReviewLog, or a review log flattened to (card_id, box, due, rating, review_datetime, ...) like the tuples
+yielded by iter_review_logs(..., raw=True). review_datetime may be a datetime or an ISO 8601 string.
+"""
+
+
+def replay(
+    scheduler: Scheduler,
+    review_logs: Iterable[ReplayableLog],
+    initial_cards: Mapping[int, Card] | None = None,
+) -> Iterator[Card]:
+    """
+    Folds streams of review logs into the final state of each card, in one pass.
+
+    The review logs of each card must be contiguous and in the order they were reviewed, e.g. by sorting
+    them by card_id and review_datetime. A card's final state is yielded as soon as its last review log has
+    been read, so only one card is held in memory at a time.
+
+    Each card starts from its state in initial_cards, if it's there, and otherwise from the box recorded in
+    its first review log. Replaying then applies each rating at its review datetime. The logs are treated as
+    the source of truth, so reviews are never rejected for being early under the scheduler's rules.
+
+    To resume from a checkpoint, pass the cards from a previous replay as initial_cards and replay only the
+    review logs recorded since then.
+
+    Args:
+        scheduler (Scheduler): The scheduler whose rules are replayed.
+        review_logs (Iterable[ReplayableLog]): The review logs, grouped by card_id.
+        initial_cards (Mapping[int, Card] | None): The state of each card before its first review log, keyed by card_id.
+
+    Returns:
+        Iterator[Card]: The final state of each card, in the order their review logs appear.
+
+    Raises:
+        ValueError: If a card starts from the box in its first review log, and the scheduler doesn't have that box.
+    """
+
+    if initial_cards is None:
+        initial_cards = {}
+
+    num_boxes = len(scheduler.box_intervals)
+
+    next_box = scheduler._next_box
+    next_due = scheduler._next_due
+    local_datetime = scheduler._local_datetime
+    calendar = scheduler.box_calendar
+
+    card_id = None
+    box = 0
+    due: datetime | None = None
+    for review_log in review_logs:
+        if isinstance(review_log, ReviewLog):
+            log_card_id = review_log.card.card_id
+            log_box = review_log.card.box
+            rating = review_log.rating
+            review_datetime = review_log.review_datetime
+        else:
+            log_card_id, log_box, _, rating, review_datetime = review_log[:5]
+            if isinstance(review_datetime, str):
+                review_datetime = datetime.fromisoformat(review_datetime)
+
+        if log_card_id != card_id:
+            if card_id is not None:
+                yield Card(card_id=card_id, box=box, due=due)
+
+            card_id = log_card_id
+            if card_id in initial_cards:
+                initial_card = initial_cards[card_id]
+                box, due = initial_card.box, initial_card.due
+            else:
+                if not 1 <= log_box <= num_boxes:
+                    raise ValueError(
+                        f"The first review log of card {card_id} is of box {log_box}, but the "
+                        f"scheduler only has {num_boxes} boxes."
+                    )
+                box, due = log_box, None
+
+        box = next_box(box, rating)
+        due = next_due(box, local_datetime(review_datetime), calendar)
+
+    if card_id is not None:
+        yield Card(card_id=card_id, box=box, due=due)
@@ -0,0 +1,197 @@
+"""
+leitner_box.review_session
+
+This module defines the ReviewSession class, which serves the cards of a live study session in due order.
+
+Classes:
+    ReviewSession: A study session that keeps its cards in a priority queue ordered by due date.
+"""
+
+import heapq
+from datetime import datetime
+from typing import Iterable, Iterator
+
+from .leitner_box import Card, Rating, ReviewLog, Scheduler
+
+# the queue key of cards without a due date, which are always due
+_NO_DUE_KEY = datetime.min
+
+
+class ReviewSession:
+    """
+    A study session that keeps its cards in a priority queue ordered by due date, then card_id.
+
+    next_card returns the card that is due next, and review_card reviews a card with the session's scheduler
+    and re-queues it under its new due date. Both take O(log n) time for n cards, so no step of a session
+    rescans the deck. Cards without a due date are always due and come first.
+
+    Cards are queued by the wall clock time of their due date in the scheduler's timezone, so a scheduler with
+    a timezone, whose due dates are timezone-aware, works the same as one without.
+
+    Reviewed cards are re-queued without removing their old entry, which is skipped once it reaches the front
+    of the queue.
+
+    Attributes:
+        scheduler (Scheduler): The scheduler reviewing the cards.
+        max_reviews (int | None): The maximum number of reviews in the session, if specified.
+        num_reviews (int): The number of reviews made so far.
+    """
+
+    __slots__ = ("scheduler", "max_reviews", "num_reviews", "_cards", "_queue")
+
+    def __init__(
+        self,
+        scheduler: Scheduler,
+        cards: Iterable[Card],
+        max_cards: int | None = None,
+        max_reviews: int | None = None,
+    ) -> None:
+        """
+        Starts a study session.
+
+        Args:
+            scheduler (Scheduler): The scheduler reviewing the cards.
+            cards (Iterable[Card]): The cards to study.
+            max_cards (int | None): If specified, only the max_cards cards that are due first are studied.
+            max_reviews (int | None): If specified, next_card returns None once max_reviews reviews have been made.
+
+        Raises:
+            ValueError: If two cards have the same card_id.
+        """
+
+        self.scheduler = scheduler
+        self.max_reviews = max_reviews
+        self.num_reviews = 0
+
+        self._cards: dict[int, Card] = {}
+        for card in cards:
+            if card.card_id in self._cards:
+                raise ValueError(f"Card {card.card_id} is in the session twice.")
+            self._cards[card.card_id] = card
+
+        self._queue = [
+            (self._due_key(card.due), card_id) for card_id, card in self._cards.items()
+        ]
+        if max_cards is not None and max_cards < len(self._queue):
+            self._queue = heapq.nsmallest(max_cards, self._queue)
+            self._cards = {card_id: self._cards[card_id] for _, card_id in self._queue}
+        heapq.heapify(self._queue)
+
+    def __len__(self) -> int:
+        return len(self._cards)
+
+    def __contains__(self, card_id: object) -> bool:
+        return card_id in self._cards
+
+    def __iter__(self) -> Iterator[Card]:
+        return iter(self._cards.values())
+
+    def get(self, card_id: int) -> Card:
+        """
+        Returns the current state of the card with the given card_id.
+
+        Raises:
+            KeyError: If there is no card with the given card_id in the session.
+        """
+
+        return self._cards[card_id]
+
+    def add(self, card: Card) -> None:
+        """
+        Adds a card to the session.
+
+        Raises:
+            ValueError: If a card with the same card_id is already in the session.
+        """
+
+        if card.card_id in self._cards:
+            raise ValueError(f"Card {card.card_id} is already in the session.")
+
+        self._cards[card.card_id] = card
+        heapq.heappush(self._queue, (self._due_key(card.due), card.card_id))
+
+    def next_card(self, now: datetime | None = None) -> Card | None:
+        """
+        Returns the card that is due next, without removing it from the session.
+
+        Args:
+            now (datetime | None): The date and time to check against. Defaults to now.
+
+        Returns:
+            Card | None: The card due first, or None if no card is due at the given time or the session has
+                reached max_reviews.
+        """
+
+        if self.max_reviews is not None and self.num_reviews >= self.max_reviews:
+            return None
+
+        queue = self._queue
+        cards = self._cards
+        while queue:
+            due_key, card_id = queue[0]
+            card = cards.get(card_id)
+            if card is not None and self._due_key(card.due) == due_key:
+                break
+            # the card was reviewed or removed since this entry was queued
+            heapq.heappop(queue)
+        else:
+            return None
+
+        if now is None:
+            now = datetime.now(self.scheduler.timezone)
+        if due_key > self.scheduler._local_datetime(now):
+            return None
+
+        return card
+
+    def review_card(
+        self,
+        card_id: int,
+        rating: Rating,
+        review_datetime: datetime | None = None,
+        review_duration: int | None = None,
+    ) -> tuple[Card, ReviewLog]:
+        """
+        Reviews a card in the session with Scheduler.review_card and re-queues it under its new due date.
+
+        Args:
+            card_id (int): The id of the card being reviewed.
+            rating (Rating): The chosen rating for the card being reviewed.
+            review_datetime (datetime | None): The date and time of the review.
+            review_duration (int | None): The amount of time in miliseconds it took to review the card, if specified.
+
+        Returns:
+            tuple: A tuple containing the updated, reviewed card and its corresponding review log.
+
+        Raises:
+            KeyError: If there is no card with the given card_id in the session.
+            RuntimeError: If the card is reviewed at a time where it is not yet due.
+        """
+
+        card, review_log = self.scheduler.review_card(
+            self._cards[card_id], rating, review_datetime, review_duration
+        )
+
+        self._cards[card_id] = card
+        heapq.heappush(self._queue, (self._due_key(card.due), card_id))
+        self.num_reviews += 1
+
+        return card, review_log
+
+    def remove(self, card_id: int) -> None:
+        """
+        Removes the card with the given card_id from the session.
+
+        Raises:
+            KeyError: If there is no card with the given card_id in the session.
+        """
+
+        # its queue entries are skipped once they reach the front of the queue
+        del self._cards[card_id]
+
+    def _due_key(self, due: datetime | None) -> datetime:
+        # the timezone-naive wall clock time of the due date in the scheduler's timezone
+        if due is None:
+            return _NO_DUE_KEY
+
+        return self.scheduler._local_datetime(due)
@@ -0,0 +1,260 @@
+"""
+leitner_box.simulate
+
+This module defines functions that simulate learners studying with a Scheduler,
+for tuning box_intervals and on_fail.
+
+Cards in the same box that are due on the same day are indistinguishable to the
+scheduler, so instead of reviewing cards one at a time, the simulation reviews each
+day's cohort of cards in a box at once. The number of cards in a cohort that pass
+is sampled from a binomial distribution with the box's recall probability, and the
+passing and failing cards move to their next box and due day by the same rules as
+Scheduler.review_card. Sampling a cohort takes constant expected time however many
+cards it has, so a simulation's time only grows with its days and boxes.
+
+Classes:
+    SimulationResult: The reviews made during a simulation and the cards' final boxes.
+
+Functions:
+    simulate: Simulates a learner studying with a scheduler, day by day.
+    simulate_grid: Simulates the same learner with each of several schedulers, across processes.
+"""
+
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Callable, Iterable, Sequence, Union
+
+from .leitner_box import Rating, Scheduler, _binomial, _to_epoch_day
+
+RecallModel = Union[Sequence[float], Callable[[int], float]]
+"""
+The probability that a learner recalls a card in each box, either as a sequence indexed by box - 1 or as a
+callable that takes a box and returns its recall probability.
+"""
+
+
+class SimulationResult:
+    """
+    The reviews made during a simulation and the cards' final boxes.
+
+    Attributes:
+        scheduler (Scheduler): The simulated scheduler.
+        reviews (list[list[int]]): reviews[day][box - 1] is the number of reviews of cards in that box on that day.
+        passes (list[list[int]]): passes[day][box - 1] is the number of those reviews that passed.
+        box_counts (list[int]): box_counts[box - 1] is the number of cards in that box at the end of the simulation.
+    """
+
+    __slots__ = ("scheduler", "reviews", "passes", "box_counts")
+
+    def __init__(
+        self,
+        scheduler: Scheduler,
+        reviews: list[list[int]],
+        passes: list[list[int]],
+        box_counts: list[int],
+    ) -> None:
+        self.scheduler = scheduler
+        self.reviews = reviews
+        self.passes = passes
+        self.box_counts = box_counts
+
+    def __repr__(self) -> str:
+        return (
+            f"SimulationResult(box_intervals={self.scheduler.box_intervals}, "
+            f"on_fail={self.scheduler.on_fail!r}, total_reviews={self.total_reviews}, "
+            f"retention={self.retention:.4f})"
+        )
+
+    @property
+    def reviews_per_day(self) -> list[int]:
+        """The number of reviews on each day."""
+
+        return [sum(boxes) for boxes in self.reviews]
+
+    @property
+    def total_reviews(self) -> int:
+        """The number of reviews over the whole simulation."""
+
+        return sum(self.reviews_per_day)
+
+    @property
+    def max_daily_reviews(self) -> int:
+        """The number of reviews on the busiest day."""
+
+        return max(self.reviews_per_day, default=0)
+
+    @property
+    def retention(self) -> float:
+        """The fraction of reviews that passed, or 0.0 if there were no reviews."""
+
+        total_reviews = self.total_reviews
+        if total_reviews == 0:
+            return 0.0
+
+        return sum(sum(boxes) for boxes in self.passes) / total_reviews
+
+
+def simulate(
+    scheduler: Scheduler,
+    num_cards: int,
+    days: int,
+    recall_probabilities: RecallModel,
+    new_cards_per_day: int | None = None,
+    start_datetime: datetime | None = None,
+    seed: int | None = None,
+) -> SimulationResult:
+    """
+    Simulates a learner studying with a scheduler, day by day.
+
+    New cards start in box 1 and are reviewed on the day they're introduced. Every card is reviewed on the day it
+    becomes due, and passes with the recall probability of its box.
+
+    Args:
+        scheduler (Scheduler): The scheduler to simulate.
+        num_cards (int): The number of cards studied.
+        days (int): The number of days to simulate, starting with the day of start_datetime.
+        recall_probabilities (RecallModel): The probability that the learner recalls a card in each box.
+        new_cards_per_day (int | None): The number of new cards introduced each day until all num_cards have been. Defaults to introducing every card on the first day.
+        start_datetime (datetime | None): When the simulation starts. Defaults to the scheduler's start_datetime.
+        seed (int | None): The random seed, if specified. Simulations with the same seed and arguments give the same result.
+
+    Returns:
+        SimulationResult: The reviews made during the simulation and the cards' final boxes.
+
+    Raises:
+        ValueError: If there isn't a recall probability for every box, or one isn't between 0 and 1.
+    """
+
+    num_boxes = len(scheduler.box_intervals)
+    recall = _recall_probabilities(recall_probabilities, num_boxes)
+
+    if start_datetime is None:
+        start_datetime = scheduler.start_datetime
+    if new_cards_per_day is None:
+        new_cards_per_day = num_cards
+
+    start_day = _to_epoch_day(start_datetime)
+    next_due_day = scheduler.box_calendar._next_due_day
+    # the boxes that cards in each box move to when they pass or fail
+    next_boxes = [
+        (
+            scheduler._next_box(box, Rating.Pass),
+            scheduler._next_box(box, Rating.Fail),
+        )
+        for box in range(1, num_boxes + 1)
+    ]
+
+    rng = random.Random(seed)
+    pending = [[0] * num_boxes for _ in range(days)]
+    reviews = [[0] * num_boxes for _ in range(days)]
+    passes = [[0] * num_boxes for _ in range(days)]
+    box_counts = [0] * num_boxes
+    num_new_cards = num_cards
+
+    for day in range(days):
+        new_cards = min(new_cards_per_day, num_new_cards)
+        num_new_cards -= new_cards
+        pending[day][0] += new_cards
+        box_counts[0] += new_cards
+
+        for box, count in enumerate(pending[day], start=1):
+            if not count:
+                continue
+
+            num_passed = _binomial(rng, count, recall[box - 1])
+            reviews[day][box - 1] = count
+            passes[day][box - 1] = num_passed
+            box_counts[box - 1] -= count
+
+            for next_box, num_moved in zip(
+                next_boxes[box - 1], (num_passed, count - num_passed)
+            ):
+                box_counts[next_box - 1] += num_moved
+                next_day = next_due_day(next_box, start_day + day) - start_day
+                if next_day < days:
+                    pending[next_day][next_box - 1] += num_moved
+
+    return SimulationResult(scheduler, reviews, passes, box_counts)
+
+
+def simulate_grid(
+    schedulers: Iterable[Scheduler],
+    num_cards: int,
+    days: int,
+    recall_probabilities: RecallModel,
+    new_cards_per_day: int | None = None,
+    start_datetime: datetime | None = None,
+    seed: int | None = None,
+    workers: int = 1,
+) -> list[SimulationResult]:
+    """
+    Simulates the same learner with each of several schedulers, e.g. a grid of box_intervals and on_fail settings.
+
+    Every scheduler is simulated with the same seed, so differences between their results come from the schedulers
+    rather than from chance. When workers is more than 1, recall_probabilities must be picklable.
+
+    Args:
+        schedulers (Iterable[Scheduler]): The schedulers to simulate.
+        num_cards (int): The number of cards studied.
+        days (int): The number of days to simulate.
+        recall_probabilities (RecallModel): The probability that the learner recalls a card in each box.
+        new_cards_per_day (int | None): The number of new cards introduced each day. Defaults to introducing every card on the first day.
+        start_datetime (datetime | None): When the simulations start. Defaults to each scheduler's start_datetime.
+        seed (int | None): The random seed, if specified.
+        workers (int): The number of worker processes. With one worker, everything is simulated in this process.
+
+    Returns:
+        list[SimulationResult]: The result of each scheduler's simulation, in the same order as schedulers.
+
+    Raises:
+        ValueError: If workers is less than 1, or recall_probabilities isn't valid for one of the schedulers.
+    """
+
+    if workers < 1:
+        raise ValueError(f"workers must be at least 1, but got {workers}.")
+
+    args = [
+        (
+            scheduler,
+            num_cards,
+            days,
+            recall_probabilities,
+            new_cards_per_day,
+            start_datetime,
+            seed,
+        )
+        for scheduler in schedulers
+    ]
+
+    if workers == 1:
+        return [simulate(*scheduler_args) for scheduler_args in args]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(simulate, *scheduler_args) for scheduler_args in args
+        ]
+        return [future.result() for future in futures]
+
+
+def _recall_probabilities(
+    recall_probabilities: RecallModel, num_boxes: int
+) -> list[float]:
+    if callable(recall_probabilities):
+        recall = [recall_probabilities(box) for box in range(1, num_boxes + 1)]
+    else:
+        recall = list(recall_probabilities)
+        if len(recall) < num_boxes:
+            raise ValueError(
+                f"Expected a recall probability for each of {num_boxes} boxes, "
+                f"but got {len(recall)}."
+            )
+
+    for box, probability in enumerate(recall[:num_boxes], start=1):
+        if not 0.0 <= probability <= 1.0:
+            raise ValueError(
+                f"The recall probability of box {box} must be between 0 and 1, "
+                f"but got {probability}."
+            )
+
+    return recall[:num_boxes]
@@ -0,0 +1,433 @@
+"""
+leitner_box.sqlite_store
+
+This module defines the SQLiteStore class, which persists cards and review logs in an SQLite database.
+
+Cards are stored in a typed table indexed on (due, box), and review logs are appended
+to a second table. Reviews made with SQLiteStore.review_and_persist are buffered and
+written in batches, with one executemany upsert of the cards and one executemany
+insert of the review logs per transaction. The database runs in WAL mode, so readers
+aren't blocked while a batch is written.
+
+A store opened with a timezone holds the timezone-aware due dates of a Scheduler
+with that timezone. They are stored as utc epoch seconds, so they stay ordered
+across daylight saving time changes, and are read back in the store's timezone.
+
+Classes:
+    SQLiteStore: Persists cards and review logs in an SQLite database.
+"""
+
+import os
+import sqlite3
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Iterable, Iterator
+
+from .leitner_box import (
+    Card,
+    Rating,
+    ReviewLog,
+    Scheduler,
+    _ONE_SECOND,
+    _UTC_EPOCH,
+    _aware_due_from_epoch_seconds,
+    _aware_due_to_epoch_seconds,
+    _due_from_epoch_seconds,
+    _due_to_epoch_seconds,
+    _from_epoch_microseconds,
+    _timezone_name,
+    _to_epoch_microseconds,
+    _to_epoch_seconds,
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cards (
+    card_id INTEGER PRIMARY KEY,
+    box INTEGER NOT NULL,
+    due INTEGER
+);
+CREATE INDEX IF NOT EXISTS cards_due_box ON cards (due, box);
+CREATE TABLE IF NOT EXISTS review_logs (
+    card_id INTEGER NOT NULL,
+    box INTEGER NOT NULL,
+    due INTEGER,
+    rating INTEGER NOT NULL,
+    review_datetime INTEGER NOT NULL,
+    utc_offset INTEGER,
+    review_duration INTEGER
+);
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_UPSERT_CARD = """
+INSERT INTO cards (card_id, box, due) VALUES (?, ?, ?)
+ON CONFLICT (card_id) DO UPDATE SET box = excluded.box, due = excluded.due
+"""
+
+_INSERT_REVIEW_LOG = """
+INSERT INTO review_logs
+    (card_id, box, due, rating, review_datetime, utc_offset, review_duration)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+_CardRow = tuple[int, int, int | None]
+_ReviewLogRow = tuple[int, int, int | None, int, int, int | None, int | None]
+
+
+class SQLiteStore:
+    """
+    Persists cards and review logs in an SQLite database.
+
+    Due dates are stored as epoch seconds and must be whole seconds. Without a timezone, they must be
+    timezone-naive, like the due dates set by a Scheduler without a timezone. With a timezone, they must be
+    timezone-aware, like the due dates set by a Scheduler with a timezone, and are read back in that timezone.
+    The timezone is recorded in the database when it's created, and it must be opened with the same one.
+    Cards without a due date are stored with a NULL due date and are always due.
+    Review datetimes are stored as epoch microseconds of their wall clock time, with their utc offset, so like
+    ReviewLog.to_bytes, named timezones are read back as fixed utc offsets.
+
+    Reviews made with review_and_persist are written once batch_size of them are buffered, and when the store is
+    flushed or closed. Reads flush the buffer first. Use the store as a context manager, or call close when done.
+
+    Attributes:
+        path (str | os.PathLike): The path of the database file.
+        batch_size (int): The number of buffered reviews that are written in one transaction.
+        timezone (tzinfo | None): The timezone of the stored due dates, or None if they are timezone-naive.
+    """
+
+    __slots__ = (
+        "path",
+        "batch_size",
+        "timezone",
+        "_connection",
+        "_pending_cards",
+        "_pending_review_logs",
+    )
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        batch_size: int = 10_000,
+        timezone: tzinfo | None = None,
+    ) -> None:
+        """
+        Opens the database at path, creating it and its tables if they don't exist.
+
+        Args:
+            path (str | os.PathLike): The path of the database file.
+            batch_size (int): The number of buffered reviews that are written in one transaction.
+            timezone (tzinfo | None): The timezone of the stored due dates, a ZoneInfo timezone or timezone.utc.
+                Defaults to None, for timezone-naive due dates.
+
+        Raises:
+            ValueError: If batch_size is less than 1, if the timezone isn't a ZoneInfo timezone or timezone.utc,
+                or if the database was created with a different timezone.
+        """
+
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be at least 1, but got {batch_size}.")
+
+        timezone_name = None if timezone is None else _timezone_name(timezone)
+
+        self.path = path
+        self.batch_size = batch_size
+        self.timezone = timezone
+
+        self._connection = sqlite3.connect(path)
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        # in WAL mode, a crash can lose the last transactions but never corrupts the database
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        self._connection.executescript(_SCHEMA)
+
+        try:
+            self._check_timezone(timezone_name)
+        except BaseException:
+            self._connection.close()
+            raise
+
+        self._pending_cards: dict[int, _CardRow] = {}
+        self._pending_review_logs: list[_ReviewLogRow] = []
+
+    def __enter__(self) -> "SQLiteStore":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        self.flush()
+        (num_cards,) = self._connection.execute("SELECT COUNT(*) FROM cards").fetchone()
+
+        return num_cards
+
+    def _check_timezone(self, timezone_name: str | None) -> None:
+        row = self._connection.execute(
+            "SELECT value FROM settings WHERE key = 'timezone'"
+        ).fetchone()
+        if row is None:
+            # a database with rows but no recorded timezone predates the setting, and
+            # only holds timezone-naive due dates
+            is_empty = self._connection.execute(
+                "SELECT NOT EXISTS (SELECT 1 FROM cards)"
+                " AND NOT EXISTS (SELECT 1 FROM review_logs)"
+            ).fetchone()[0]
+            with self._connection:
+                self._connection.execute(
+                    "INSERT INTO settings (key, value) VALUES ('timezone', ?)",
+                    (timezone_name if is_empty else None,),
+                )
+            row = self._connection.execute(
+                "SELECT value FROM settings WHERE key = 'timezone'"
+            ).fetchone()
+
+        (stored_timezone_name,) = row
+        if stored_timezone_name != timezone_name:
+            raise ValueError(
+                f"The database {self.path} holds due dates in timezone "
+                f"{stored_timezone_name}, but was opened with timezone {timezone_name}."
+            )
+
+    def upsert_cards(self, cards: Iterable[Card]) -> None:
+        """
+        Inserts cards, or updates their box and due date if they are already stored, in one transaction.
+
+        Raises:
+            ValueError: If a card's due date can't be stored as epoch seconds.
+        """
+
+        self.flush()
+        with self._connection:
+            self._connection.executemany(
+                _UPSERT_CARD, (_card_row(card, self.timezone) for card in cards)
+            )
+
+    def append_review_logs(self, review_logs: Iterable[ReviewLog]) -> None:
+        """
+        Appends review logs, in one transaction.
+
+        Raises:
+            ValueError: If the due date of a review log's card can't be stored as epoch seconds.
+        """
+
+        self.flush()
+        with self._connection:
+            self._connection.executemany(
+                _INSERT_REVIEW_LOG,
+                (
+                    _review_log_row(review_log, self.timezone)
+                    for review_log in review_logs
+                ),
+            )
+
+    def review_and_persist(
+        self,
+        scheduler: Scheduler,
+        card: Card,
+        rating: Rating,
+        review_datetime: datetime | None = None,
+        review_duration: int | None = None,
+    ) -> tuple[Card, ReviewLog]:
+        """
+        Reviews a card with Scheduler.review_card, and buffers the reviewed card and its review log to be persisted.
+
+        Args:
+            scheduler (Scheduler): The scheduler reviewing the card.
+            card (Card): The card being reviewed.
+            rating (Rating): The chosen rating for the card being reviewed.
+            review_datetime (datetime | None): The date and time of the review.
+            review_duration (int | None): The amount of time in miliseconds it took to review the card, if specified.
+
+        Returns:
+            tuple: A tuple containing the updated, reviewed card and its corresponding review log.
+
+        Raises:
+            RuntimeError: If the card is reviewed at a time where it is not yet due.
+            ValueError: If the scheduler has a timezone and the store doesn't, or the other way around, in which
+                case the card isn't reviewed, or if the card's due date can't be stored as epoch seconds.
+        """
+
+        if (scheduler.timezone is None) != (self.timezone is None):
+            raise ValueError(
+                f"The scheduler's timezone is {scheduler.timezone}, but the store's "
+                f"timezone is {self.timezone}. Open the store with the scheduler's timezone."
+            )
+
+        card, review_log = scheduler.review_card(
+            card, rating, review_datetime, review_duration
+        )
+
+        # encoded now, so that a card that can't be stored is reported by its own review
+        card_row = _card_row(card, self.timezone)
+        review_log_row = _review_log_row(review_log, self.timezone)
+        self._pending_cards[card.card_id] = card_row
+        self._pending_review_logs.append(review_log_row)
+        if len(self._pending_review_logs) >= self.batch_size:
+            self.flush()
+
+        return card, review_log
+
+    def get(self, card_id: int) -> Card:
+        """
+        Returns the stored card with the given card_id.
+
+        Raises:
+            KeyError: If there is no card with the given card_id in the store.
+        """
+
+        self.flush()
+        row = self._connection.execute(
+            "SELECT card_id, box, due FROM cards WHERE card_id = ?", (card_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(card_id)
+
+        return _card_from_row(row, self.timezone)
+
+    def due_cards(
+        self, now: datetime | None = None, limit: int | None = None
+    ) -> list[Card]:
+        """
+        Returns the cards that are due for review, ordered by due date.
+
+        Args:
+            now (datetime | None): The date and time to check against. Defaults to now. If the store has a
+                timezone, a timezone-naive now is the wall clock time in that timezone.
+            limit (int | None): The maximum number of cards to return, if specified.
+
+        Returns:
+            list[Card]: The cards that are due at the given time.
+        """
+
+        if now is None:
+            now = datetime.now(self.timezone)
+
+        if self.timezone is None:
+            now_seconds = _to_epoch_seconds(now)
+        else:
+            if now.tzinfo is None:
+                now = now.replace(tzinfo=self.timezone)
+            now_seconds = (now - _UTC_EPOCH) // _ONE_SECOND
+
+        self.flush()
+        rows = self._connection.execute(
+            "SELECT card_id, box, due FROM cards"
+            " WHERE due IS NULL OR due <= ? ORDER BY due, card_id LIMIT ?",
+            (now_seconds, -1 if limit is None else limit),
+        )
+
+        return [_card_from_row(row, self.timezone) for row in rows]
+
+    def iter_review_logs(self, card_id: int | None = None) -> Iterator[ReviewLog]:
+        """
+        Lazily reads the stored review logs, in the order they were appended.
+
+        Args:
+            card_id (int | None): If specified, only the review logs of the card with this card_id are read.
+
+        Returns:
+            Iterator[ReviewLog]: The review logs.
+        """
+
+        self.flush()
+        query = (
+            "SELECT card_id, box, due, rating, review_datetime, utc_offset,"
+            " review_duration FROM review_logs"
+        )
+        if card_id is None:
+            rows = self._connection.execute(query + " ORDER BY rowid")
+        else:
+            rows = self._connection.execute(
+                query + " WHERE card_id = ? ORDER BY rowid", (card_id,)
+            )
+
+        for row in rows:
+            yield _review_log_from_row(row, self.timezone)
+
+    def flush(self) -> None:
+        """
+        Writes the buffered reviews in one transaction.
+        """
+
+        if not self._pending_review_logs:
+            return
+
+        with self._connection:
+            self._connection.executemany(_UPSERT_CARD, self._pending_cards.values())
+            self._connection.executemany(_INSERT_REVIEW_LOG, self._pending_review_logs)
+
+        self._pending_cards.clear()
+        self._pending_review_logs.clear()
+
+    def close(self) -> None:
+        """
+        Writes the buffered reviews and closes the database.
+        """
+
+        self.flush()
+        self._connection.close()
+
+
+def _card_row(card: Card, tz: tzinfo | None) -> _CardRow:
+    if card.due is None:
+        due = None
+    elif tz is None:
+        due = _due_to_epoch_seconds(card.due)
+    else:
+        due = _aware_due_to_epoch_seconds(card.due)
+
+    return card.card_id, card.box, due
+
+
+def _card_from_row(row: _CardRow, tz: tzinfo | None) -> Card:
+    card_id, box, due_seconds = row
+
+    if due_seconds is None:
+        due = None
+    elif tz is None:
+        due = _due_from_epoch_seconds(due_seconds)
+    else:
+        due = _aware_due_from_epoch_seconds(due_seconds, tz)
+
+    return Card(card_id=card_id, box=box, due=due)
+
+
+def _review_log_row(review_log: ReviewLog, tz: tzinfo | None) -> _ReviewLogRow:
+    card_id, box, due = _card_row(review_log.card, tz)
+    utc_offset = review_log.review_datetime.utcoffset()
+
+    return (
+        card_id,
+        box,
+        due,
+        review_log.rating,
+        _to_epoch_microseconds(review_log.review_datetime),
+        None if utc_offset is None else utc_offset // _ONE_SECOND,
+        review_log.review_duration,
+    )
+
+
+def _review_log_from_row(row: _ReviewLogRow, tz: tzinfo | None) -> ReviewLog:
+    (
+        card_id,
+        box,
+        due,
+        rating,
+        review_microseconds,
+        utc_offset,
+        review_duration,
+    ) = row
+
+    review_datetime = _from_epoch_microseconds(review_microseconds)
+    if utc_offset is not None:
+        review_datetime = review_datetime.replace(
+            tzinfo=timezone(timedelta(seconds=utc_offset))
+        )
+
+    return ReviewLog(
+        card=_card_from_row((card_id, box, due), tz),
+        rating=Rating(rating),
+        review_datetime=review_datetime,
+        review_duration=review_duration,
+    )
@@ -0,0 +1,254 @@
+"""
+leitner_box.stats
+
+This module defines the ReviewStats class, which aggregates review histories in one streaming pass.
+
+Review logs are read one at a time and folded into counters, without building
+Card or ReviewLog objects, so the aggregates of a history of any size are computed
+in constant memory per box and per day. Review logs can be ReviewLog objects,
+ReviewLog.to_dict dicts, or tuples like those yielded by iter_review_logs(...,
+raw=True) and ReviewLogArchive.scan_raw.
+
+ReviewStats are mergeable: the stats of the shards of a history, e.g. computed in
+separate processes, merge into the stats of the whole history.
+
+Classes:
+    ReviewStats: Aggregates of a review history.
+
+Functions:
+    compute_stats: Computes the aggregates of review logs in one pass.
+"""
+
+from datetime import date
+from typing import Any, Iterable, Sequence, Union
+
+from .leitner_box import Rating, ReviewLog, Scheduler
+
+AggregatableLog = Union[ReviewLog, dict[str, Any], Sequence]
+"""
+A ReviewLog, a ReviewLog.to_dict dict, or a review log flattened to (card_id, box, due, rating,
+review_datetime, review_duration) like the tuples yielded by iter_review_logs(..., raw=True).
+review_datetime may be a datetime or an ISO 8601 string.
+"""
+
+
+class ReviewStats:
+    """
+    Aggregates of a review history: the number of reviews per box and rating, the number of reviews per day,
+    and the total duration of the reviews with a review_duration.
+
+    Reviews are counted on the date of their review datetime's wall clock time, ignoring its timezone, and
+    by the box the card was in before the review.
+
+    Attributes:
+        outcomes (dict[tuple[int, int], int]): The number of reviews of each (box, rating).
+        daily_reviews (dict[date, int]): The number of reviews on each day.
+        total_review_duration (int): The total review_duration in miliseconds of the reviews that have one.
+        num_timed_reviews (int): The number of reviews that have a review_duration.
+    """
+
+    __slots__ = (
+        "outcomes",
+        "daily_reviews",
+        "total_review_duration",
+        "num_timed_reviews",
+    )
+
+    def __init__(self) -> None:
+        self.outcomes: dict[tuple[int, int], int] = {}
+        self.daily_reviews: dict[date, int] = {}
+        self.total_review_duration = 0
+        self.num_timed_reviews = 0
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ReviewStats):
+            return NotImplemented
+
+        return self.to_dict() == other.to_dict()
+
+    @property
+    def num_reviews(self) -> int:
+        """The total number of reviews."""
+
+        return sum(self.outcomes.values())
+
+    @property
+    def box_reviews(self) -> dict[int, int]:
+        """The number of reviews of cards in each box, ordered by box."""
+
+        box_reviews: dict[int, int] = {}
+        for (box, _), count in sorted(self.outcomes.items()):
+            box_reviews[box] = box_reviews.get(box, 0) + count
+
+        return box_reviews
+
+    @property
+    def pass_rates(self) -> dict[int, float]:
+        """The fraction of the reviews of cards in each box that passed, ordered by box."""
+
+        return {
+            box: self.outcomes.get((box, Rating.Pass), 0) / count
+            for box, count in self.box_reviews.items()
+        }
+
+    @property
+    def mean_review_duration(self) -> float | None:
+        """The mean review_duration in miliseconds of the reviews that have one, or None if none do."""
+
+        if self.num_timed_reviews == 0:
+            return None
+
+        return self.total_review_duration / self.num_timed_reviews
+
+    def update(self, review_logs: Iterable[AggregatableLog]) -> None:
+        """
+        Adds review logs to the aggregates.
+
+        The review logs are aggregated apart and merged once they have all been read, so if reading or
+        aggregating one raises, the aggregates are left unchanged.
+
+        Args:
+            review_logs (Iterable[AggregatableLog]): The review logs, in any order. They are consumed one at a time.
+        """
+
+        outcomes: dict[tuple[int, int], int] = {}
+        daily_reviews: dict[date, int] = {}
+        # ISO 8601 review datetimes are counted by date string, and parsed once per day
+        iso_daily_reviews: dict[str, int] = {}
+        total_review_duration = 0
+        num_timed_reviews = 0
+
+        for review_log in review_logs:
+            if isinstance(review_log, tuple):
+                box = review_log[1]
+                rating = review_log[3]
+                review_datetime = review_log[4]
+                review_duration = review_log[5]
+            elif isinstance(review_log, ReviewLog):
+                box = review_log.card.box
+                rating = review_log.rating
+                review_datetime = review_log.review_datetime
+                review_duration = review_log.review_duration
+            elif isinstance(review_log, dict):
+                box = review_log["card"]["box"]
+                rating = review_log["rating"]
+                review_datetime = review_log["review_datetime"]
+                review_duration = review_log["review_duration"]
+            else:
+                _, box, _, rating, review_datetime, review_duration = review_log[:6]
+
+            key = (box, rating)
+            outcomes[key] = outcomes.get(key, 0) + 1
+
+            if isinstance(review_datetime, str):
+                iso_day = review_datetime[:10]
+                iso_daily_reviews[iso_day] = iso_daily_reviews.get(iso_day, 0) + 1
+            else:
+                review_day = review_datetime.date()
+                daily_reviews[review_day] = daily_reviews.get(review_day, 0) + 1
+
+            if review_duration is not None:
+                total_review_duration += review_duration
+                num_timed_reviews += 1
+
+        for iso_day, count in iso_daily_reviews.items():
+            review_day = date.fromisoformat(iso_day)
+            daily_reviews[review_day] = daily_reviews.get(review_day, 0) + count
+
+        for key, count in outcomes.items():
+            self.outcomes[key] = self.outcomes.get(key, 0) + count
+        for review_day, count in daily_reviews.items():
+            self.daily_reviews[review_day] = (
+                self.daily_reviews.get(review_day, 0) + count
+            )
+        self.total_review_duration += total_review_duration
+        self.num_timed_reviews += num_timed_reviews
+
+    def merge(self, other: "ReviewStats") -> None:
+        """
+        Adds the aggregates of another ReviewStats, e.g. of another shard of the review history.
+        """
+
+        for key, count in other.outcomes.items():
+            self.outcomes[key] = self.outcomes.get(key, 0) + count
+        for day, count in other.daily_reviews.items():
+            self.daily_reviews[day] = self.daily_reviews.get(day, 0) + count
+        self.total_review_duration += other.total_review_duration
+        self.num_timed_reviews += other.num_timed_reviews
+
+    def transition_matrix(self, scheduler: Scheduler) -> list[list[int]]:
+        """
+        Returns the number of reviews that moved a card from each box to each box, under a scheduler's rules.
+
+        Args:
+            scheduler (Scheduler): The scheduler whose box_intervals and on_fail decide where each review moved its card.
+
+        Returns:
+            list[list[int]]: A matrix where row i, column j holds the number of reviews that moved a card from
+                box i + 1 to box j + 1.
+
+        Raises:
+            ValueError: If a review was of a card in a box the scheduler doesn't have.
+        """
+
+        num_boxes = len(scheduler.box_intervals)
+        matrix = [[0] * num_boxes for _ in range(num_boxes)]
+        for (box, rating), count in self.outcomes.items():
+            if not 1 <= box <= num_boxes:
+                raise ValueError(
+                    f"A review was of a card in box {box}, but the scheduler only has "
+                    f"{num_boxes} boxes."
+                )
+            next_box = scheduler._next_box(box, Rating(rating))
+            matrix[box - 1][next_box - 1] += count
+
+        return matrix
+
+    def to_dict(self) -> dict[str, Any]:
+        return_dict = {
+            "outcomes": [
+                [box, int(rating), count]
+                for (box, rating), count in sorted(self.outcomes.items())
+            ],
+            "daily_reviews": {
+                day.isoformat(): count
+                for day, count in sorted(self.daily_reviews.items())
+            },
+            "total_review_duration": self.total_review_duration,
+            "num_timed_reviews": self.num_timed_reviews,
+        }
+
+        return return_dict
+
+    @staticmethod
+    def from_dict(source_dict: dict[str, Any]) -> "ReviewStats":
+        stats = ReviewStats()
+        stats.outcomes = {
+            (int(box), int(rating)): int(count)
+            for box, rating, count in source_dict["outcomes"]
+        }
+        stats.daily_reviews = {
+            date.fromisoformat(day): int(count)
+            for day, count in source_dict["daily_reviews"].items()
+        }
+        stats.total_review_duration = int(source_dict["total_review_duration"])
+        stats.num_timed_reviews = int(source_dict["num_timed_reviews"])
+
+        return stats
+
+
+def compute_stats(review_logs: Iterable[AggregatableLog]) -> ReviewStats:
+    """
+    Computes the aggregates of review logs in one pass.
+
+    Args:
+        review_logs (Iterable[AggregatableLog]): The review logs, in any order. They are consumed one at a time.
+
+    Returns:
+        ReviewStats: The aggregates of the review logs.
+    """
+
+    stats = ReviewStats()
+    stats.update(review_logs)
+
+    return stats
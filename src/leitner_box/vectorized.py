@@ -0,0 +1,256 @@
+"""
+leitner_box.vectorized
+
+This module defines NumPy-vectorized versions of the box and due date updates
+made by Scheduler.review_card.
+
+Cards are represented by parallel arrays of boxes and due dates, where due dates
+are int64 day numbers counted from 1970-01-01, in the scheduler's timezone if it has
+one. Cards without a due date use the NO_DUE sentinel. Due dates are compared to
+reviews by their day, so they must be at the beginning of a day, like the due dates
+set by Scheduler.review_card. dues_to_days checks that they are. Every function
+returns exactly the boxes and due dates that Scheduler.review_card would give each
+card.
+
+NumPy is an optional dependency of leitner_box and must be installed to use this module.
+
+Functions:
+    datetimes_to_days: Converts datetimes to an array of day numbers.
+    dues_to_days: Converts due dates to an array of day numbers, checking that each is at the beginning of a day.
+    days_to_datetimes: Converts an array of day numbers back to datetimes.
+    next_boxes: Computes the boxes that cards move to after being reviewed.
+    next_due_days: Computes the day that cards in the given boxes are next due after a review.
+    review: Reviews arrays of cards in a single vectorized pass.
+"""
+
+from datetime import datetime
+from typing import Iterable
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError(
+        "leitner_box.vectorized requires numpy. Install it with `pip install numpy`."
+    ) from e
+
+from .leitner_box import (
+    Rating,
+    Scheduler,
+    _EPOCH_ORDINAL,
+    _from_epoch_day,
+    _local_midnight,
+    _to_epoch_day,
+)
+
+NO_DUE = np.iinfo(np.int64).min
+"""Day number used for cards that do not have a due date yet."""
+
+
+def datetimes_to_days(
+    datetimes: Iterable[datetime | None], scheduler: Scheduler | None = None
+) -> np.ndarray:
+    """
+    Converts datetimes to an array of day numbers.
+
+    Timezone-aware datetimes are converted to the scheduler's timezone first, the same way Scheduler.review_card
+    converts them. Without a scheduler, or if the scheduler has no timezone, timezone info is dropped.
+
+    Args:
+        datetimes (Iterable[datetime | None]): The datetimes to convert. None is converted to NO_DUE.
+        scheduler (Scheduler | None): The scheduler the day numbers are passed to. Required to convert the
+            review datetimes and due dates of a scheduler with a timezone.
+
+    Returns:
+        np.ndarray: An int64 array of day numbers.
+    """
+
+    if scheduler is None or scheduler.timezone is None:
+        return np.fromiter(
+            (NO_DUE if dt is None else _to_epoch_day(dt) for dt in datetimes),
+            dtype=np.int64,
+        )
+
+    local_datetime = scheduler._local_datetime
+    return np.fromiter(
+        (
+            NO_DUE if dt is None else _to_epoch_day(local_datetime(dt))
+            for dt in datetimes
+        ),
+        dtype=np.int64,
+    )
+
+
+def dues_to_days(
+    dues: Iterable[datetime | None], scheduler: Scheduler | None = None
+) -> np.ndarray:
+    """
+    Converts due dates to an array of day numbers, like datetimes_to_days.
+
+    review compares due dates to reviews by their day, so each due date must be at the beginning of its day, in
+    the scheduler's timezone if it has one, like the due dates set by Scheduler.review_card.
+
+    Args:
+        dues (Iterable[datetime | None]): The due dates to convert. None is converted to NO_DUE.
+        scheduler (Scheduler | None): The scheduler the day numbers are passed to. Required to convert the due
+            dates of a scheduler with a timezone.
+
+    Returns:
+        np.ndarray: An int64 array of day numbers.
+
+    Raises:
+        ValueError: If a due date isn't at the beginning of its day.
+    """
+
+    tz = None if scheduler is None else scheduler.timezone
+
+    days = []
+    for due in dues:
+        if due is None:
+            days.append(NO_DUE)
+            continue
+
+        if tz is None:
+            local_due = due.replace(tzinfo=None)
+            day = _to_epoch_day(local_due)
+            day_start = _from_epoch_day(day)
+        else:
+            assert scheduler is not None
+            local_due = scheduler._local_datetime(due)
+            day = _to_epoch_day(local_due)
+            day_start = _local_midnight(tz, day).replace(tzinfo=None)
+
+        if local_due != day_start:
+            raise ValueError(
+                f"Due date {due} must be at the beginning of its day to be reviewed by day."
+            )
+        days.append(day)
+
+    return np.array(days, dtype=np.int64)
+
+
+def days_to_datetimes(
+    days: np.ndarray, scheduler: Scheduler | None = None
+) -> list[datetime | None]:
+    """
+    Converts an array of day numbers back to datetimes at the beginning of each day.
+
+    Args:
+        days (np.ndarray): The day numbers to convert. NO_DUE is converted to None.
+        scheduler (Scheduler | None): The scheduler the day numbers came from. If it has a timezone, each day is
+            converted to its local midnight in that timezone, like the due dates set by Scheduler.review_card.
+
+    Returns:
+        list[datetime | None]: The datetimes of each day, timezone-naive unless the scheduler has a timezone.
+    """
+
+    if scheduler is None or scheduler.timezone is None:
+        return [
+            None if day == NO_DUE else datetime.fromordinal(day + _EPOCH_ORDINAL)
+            for day in days.tolist()
+        ]
+
+    tz = scheduler.timezone
+    return [
+        None if day == NO_DUE else _local_midnight(tz, day) for day in days.tolist()
+    ]
+
+
+def next_boxes(
+    scheduler: Scheduler, boxes: np.ndarray, ratings: np.ndarray
+) -> np.ndarray:
+    """
+    Computes the boxes that cards move to after being reviewed.
+
+    Args:
+        scheduler (Scheduler): The scheduler whose on_fail and box_intervals are used.
+        boxes (np.ndarray): The current box of each card.
+        ratings (np.ndarray): The rating given to each card.
+
+    Returns:
+        np.ndarray: The new box of each card.
+    """
+
+    boxes = np.asarray(boxes, dtype=np.int64)
+    ratings = np.asarray(ratings)
+
+    if scheduler.on_fail == "first_box":
+        failed_boxes = np.ones_like(boxes)
+    elif scheduler.on_fail == "prev_box":
+        failed_boxes = np.where(boxes > 1, boxes - 1, boxes)
+    else:
+        failed_boxes = boxes
+
+    passed_boxes = np.where(boxes < len(scheduler.box_intervals), boxes + 1, boxes)
+
+    return np.where(
+        ratings == Rating.Fail,
+        failed_boxes,
+        np.where(ratings == Rating.Pass, passed_boxes, boxes),
+    )
+
+
+def next_due_days(
+    scheduler: Scheduler, boxes: np.ndarray, review_days: np.ndarray
+) -> np.ndarray:
+    """
+    Computes the day that cards in the given boxes are next due after a review.
+
+    Args:
+        scheduler (Scheduler): The scheduler whose box_intervals and start_datetime are used.
+        boxes (np.ndarray): The box of each card after its review.
+        review_days (np.ndarray): The day number of each review.
+
+    Returns:
+        np.ndarray: The day number that each card is next due.
+    """
+
+    intervals = np.asarray(scheduler.box_intervals, dtype=np.int64)[
+        np.asarray(boxes, dtype=np.int64) - 1
+    ]
+    begin_day = scheduler.box_calendar.begin_day
+
+    elapsed_days = np.asarray(review_days, dtype=np.int64) - begin_day
+    num_intervals = np.maximum(elapsed_days // intervals, 0) + 1
+
+    return begin_day + intervals * num_intervals
+
+
+def review(
+    scheduler: Scheduler,
+    boxes: np.ndarray,
+    dues: np.ndarray,
+    ratings: np.ndarray,
+    review_days: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Reviews arrays of cards in a single vectorized pass.
+
+    Args:
+        scheduler (Scheduler): The scheduler reviewing the cards.
+        boxes (np.ndarray): The current box of each card.
+        dues (np.ndarray): The day number each card is due, or NO_DUE, e.g. from dues_to_days(due_dates, scheduler).
+        ratings (np.ndarray): The rating given to each card.
+        review_days (np.ndarray): The day number of each review. For a scheduler with a timezone, dues and
+            review_days must be local day numbers, e.g. from datetimes_to_days(review_datetimes, scheduler).
+
+    Returns:
+        tuple: A tuple containing the new boxes, the new due days and a mask of which cards were reviewed.
+            Cards that were not due keep their box and due day, and are False in the mask.
+    """
+
+    boxes = np.asarray(boxes, dtype=np.int64)
+    dues = np.asarray(dues, dtype=np.int64)
+    review_days = np.asarray(review_days, dtype=np.int64)
+
+    # due dates are at the beginning of a day, as checked by dues_to_days, so a card is
+    # due at any time on its due day and comparing days is enough
+    reviewed = (dues == NO_DUE) | (review_days >= dues)
+
+    reviewed_boxes = next_boxes(scheduler, boxes, ratings)
+    reviewed_dues = next_due_days(scheduler, reviewed_boxes, review_days)
+
+    return (
+        np.where(reviewed, reviewed_boxes, boxes),
+        np.where(reviewed, reviewed_dues, dues),
+        reviewed,
+    )
@@ -0,0 +1,49 @@
+from leitner_box import Card, Rating
+from datetime import datetime, timedelta
+import random
+
+import pytest
+
+
+def _review_history(
+    scheduler,
+    card_ids,
+    num_reviews,
+    seed=0,
+    review_durations=False,
+    timezones=(None,),
+):
+    # reviews each card num_reviews times with random ratings, each time at a random minute
+    # of the day it becomes due, returning the cards' final states and the review logs
+    rng = random.Random(seed)
+    cards = {}
+    review_logs = []
+    for card_id in card_ids:
+        card = Card(card_id=card_id)
+        review_datetime = datetime(2024, 1, 1, 15, 0, 0, 0)
+        for _ in range(num_reviews):
+            # the review datetime is logged in a random one of the timezones
+            tz = rng.choice(timezones)
+            if tz is not None:
+                if review_datetime.tzinfo is None:
+                    review_datetime = review_datetime.replace(tzinfo=tz)
+                else:
+                    review_datetime = review_datetime.astimezone(tz)
+
+            rating = rng.choice([Rating.Fail, Rating.Pass])
+            review_duration = (
+                rng.choice([None, rng.randint(1, 9000)]) if review_durations else None
+            )
+            card, review_log = scheduler.review_card(
+                card, rating, review_datetime, review_duration
+            )
+            review_logs.append(review_log)
+            review_datetime = card.due + timedelta(minutes=rng.randint(0, 1439))
+        cards[card_id] = card
+
+    return cards, review_logs
+
+
+@pytest.fixture
+def review_history():
+    return _review_history
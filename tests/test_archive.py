@@ -0,0 +1,186 @@
+from leitner_box import (
+    Scheduler,
+    Card,
+    Rating,
+    ReviewLog,
+    ReviewLogArchive,
+    write_review_logs,
+)
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+import io
+import pytest
+
+
+@pytest.fixture
+def make_review_logs(review_history):
+    # histories of many cards, sorted by review datetime like an archive appended to as
+    # reviews happen, with naive, utc and named timezone review datetimes
+    def _make_review_logs(num_cards, seed=0):
+        _, review_logs = review_history(
+            Scheduler(),
+            range(num_cards),
+            10,
+            seed=seed,
+            review_durations=True,
+            timezones=(None, timezone.utc, ZoneInfo("Asia/Kolkata")),
+        )
+        review_logs.sort(
+            key=lambda review_log: review_log.review_datetime.replace(tzinfo=None)
+        )
+
+        return review_logs
+
+    return _make_review_logs
+
+
+def to_dicts(review_logs):
+    return [review_log.to_dict() for review_log in review_logs]
+
+
+class TestReviewLogArchive:
+    @pytest.mark.parametrize("codec", ["zlib", "lzma"])
+    def test_round_trip(self, make_review_logs, tmp_path, codec):
+        path = tmp_path / "review_logs.lbl"
+        review_logs = make_review_logs(500)
+
+        with ReviewLogArchive(path, codec=codec, segment_size=1000) as archive:
+            assert archive.append(review_logs[:2500]) == 2500
+            assert archive.append(iter(review_logs[2500:])) == 2500
+
+        archive = ReviewLogArchive(path)
+        assert to_dicts(archive.scan()) == to_dicts(review_logs)
+        assert list(archive.scan_raw()) == [
+            (
+                review_log.card.card_id,
+                review_log.card.box,
+                review_log.card.due,
+                review_log.rating,
+                review_log.review_datetime,
+                review_log.review_duration,
+            )
+            for review_log in review_logs
+        ]
+
+        # much smaller than JSON Lines
+        json_lines = io.StringIO()
+        write_review_logs(json_lines, review_logs)
+        assert path.stat().st_size * 4 < len(json_lines.getvalue())
+
+    def test_scan_ranges(self, make_review_logs, tmp_path):
+        path = tmp_path / "review_logs.lbl"
+        review_logs = make_review_logs(300, seed=1)
+
+        with ReviewLogArchive(path, segment_size=500) as archive:
+            archive.append(review_logs)
+
+        start = review_logs[1200].review_datetime.replace(tzinfo=None)
+        end = review_logs[1700].review_datetime.replace(tzinfo=None)
+        assert to_dicts(archive.scan(start=start, end=end)) == to_dicts(
+            review_logs[1200:1700]
+        )
+        assert to_dicts(archive.scan(min_card_id=100, max_card_id=199)) == to_dicts(
+            [
+                review_log
+                for review_log in review_logs
+                if 100 <= review_log.card.card_id <= 199
+            ]
+        )
+        assert list(archive.scan(start=datetime(2030, 1, 1))) == []
+
+    def test_segments_outside_the_range_are_skipped(
+        self, make_review_logs, tmp_path, monkeypatch
+    ):
+        path = tmp_path / "review_logs.lbl"
+        review_logs = make_review_logs(300, seed=2)
+
+        with ReviewLogArchive(path, segment_size=1000) as archive:
+            archive.append(review_logs)
+
+        from leitner_box import archive as archive_module
+
+        decoded = []
+        decode_segment = archive_module._decode_segment
+        monkeypatch.setattr(
+            archive_module,
+            "_decode_segment",
+            lambda *args: decoded.append(args[2]) or decode_segment(*args),
+        )
+
+        start = review_logs[2100].review_datetime.replace(tzinfo=None)
+        assert len(list(archive.scan(start=start))) == 900
+        assert decoded == [1000]
+
+    def test_buffered_review_logs(self, make_review_logs, tmp_path):
+        path = tmp_path / "review_logs.lbl"
+        review_logs = make_review_logs(1)
+
+        archive = ReviewLogArchive(path, segment_size=4)
+        archive.append(review_logs)
+        # two full segments are written, and the rest waits for a flush
+        assert len(list(archive.scan())) == 8
+        archive.close()
+        assert len(list(archive.scan())) == 10
+
+    def test_timezone_aware_dues(self, tmp_path):
+        path = tmp_path / "review_logs.lbl"
+        berlin = ZoneInfo("Europe/Berlin")
+        review_logs = [
+            ReviewLog(
+                card=Card(card_id=card_id, box=2, due=due),
+                rating=Rating.Pass,
+                review_datetime=datetime(2024, 3, 31, 9, 0, tzinfo=berlin),
+            )
+            for card_id, due in enumerate(
+                [
+                    datetime(2024, 3, 30, tzinfo=berlin),
+                    datetime(2024, 3, 31, 12, 0, tzinfo=berlin),
+                    datetime(2024, 3, 31, tzinfo=timezone.utc),
+                    datetime(2024, 3, 31),
+                    None,
+                ]
+            )
+        ]
+
+        with ReviewLogArchive(path) as archive:
+            archive.append(review_logs)
+
+        # named timezones are read back as fixed utc offsets
+        scanned = list(archive.scan())
+        assert to_dicts(scanned) == to_dicts(review_logs)
+        assert [review_log.card.due for review_log in scanned] == [
+            review_log.card.due for review_log in review_logs
+        ]
+        assert [row[2] for row in archive.scan_raw()] == [
+            review_log.card.due for review_log in review_logs
+        ]
+
+        with pytest.raises(ValueError):
+            archive.append(
+                [
+                    ReviewLog(
+                        card=Card(due=datetime(2024, 1, 1, 0, 0, 0, 1, berlin)),
+                        rating=Rating.Pass,
+                        review_datetime=datetime(2024, 1, 1, 9, 0, tzinfo=berlin),
+                    )
+                ]
+            )
+
+    def test_invalid_archives(self, make_review_logs, tmp_path):
+        assert list(ReviewLogArchive(tmp_path / "missing.lbl").scan()) == []
+
+        with pytest.raises(ValueError):
+            ReviewLogArchive(tmp_path / "review_logs.lbl", codec="gzip")
+        with pytest.raises(ValueError):
+            ReviewLogArchive(tmp_path / "review_logs.lbl", segment_size=0)
+
+        path = tmp_path / "review_logs.lbl"
+        with ReviewLogArchive(path) as archive:
+            archive.append(make_review_logs(1))
+        path.write_bytes(path.read_bytes()[:-1])
+        with pytest.raises(ValueError):
+            list(archive.scan())
+
+        path.write_bytes(b"not an archive" * 10)
+        with pytest.raises(ValueError):
+            list(archive.scan())
@@ -0,0 +1,174 @@
+from leitner_box import Scheduler, Card, Rating, AsyncScheduler
+from datetime import datetime
+import asyncio
+import pytest
+
+
+class InMemoryStore:
+    # stands in for a database, recording every micro-batch it persists
+    def __init__(self):
+        self.cards = {}
+        self.review_logs = []
+        self.batches = []
+
+    async def save(self, cards, review_logs):
+        await asyncio.sleep(0)
+        self.batches.append(len(cards))
+        for card in cards:
+            self.cards[card.card_id] = card
+        self.review_logs += review_logs
+
+
+SCHEDULER = Scheduler(start_datetime=datetime(2024, 1, 1, 14, 30, 0, 0))
+REVIEW_DATETIME = datetime(2024, 1, 1, 15, 0, 0, 0)
+
+
+class TestAsyncScheduler:
+    def test_coalesces_reviews(self):
+        store = InMemoryStore()
+
+        async def main():
+            async with AsyncScheduler(SCHEDULER, persist=store.save) as scheduler:
+                return await asyncio.gather(
+                    *(
+                        scheduler.review(
+                            Card(card_id=card_id), Rating.Pass, REVIEW_DATETIME
+                        )
+                        for card_id in range(100)
+                    )
+                )
+
+        results = asyncio.run(main())
+
+        # every review was processed in one micro-batch
+        assert store.batches == [100]
+        for card_id, (card, review_log) in enumerate(results):
+            expected_card, expected_review_log = SCHEDULER.review_card(
+                Card(card_id=card_id), Rating.Pass, REVIEW_DATETIME
+            )
+            assert card.to_dict() == expected_card.to_dict()
+            assert review_log.to_dict() == expected_review_log.to_dict()
+            assert store.cards[card_id].to_dict() == expected_card.to_dict()
+
+    def test_reviews_of_the_same_card_are_ordered(self):
+        store = InMemoryStore()
+        card = Card(card_id=1)
+
+        async def main():
+            async with AsyncScheduler(
+                SCHEDULER, persist=store.save, max_batch_size=2
+            ) as scheduler:
+                return await asyncio.gather(
+                    scheduler.review(card, Rating.Fail, REVIEW_DATETIME),
+                    scheduler.review(card, Rating.Pass, REVIEW_DATETIME),
+                    scheduler.review(card, Rating.Pass, datetime(2024, 1, 2)),
+                    scheduler.review(card, Rating.Pass, datetime(2024, 1, 4)),
+                    return_exceptions=True,
+                )
+
+        results = asyncio.run(main())
+
+        # the second review is applied to the result of the first, so it isn't due yet
+        first_card, _ = results[0]
+        assert first_card.box == 1
+        assert isinstance(results[1], RuntimeError)
+
+        # later reviews in other micro-batches also build on the earlier ones
+        third_card, third_review_log = results[2]
+        assert third_review_log.card.to_dict() == first_card.to_dict()
+        assert third_card.box == 2
+        fourth_card, fourth_review_log = results[3]
+        assert fourth_review_log.card.to_dict() == third_card.to_dict()
+        assert fourth_card.box == 3
+
+        assert [log.card.box for log in store.review_logs] == [1, 1, 2]
+        assert store.cards[1].to_dict() == fourth_card.to_dict()
+
+    def test_backpressure(self):
+        release = asyncio.Event()
+        persisted = []
+
+        async def slow_persist(cards, review_logs):
+            await release.wait()
+            persisted.extend(cards)
+
+        async def main():
+            scheduler = AsyncScheduler(
+                SCHEDULER, persist=slow_persist, max_batch_size=1, max_pending=2
+            )
+            tasks = [
+                asyncio.create_task(
+                    scheduler.review(
+                        Card(card_id=card_id), Rating.Pass, REVIEW_DATETIME
+                    )
+                )
+                for card_id in range(5)
+            ]
+            await asyncio.sleep(0.01)
+
+            # one review is being persisted, two are queued and the rest wait for room
+            assert scheduler._queue.qsize() == 2
+            assert not any(task.done() for task in tasks)
+
+            release.set()
+            await asyncio.gather(*tasks)
+            await scheduler.close()
+
+        asyncio.run(main())
+        assert [card.card_id for card in persisted] == [0, 1, 2, 3, 4]
+
+    def test_persist_error(self):
+        async def failing_persist(cards, review_logs):
+            raise OSError("store is down")
+
+        async def main():
+            async with AsyncScheduler(SCHEDULER, persist=failing_persist) as scheduler:
+                with pytest.raises(OSError):
+                    await scheduler.review(
+                        Card(card_id=1), Rating.Pass, REVIEW_DATETIME
+                    )
+
+                # the scheduler keeps working after a failed micro-batch
+                scheduler.persist = None
+                card, _ = await scheduler.review(
+                    Card(card_id=1), Rating.Pass, REVIEW_DATETIME
+                )
+                assert card.box == 2
+
+        asyncio.run(main())
+
+    def test_invalid_review_only_fails_its_caller(self):
+        store = InMemoryStore()
+
+        async def main():
+            async with AsyncScheduler(SCHEDULER, persist=store.save) as scheduler:
+                return await asyncio.gather(
+                    *(
+                        scheduler.review(
+                            Card(card_id=card_id),
+                            Rating.Pass,
+                            "not a datetime" if card_id == 2 else REVIEW_DATETIME,
+                        )
+                        for card_id in range(5)
+                    ),
+                    # a later review of the same card builds on the last valid one
+                    scheduler.review(Card(card_id=2), Rating.Pass, REVIEW_DATETIME),
+                    return_exceptions=True,
+                )
+
+        results = asyncio.run(main())
+
+        assert isinstance(results[2], TypeError)
+        expected_card, _ = SCHEDULER.review_card(
+            Card(card_id=0), Rating.Pass, REVIEW_DATETIME
+        )
+        for card_id in [0, 1, 3, 4]:
+            card, _ = results[card_id]
+            assert card.box == expected_card.box == 2
+        card, review_log = results[5]
+        assert review_log.card.box == 1
+        assert card.box == 2
+
+        # the valid reviews were persisted together
+        assert store.batches == [5]
+        assert sorted(store.cards) == [0, 1, 2, 3, 4]
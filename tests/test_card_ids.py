@@ -0,0 +1,85 @@
+from leitner_box import Card, SnowflakeIdGenerator
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import time
+import pytest
+
+
+class TestCardIds:
+    def test_next_id(self):
+        generator = SnowflakeIdGenerator(node_id=5)
+
+        before_ms = time.time_ns() // 1_000_000
+        ids = [generator.next_id() for _ in range(10_000)]
+        after_ms = time.time_ns() // 1_000_000
+
+        assert ids == sorted(set(ids))
+        for card_id in ids:
+            assert 0 < card_id < 2**63
+            assert (card_id >> 12) & 1023 == 5
+        # ids can run ahead of the clock when a millisecond's sequence numbers run out
+        assert before_ms <= SnowflakeIdGenerator.timestamp_ms(ids[0]) <= after_ms
+        assert SnowflakeIdGenerator.timestamp_ms(ids[-1]) <= after_ms + 3
+
+    def test_next_ids(self):
+        generator = SnowflakeIdGenerator(node_id=1023)
+
+        ids = generator.next_id(), *generator.next_ids(10_000), generator.next_id()
+        assert len(ids) == 10_002
+        assert list(ids) == sorted(set(ids))
+        assert all((card_id >> 12) & 1023 == 1023 for card_id in ids)
+        assert generator.next_ids(0) == []
+
+        other_ids = SnowflakeIdGenerator(node_id=0).next_ids(10_000)
+        assert not set(ids) & set(other_ids)
+
+    def test_invalid_node_id(self):
+        with pytest.raises(ValueError):
+            SnowflakeIdGenerator(node_id=1024)
+
+        with pytest.raises(ValueError):
+            SnowflakeIdGenerator(node_id=-1)
+
+    def test_unique_across_threads(self):
+        def create_cards(i):
+            if i % 2 == 0:
+                return [Card().card_id for _ in range(2000)]
+            return [card.card_id for card in Card.create_many(2000)]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            card_ids = [
+                card_id
+                for result in executor.map(create_cards, range(32))
+                for card_id in result
+            ]
+
+        assert len(card_ids) == len(set(card_ids)) == 64_000
+
+    def test_create_many(self):
+        cards = Card.create_many(3, box=2, due=datetime(2024, 1, 1))
+
+        assert len(cards) == 3
+        assert cards[0].card_id < cards[1].card_id < cards[2].card_id
+        assert all(card.box == 2 for card in cards)
+        assert all(card.due == datetime(2024, 1, 1) for card in cards)
+        assert Card.create_many(0) == []
+
+    def test_custom_id_generator(self, monkeypatch):
+        class CountingIdGenerator:
+            def __init__(self):
+                self.last = 0
+
+            def next_id(self):
+                self.last += 1
+                return self.last
+
+            def next_ids(self, n):
+                ids = list(range(self.last + 1, self.last + n + 1))
+                self.last += n
+                return ids
+
+        monkeypatch.setattr(Card, "id_generator", CountingIdGenerator())
+
+        assert Card().card_id == 1
+        assert [card.card_id for card in Card.create_many(2)] == [2, 3]
+        assert Card(card_id=42).card_id == 42
@@ -0,0 +1,187 @@
+from leitner_box import Scheduler, Card, Rating, CardStore
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+import random
+import pytest
+
+
+class TestCardStore:
+    def test_due_cards(self):
+        store = CardStore(
+            [
+                Card(card_id=1, box=2, due=datetime(2024, 1, 4, 0, 0, 0, 0)),
+                Card(card_id=2, box=1, due=datetime(2024, 1, 2, 0, 0, 0, 0)),
+                Card(card_id=3),
+                Card(card_id=4, box=3, due=datetime(2024, 1, 7, 0, 0, 0, 0)),
+            ]
+        )
+
+        assert len(store) == 4
+        assert 3 in store
+        assert 5 not in store
+
+        # new cards are always due and come first, then cards in order of due date
+        now = datetime(2024, 1, 4, 0, 0, 0, 0)
+        assert [card.card_id for card in store.due_cards(now)] == [3, 2, 1]
+        assert [card.card_id for card in store.due_cards(now, limit=2)] == [3, 2]
+        just_before = now - timedelta(seconds=1)
+        assert [card.card_id for card in store.due_cards(just_before)] == [3, 2]
+
+        card = store.get(1)
+        assert card.box == 2
+        assert card.due == datetime(2024, 1, 4, 0, 0, 0, 0)
+
+        with pytest.raises(ValueError):
+            store.add(Card(card_id=1))
+
+        # due dates that can't be stored as whole epoch seconds are rejected
+        with pytest.raises(ValueError):
+            store.add(Card(card_id=5, due=datetime(2024, 1, 4, 0, 0, 0, 1)))
+
+    def test_review_card(self):
+        scheduler = Scheduler(start_datetime=datetime(2024, 1, 1, 14, 30, 0, 0))
+        store = CardStore([Card(card_id=1), Card(card_id=2)])
+
+        review_datetime = datetime(2024, 1, 1, 15, 0, 0, 0)
+        card, review_log = store.review_card(scheduler, 1, Rating.Pass, review_datetime)
+
+        expected_card, expected_review_log = scheduler.review_card(
+            Card(card_id=1), Rating.Pass, review_datetime
+        )
+        assert card.to_dict() == expected_card.to_dict()
+        assert review_log.to_dict() == expected_review_log.to_dict()
+        assert store.get(1).to_dict() == expected_card.to_dict()
+
+        # the reviewed card has moved behind the card that was never reviewed
+        assert [card.card_id for card in store.due_cards(card.due)] == [2, 1]
+        assert [card.card_id for card in store.due_cards(review_datetime)] == [2]
+
+        with pytest.raises(RuntimeError):
+            store.review_card(scheduler, 1, Rating.Pass, review_datetime)
+
+    def test_review_card_with_mismatched_timezone(self):
+        # a store without a timezone rejects a timezone scheduler before the review
+        scheduler = Scheduler(
+            start_datetime=datetime(2024, 1, 1, 14, 30, 0, 0),
+            timezone=ZoneInfo("Europe/Berlin"),
+        )
+        store = CardStore([Card(card_id=1)])
+
+        with pytest.raises(ValueError):
+            store.review_card(scheduler, 1, Rating.Pass, datetime(2024, 1, 1, 15))
+
+        assert store.get(1).to_dict() == Card(card_id=1).to_dict()
+        assert [card.card_id for card in store.due_cards(datetime(2024, 1, 1))] == [1]
+
+    def test_timezone(self):
+        berlin = ZoneInfo("Europe/Berlin")
+        scheduler = Scheduler(start_datetime=datetime(2024, 3, 1), timezone=berlin)
+        store = CardStore(
+            [Card(card_id=card_id) for card_id in range(4)], timezone=berlin
+        )
+
+        # the reviews cross the start of daylight saving time on March 31st
+        for card_id in range(4):
+            review_datetime = datetime(2024, 3, 29, 9, tzinfo=berlin)
+            for _ in range(card_id + 1):
+                card, _ = store.review_card(
+                    scheduler, card_id, Rating.Pass, review_datetime
+                )
+                review_datetime = card.due + timedelta(hours=9)
+
+            assert store.get(card_id).due == card.due
+            assert store.get(card_id).due.tzinfo is berlin
+            assert store.get(card_id).to_dict() == card.to_dict()
+
+        now = datetime(2024, 4, 1, tzinfo=berlin)
+        due_cards = store.due_cards(now)
+        assert due_cards == sorted(due_cards, key=lambda card: card.due)
+        assert {card.card_id for card in due_cards} == {
+            card.card_id for card in store if card.due <= now
+        }
+        assert [
+            card.to_dict() for card in store.due_cards(now.replace(tzinfo=None))
+        ] == [card.to_dict() for card in due_cards]
+        assert [
+            card.to_dict() for card in store.due_cards(now.astimezone(timezone.utc))
+        ] == [card.to_dict() for card in due_cards]
+
+        # a store with a timezone only holds timezone-aware due dates
+        with pytest.raises(ValueError):
+            store.add(Card(card_id=10, due=datetime(2024, 4, 1)))
+        with pytest.raises(ValueError):
+            store.review_card(Scheduler(), 0, Rating.Pass)
+
+    def test_extend(self):
+        rng = random.Random(5)
+        cards = [
+            Card(
+                card_id=card_id,
+                box=rng.randint(1, 3),
+                due=rng.choice(
+                    [None, datetime(2024, 1, 1) + timedelta(days=rng.randint(0, 9))]
+                ),
+            )
+            for card_id in range(2000)
+        ]
+        store = CardStore(cards[:1000])
+        store.extend(cards[1000:])
+
+        # cards with the same due date come in the order they were added
+        expected = sorted(cards, key=lambda card: card.due or datetime.min)
+        due = store.due_cards(datetime(2024, 1, 5))
+        assert [card.card_id for card in due] == [
+            card.card_id
+            for card in expected
+            if card.due is None or card.due <= datetime(2024, 1, 5)
+        ]
+
+        # the cards before one that can't be stored are still added
+        with pytest.raises(ValueError):
+            store.extend([Card(card_id=2000), Card(card_id=1)])
+        assert len(store) == 2001
+        assert 2000 in store
+
+    def test_matches_linear_scan(self):
+        rng = random.Random(3)
+        scheduler = Scheduler(start_datetime=datetime(2024, 1, 1, 0, 0, 0, 0))
+        cards = {card_id: Card(card_id=card_id) for card_id in range(500)}
+        store = CardStore(cards.values())
+
+        now = datetime(2024, 1, 1, 12, 0, 0, 0)
+        for _ in range(3000):
+            now += timedelta(hours=rng.randint(0, 12))
+
+            due = store.due_cards(now)
+            expected_due = sorted(
+                (
+                    card
+                    for card in cards.values()
+                    if card.due is None or card.due <= now
+                ),
+                key=lambda card: card.due or datetime.min,
+            )
+            assert [card.due for card in due] == [card.due for card in expected_due]
+            assert {card.card_id for card in due} == {
+                card.card_id for card in expected_due
+            }
+
+            action = rng.random()
+            if due and action < 0.8:
+                card_id = rng.choice(due).card_id
+                rating = rng.choice([Rating.Fail, Rating.Pass])
+                cards[card_id], _ = store.review_card(scheduler, card_id, rating, now)
+            elif action < 0.9 and cards:
+                card_id = rng.choice(list(cards))
+                store.remove(card_id)
+                del cards[card_id]
+            else:
+                card_id = max(cards, default=0) + 1
+                cards[card_id] = Card(card_id=card_id)
+                store.add(cards[card_id])
+
+            assert len(store) == len(cards)
+
+        assert sorted(card.card_id for card in store) == sorted(cards)
+        for card in store:
+            assert card.to_dict() == cards[card.card_id].to_dict()
@@ -0,0 +1,113 @@
+from leitner_box import Scheduler, Card, Rating, DeckFile
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+import pytest
+
+
+class TestDeckFile:
+    def test_create_and_read(self, tmp_path):
+        path = tmp_path / "deck.bin"
+        cards = [
+            Card(card_id=card_id, box=card_id % 3 + 1, due=datetime(2024, 1, 2))
+            for card_id in range(1000)
+        ]
+        cards.append(Card(card_id=1000))
+
+        DeckFile.create(path, iter(cards))
+
+        with DeckFile(path) as deck:
+            assert len(deck) == len(cards)
+            assert deck[0].to_dict() == cards[0].to_dict()
+            assert deck[-1].to_dict() == cards[-1].to_dict()
+            assert [card.to_dict() for card in deck] == [
+                card.to_dict() for card in cards
+            ]
+
+            with pytest.raises(IndexError):
+                deck[len(cards)]
+
+            # read-only deck files can't be updated
+            with pytest.raises(ValueError):
+                deck.update(0, cards[0])
+
+        DeckFile.create(path, [])
+        with DeckFile(path) as deck:
+            assert len(deck) == 0
+            assert list(deck) == []
+
+    def test_review_card_in_place(self, tmp_path):
+        path = tmp_path / "deck.bin"
+        scheduler = Scheduler(start_datetime=datetime(2024, 1, 1, 14, 30, 0, 0))
+        DeckFile.create(path, [Card(card_id=1), Card(card_id=2)])
+
+        review_datetime = datetime(2024, 1, 1, 15, 0, 0, 0)
+        with DeckFile(path, writable=True) as deck:
+            card, review_log = deck.review_card(
+                scheduler, 1, Rating.Pass, review_datetime
+            )
+
+            expected_card, _ = scheduler.review_card(
+                Card(card_id=2), Rating.Pass, review_datetime
+            )
+            assert card.to_dict() == expected_card.to_dict()
+            assert review_log.card.to_dict() == Card(card_id=2).to_dict()
+
+            with pytest.raises(RuntimeError):
+                deck.review_card(scheduler, 1, Rating.Pass, review_datetime)
+
+            # a card can only be written over its own record
+            with pytest.raises(ValueError):
+                deck.update(0, card)
+
+        # the update was written to the file
+        with DeckFile(path) as deck:
+            assert deck[0].to_dict() == Card(card_id=1).to_dict()
+            assert deck[1].to_dict() == expected_card.to_dict()
+
+    def test_timezone(self, tmp_path):
+        path = tmp_path / "deck.bin"
+        berlin = ZoneInfo("Europe/Berlin")
+        scheduler = Scheduler(start_datetime=datetime(2024, 3, 1), timezone=berlin)
+        DeckFile.create(path, [Card(card_id=1), Card(card_id=2)])
+
+        with DeckFile(path, writable=True) as deck:
+            review_datetime = datetime(2024, 3, 30, 9, tzinfo=berlin)
+            for _ in range(2):
+                card, _ = deck.review_card(scheduler, 0, Rating.Pass, review_datetime)
+                review_datetime = card.due + timedelta(hours=9)
+
+        # named timezones are read back as fixed utc offsets
+        with DeckFile(path) as deck:
+            assert deck[0].due == card.due
+            assert deck[0].due.utcoffset() == timedelta(hours=2)
+            assert deck[0].to_dict() == card.to_dict()
+
+    def test_box_out_of_range(self, tmp_path):
+        path = tmp_path / "deck.bin"
+
+        with pytest.raises(ValueError):
+            DeckFile.create(path, [Card(card_id=1), Card(card_id=2, box=256)])
+        with pytest.raises(ValueError):
+            DeckFile.create(path, [Card(card_id=1, box=-1)])
+
+        DeckFile.create(path, [Card(card_id=1)])
+        with DeckFile(path, writable=True) as deck:
+            with pytest.raises(ValueError):
+                deck.update(0, Card(card_id=1, box=256))
+            assert deck[0].to_dict() == Card(card_id=1).to_dict()
+
+    def test_invalid_file(self, tmp_path):
+        path = tmp_path / "deck.bin"
+
+        path.write_bytes(b"")
+        with pytest.raises(ValueError):
+            DeckFile(path)
+
+        path.write_bytes(b"not a deck file at all")
+        with pytest.raises(ValueError):
+            DeckFile(path)
+
+        DeckFile.create(path, [Card(card_id=1)])
+        path.write_bytes(path.read_bytes()[:-1])
+        with pytest.raises(ValueError):
+            DeckFile(path)
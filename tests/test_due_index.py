@@ -0,0 +1,149 @@
+from leitner_box import Scheduler, Card, Rating, DueIndex
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+import random
+
+import pytest
+
+
+class TestDueIndex:
+    def test_count_and_list_due(self):
+        scheduler = Scheduler(start_datetime=datetime(2024, 1, 1))
+        index = DueIndex()
+        index.add_tenant("alice", scheduler)
+        index.add_tenant("bob", scheduler)
+
+        index.add("alice", Card(card_id=1, box=1, due=datetime(2024, 1, 3)))
+        index.add("alice", Card(card_id=2, box=2, due=datetime(2024, 1, 2)))
+        index.add("alice", Card(card_id=3, box=1))
+        index.add("alice", Card(card_id=4, box=3, due=datetime(2024, 1, 9)))
+        # card ids only need to be unique within a tenant
+        index.add("bob", Card(card_id=1, box=1, due=datetime(2024, 1, 1)))
+
+        assert len(index) == 5
+        assert index.num_cards("alice") == 4
+        assert index.count_due("alice", date(2024, 1, 1)) == 1
+        assert index.count_due("alice", date(2024, 1, 3)) == 3
+        assert index.count_due("alice", datetime(2024, 1, 9, 23, 59)) == 4
+        assert index.due_card_ids("alice", date(2024, 1, 3)) == [3, 2, 1]
+        assert index.due_card_ids("alice", date(2024, 1, 9), limit=2) == [3, 2]
+        assert index.due_card_ids("bob", date(2024, 1, 9)) == [1]
+        due_cards = index.due_cards("alice", date(2024, 1, 2))
+        assert [card.to_dict() for card in due_cards] == [
+            Card(card_id=3, box=1).to_dict(),
+            Card(card_id=2, box=2, due=datetime(2024, 1, 2)).to_dict(),
+        ]
+
+    def test_review_card(self):
+        scheduler = Scheduler(start_datetime=datetime(2024, 1, 1))
+        index = DueIndex()
+        index.add_tenant(7, scheduler)
+        index.add(7, Card(card_id=1))
+
+        card, review_log = index.review_card(
+            7, 1, Rating.Pass, datetime(2024, 1, 1, 9, 0)
+        )
+
+        assert card.to_dict() == index.get(7, 1).to_dict()
+        assert review_log.card.box == 1
+        assert index.count_due(7, date(2024, 1, 1)) == 0
+        assert index.due_card_ids(7, card.due) == [1]
+
+        with pytest.raises(RuntimeError):
+            index.review_card(7, 1, Rating.Pass, datetime(2024, 1, 1, 10, 0))
+
+    def test_matches_scan(self):
+        # a random mix of adds, reviews, updates and removals against a brute force scan
+        rng = random.Random(0)
+        schedulers = [
+            Scheduler(start_datetime=datetime(2024, 1, 1)),
+            Scheduler(box_intervals=[1, 3, 7, 14], start_datetime=datetime(2024, 1, 1)),
+        ]
+        index = DueIndex()
+        cards = {}
+        for tenant, scheduler in enumerate(schedulers):
+            index.add_tenant(tenant, scheduler)
+            cards[tenant] = {}
+
+        for step in range(3000):
+            tenant = rng.randrange(len(schedulers))
+            tenant_cards = cards[tenant]
+            now = datetime(2024, 1, 1) + timedelta(hours=step)
+            action = rng.random()
+            if action < 0.3 or not tenant_cards:
+                card = Card(card_id=step)
+                index.add(tenant, card)
+                tenant_cards[card.card_id] = card
+            elif action < 0.8:
+                due_card_ids = index.due_card_ids(tenant, now, limit=1)
+                if due_card_ids:
+                    card, _ = index.review_card(
+                        tenant, due_card_ids[0], Rating(rng.randrange(2)), now
+                    )
+                    tenant_cards[card.card_id] = card
+            elif action < 0.9:
+                card = tenant_cards[rng.choice(list(tenant_cards))]
+                card = Card(card.card_id, box=1, due=datetime(2024, 1, 1))
+                index.update(tenant, card)
+                tenant_cards[card.card_id] = card
+            else:
+                card_id = rng.choice(list(tenant_cards))
+                index.remove(tenant, card_id)
+                del tenant_cards[card_id]
+
+            day = now + timedelta(days=rng.randrange(-3, 10))
+            expected = sorted(
+                card_id
+                for card_id, card in tenant_cards.items()
+                if card.due is None or card.due.date() <= day.date()
+            )
+            assert index.count_due(tenant, day) == len(expected)
+            assert sorted(index.due_card_ids(tenant, day)) == expected
+
+        for tenant, tenant_cards in cards.items():
+            for card_id, card in tenant_cards.items():
+                assert index.get(tenant, card_id).to_dict() == card.to_dict()
+
+    def test_timezone(self):
+        scheduler = Scheduler(
+            start_datetime=datetime(2024, 3, 1, 9, 0),
+            timezone=ZoneInfo("America/Los_Angeles"),
+        )
+        index = DueIndex()
+        index.add_tenant("alice", scheduler)
+        index.add("alice", Card(card_id=1))
+
+        # 10pm on Mar 1 in Los Angeles
+        review_datetime = datetime(2024, 3, 2, 6, 0, tzinfo=timezone.utc)
+        card, _ = index.review_card("alice", 1, Rating.Pass, review_datetime)
+
+        assert index.get("alice", 1).due == card.due
+        assert index.count_due("alice", date(2024, 3, 1)) == 0
+        assert index.count_due("alice", card.due) == 1
+        # Mar 2 in Los Angeles, even though it's already Mar 3 in UTC
+        day = datetime(2024, 3, 3, 7, tzinfo=timezone.utc)
+        assert index.count_due("alice", day) == 1
+
+        with pytest.raises(ValueError):
+            index.add("alice", Card(card_id=2, due=datetime(2024, 3, 5)))
+
+    def test_errors(self):
+        index = DueIndex()
+        index.add_tenant("alice", Scheduler())
+
+        with pytest.raises(ValueError):
+            index.add_tenant("alice", Scheduler())
+        with pytest.raises(KeyError):
+            index.add("bob", Card())
+        with pytest.raises(ValueError):
+            index.add("alice", Card(card_id=1, due=datetime(2024, 1, 1, 12)))
+
+        index.add("alice", Card(card_id=1))
+        with pytest.raises(ValueError):
+            index.add("alice", Card(card_id=1))
+        with pytest.raises(KeyError):
+            index.get("alice", 2)
+
+        index.remove_tenant("alice")
+        assert "alice" not in index
+        assert len(index) == 0
@@ -0,0 +1,69 @@
+import leitner_box
+import os
+import subprocess
+import sys
+
+import pytest
+
+# a generous budget for `import leitner_box`, which only sets up lazy imports
+IMPORT_BUDGET_MICROSECONDS = 20_000
+
+# modules that only the code using them should import
+OPTIONAL_MODULES = {
+    "numpy",
+    "sqlite3",
+    "asyncio",
+    "concurrent.futures",
+    "multiprocessing",
+    "json",
+    "lzma",
+    "mmap",
+}
+
+
+def import_times(statement):
+    # the cumulative import time in microseconds of each module imported by statement
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+
+    return times
+
+
+class TestImport:
+    def test_import_budget(self):
+        # the fastest of a few runs, so that a busy machine doesn't fail the test
+        import_time = min(
+            import_times("import leitner_box")["leitner_box"] for _ in range(3)
+        )
+
+        assert import_time < IMPORT_BUDGET_MICROSECONDS
+
+    @pytest.mark.parametrize(
+        "statement",
+        ["import leitner_box", "from leitner_box import Scheduler, Card, Rating"],
+    )
+    def test_optional_modules_not_imported(self, statement):
+        imported = set(import_times(statement))
+
+        assert not imported & OPTIONAL_MODULES
+
+    def test_lazy_attributes(self):
+        for name in leitner_box.__all__:
+            assert name in dir(leitner_box)
+            assert getattr(leitner_box, name).__name__ == name
+
+        with pytest.raises(AttributeError):
+            leitner_box.NotAnAttribute
@@ -0,0 +1,134 @@
+from leitner_box import Scheduler, Card, Rating, InMemorySink
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+import pickle
+import pytest
+
+
+class RecordingSink(InMemorySink):
+    __slots__ = ("calls",)
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def before_review(self, card, rating, review_datetime):
+        self.calls.append(("before", card.box, rating, review_datetime))
+
+    def after_review(self, card, new_card, review_log):
+        self.calls.append(("after", card.box, new_card.box, review_log.rating))
+
+
+class TestInstrumentation:
+    def test_review_card(self):
+        sink = RecordingSink()
+        scheduler = Scheduler(start_datetime=datetime(2024, 1, 1), sink=sink)
+        plain_scheduler = Scheduler(start_datetime=datetime(2024, 1, 1))
+
+        card = plain_card = Card(card_id=1)
+        for day, rating in enumerate([Rating.Pass, Rating.Pass, Rating.Fail]):
+            review_datetime = datetime(2024, 1, 1 + 7 * day, 9, 0)
+            card, review_log = scheduler.review_card(card, rating, review_datetime)
+            plain_card, _ = plain_scheduler.review_card(
+                plain_card, rating, review_datetime
+            )
+            # instrumentation doesn't change the result of a review
+            assert card.to_dict() == plain_card.to_dict()
+
+        with pytest.raises(RuntimeError):
+            scheduler.review_card(card, Rating.Pass, datetime(2024, 1, 15, 10, 0))
+
+        assert sink.counters == {
+            "reviews": 3,
+            "reviews.pass": 2,
+            "reviews.fail": 1,
+            "reviews.not_due": 1,
+            "box_transitions.1->2": 1,
+            "box_transitions.2->3": 1,
+            "box_transitions.3->1": 1,
+        }
+        assert {name: len(timings) for name, timings in sink.timings.items()} == {
+            "review": 3,
+            "copy": 3,
+            "due": 3,
+        }
+        assert sink.total_time("review") >= sink.total_time("copy") > 0
+        assert sink.total_time("unknown") == 0.0
+
+        assert sink.calls[:2] == [
+            ("before", 1, Rating.Pass, datetime(2024, 1, 1, 9, 0)),
+            ("after", 1, 2, Rating.Pass),
+        ]
+        assert sink.calls[-1] == (
+            "before",
+            1,
+            Rating.Pass,
+            datetime(2024, 1, 15, 10, 0),
+        )
+        assert len(sink.calls) == 7
+
+        sink.reset()
+        assert sink.counters == {} and sink.timings == {}
+
+    def test_review_cards(self):
+        sink = InMemorySink()
+        scheduler = Scheduler(start_datetime=datetime(2024, 1, 1), sink=sink)
+
+        cards = [
+            Card(card_id=1),
+            Card(card_id=2, box=2, due=datetime(2024, 1, 3)),
+            Card(card_id=3, box=3),
+        ]
+        _, _, reviewed = scheduler.review_cards(
+            cards,
+            [Rating.Pass, Rating.Fail, Rating.Pass],
+            [datetime(2024, 1, 1, 9, 0)] * 3,
+        )
+
+        assert reviewed == [True, False, True]
+        assert sink.counters == {
+            "reviews": 2,
+            "reviews.pass": 2,
+            "reviews.not_due": 1,
+            "box_transitions.1->2": 1,
+            "box_transitions.3->3": 1,
+        }
+
+    @pytest.mark.parametrize("timezone_", [None, ZoneInfo("Europe/Berlin")])
+    def test_sink_does_not_change_results(self, timezone_):
+        start_datetime = datetime(2024, 1, 1, 14, 30, 0, 0)
+        scheduler = Scheduler(start_datetime=start_datetime, timezone=timezone_)
+        instrumented_scheduler = Scheduler(
+            start_datetime=start_datetime, timezone=timezone_, sink=InMemorySink()
+        )
+
+        cards = [
+            Card(card_id=1),
+            Card(card_id=2, box=2, due=datetime(2024, 1, 3)),
+            Card(card_id=3, box=3, due=datetime(2024, 1, 3, tzinfo=timezone.utc)),
+        ]
+        review_datetimes = [
+            datetime(2024, 1, 2, 9, 0, 0, 0),
+            datetime(2024, 1, 3, 23, 30, 0, 0, timezone.utc),
+        ]
+        for card in cards:
+            for review_datetime in review_datetimes:
+                results = []
+                for scheduler_ in [scheduler, instrumented_scheduler]:
+                    try:
+                        new_card, review_log = scheduler_.review_card(
+                            card, Rating.Pass, review_datetime
+                        )
+                        results.append((new_card.to_dict(), review_log.to_dict()))
+                    except (RuntimeError, TypeError) as e:
+                        # e.g. comparing an aware due date with a naive review datetime
+                        results.append(type(e))
+
+                assert results[0] == results[1]
+
+    def test_sink_is_not_serialized(self):
+        scheduler = Scheduler(start_datetime=datetime(2024, 1, 1), sink=InMemorySink())
+
+        assert Scheduler.from_dict(scheduler.to_dict()).sink is None
+        assert Scheduler.from_bytes(scheduler.to_bytes()).sink is None
+        assert isinstance(pickle.loads(pickle.dumps(scheduler)).sink, InMemorySink)
@@ -0,0 +1,60 @@
+from leitner_box import (
+    Scheduler,
+    iter_review_logs,
+    write_review_logs,
+)
+from datetime import datetime, timezone
+import io
+
+import pytest
+
+
+@pytest.fixture
+def review_logs(review_history):
+    # one card's history, with and without review durations and timezones
+    scheduler = Scheduler(start_datetime=datetime(2024, 1, 1, 14, 30, 0, 0))
+    _, review_logs = review_history(
+        scheduler, [7], 20, review_durations=True, timezones=(None, timezone.utc)
+    )
+
+    return review_logs
+
+
+class TestJsonl:
+    def test_round_trip(self, review_logs):
+
+        fileobj = io.StringIO()
+        # review logs are consumed lazily from a generator
+        assert write_review_logs(
+            fileobj, (review_log for review_log in review_logs)
+        ) == len(review_logs)
+
+        lines = fileobj.getvalue().splitlines()
+        assert len(lines) == len(review_logs)
+
+        fileobj.seek(0)
+        copied_review_logs = iter_review_logs(fileobj)
+        assert not isinstance(copied_review_logs, list)
+        assert [review_log.to_dict() for review_log in copied_review_logs] == [
+            review_log.to_dict() for review_log in review_logs
+        ]
+
+    def test_raw_tuples(self, review_logs):
+
+        fileobj = io.StringIO()
+        write_review_logs(fileobj, review_logs)
+        # blank lines are skipped
+        fileobj.write("\n")
+        fileobj.seek(0)
+
+        assert list(iter_review_logs(fileobj, raw=True)) == [
+            (
+                review_log.card.card_id,
+                review_log.card.box,
+                review_log.to_dict()["card"]["due"],
+                review_log.rating,
+                review_log.review_datetime.isoformat(),
+                review_log.review_duration,
+            )
+            for review_log in review_logs
+        ]
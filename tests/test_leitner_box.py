@@ -1,9 +1,31 @@
-from leitner_box import Scheduler, Card, Rating, ReviewLog
-from datetime import datetime, timezone
+from leitner_box import Scheduler, Card, Rating, ReviewLog, BoxCalendar
+from datetime import date, datetime, timedelta, timezone
 from zoneinfo import ZoneInfo
 import json
+import pickle
+import random
 import pytest
-from copy import deepcopy
+from copy import copy, deepcopy
+
+
+def loop_next_due(start_datetime, interval, review_datetime):
+    # reference: the day-stepping loop that Scheduler.review_card used to run
+    start_datetime = start_datetime.replace(tzinfo=None)
+    review_datetime = review_datetime.replace(tzinfo=None)
+    begin_datetime = (start_datetime - timedelta(days=1)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    i = 1
+    next_due_date = begin_datetime + (timedelta(days=interval) * i)
+    while next_due_date <= review_datetime:
+        next_due_date = begin_datetime + (timedelta(days=interval) * i)
+        i += 1
+
+    return next_due_date
+
+
+def slot_values(obj):
+    return {name: getattr(obj, name) for name in type(obj).__slots__}
 
 
 class TestLeitnerBox:
@@ -390,13 +412,13 @@ class TestLeitnerBox:
         # card can be serialized and de-serialized while remaining the same
         card_dict = card.to_dict()
         copied_card = Card.from_dict(card_dict)
-        assert vars(card) == vars(copied_card)
+        assert slot_values(card) == slot_values(copied_card)
         assert card.to_dict() == copied_card.to_dict()
 
         # scheduler can be serialized and de-serialized while remaining the same
         scheduler_dict = scheduler.to_dict()
         copied_scheduler = Scheduler.from_dict(scheduler_dict)
-        assert vars(scheduler) == vars(copied_scheduler)
+        assert slot_values(scheduler) == slot_values(copied_scheduler)
         assert scheduler.to_dict() == copied_scheduler.to_dict()
 
         # review the card and perform more tests
@@ -412,7 +434,7 @@ class TestLeitnerBox:
         # the new reviewed card can be serialized and de-serialized while remaining the same
         card_dict = card.to_dict()
         copied_card = Card.from_dict(card_dict)
-        assert vars(card) == vars(copied_card)
+        assert slot_values(card) == slot_values(copied_card)
         assert card.to_dict() == copied_card.to_dict()
 
         # review_log can be serialized and de-serialized while remaining the same
@@ -424,3 +446,486 @@ class TestLeitnerBox:
         assert (
             old_card.to_dict() == Card.from_dict(review_log.to_dict()["card"]).to_dict()
         )
+
+    def test_next_due_matches_day_stepping_loop(self):
+        rng = random.Random(42)
+        tzinfos = [
+            None,
+            timezone.utc,
+            timezone(timedelta(hours=-7)),
+            timezone(timedelta(hours=5, minutes=30)),
+            ZoneInfo("America/Los_Angeles"),
+            ZoneInfo("Europe/London"),
+        ]
+
+        for _ in range(2000):
+            num_boxes = rng.randint(1, 6)
+            box_intervals = [1] + sorted(
+                rng.randint(1, 60) for _ in range(num_boxes - 1)
+            )
+            start_datetime = datetime(2000, 1, 1) + timedelta(
+                seconds=rng.randint(0, 25 * 365 * 86400),
+                microseconds=rng.randint(0, 999999),
+            )
+            review_datetime = start_datetime + timedelta(
+                seconds=rng.randint(-3 * 86400, 4 * 365 * 86400),
+                microseconds=rng.randint(0, 999999),
+            )
+            start_datetime = start_datetime.replace(tzinfo=rng.choice(tzinfos))
+            review_datetime = review_datetime.replace(tzinfo=rng.choice(tzinfos))
+
+            scheduler = Scheduler(
+                box_intervals=box_intervals,
+                start_datetime=start_datetime,
+                on_fail=rng.choice(["first_box", "prev_box"]),
+            )
+            card = Card(box=rng.randint(1, len(box_intervals)))
+            rating = rng.choice([Rating.Fail, Rating.Pass])
+
+            card, _ = scheduler.review_card(card, rating, review_datetime)
+
+            interval = box_intervals[card.box - 1]
+            assert card.due == loop_next_due(start_datetime, interval, review_datetime)
+            assert card.due > review_datetime.replace(tzinfo=None)
+
+    def test_next_due_for_old_scheduler(self):
+        # a scheduler created years ago schedules box 1 cards for the next day
+        scheduler = Scheduler(start_datetime=datetime(2015, 3, 8, 2, 30, 0, 0))
+
+        card = Card()
+        review_datetime = datetime(2024, 11, 3, 1, 30, 0, 0)
+        card, _ = scheduler.review_card(card, Rating.Fail, review_datetime)
+
+        assert card.due == datetime(2024, 11, 4, 0, 0, 0, 0)
+        assert card.due == loop_next_due(scheduler.start_datetime, 1, review_datetime)
+
+        review_datetime = card.due
+        card, _ = scheduler.review_card(card, Rating.Pass, review_datetime)
+
+        assert card.box == 2
+        assert card.due == loop_next_due(scheduler.start_datetime, 2, review_datetime)
+
+    def test_review_cards(self):
+        scheduler = Scheduler(start_datetime=datetime(2024, 1, 1, 14, 30, 0, 0))
+
+        cards = [
+            Card(card_id=1),
+            Card(card_id=2, box=2, due=datetime(2024, 1, 4, 0, 0, 0, 0)),
+            Card(card_id=3, box=3, due=datetime(2024, 1, 2, 0, 0, 0, 0)),
+            Card(card_id=4, box=2, due=datetime(2024, 1, 2, 0, 0, 0, 0)),
+        ]
+        old_cards = deepcopy(cards)
+        ratings = [Rating.Pass, Rating.Pass, Rating.Fail, Rating.Pass]
+        review_datetimes = [
+            datetime(2024, 1, 2, 9, 0, 0, 0),
+            datetime(2024, 1, 2, 9, 0, 0, 0),
+            datetime(2024, 1, 2, 9, 0, 0, 0, timezone.utc),
+            datetime(2024, 1, 3, 9, 0, 0, 0),
+        ]
+        review_durations = [1000, None, 3000, 4000]
+
+        new_cards, review_logs, reviewed = scheduler.review_cards(
+            cards, ratings, review_datetimes, review_durations
+        )
+
+        assert reviewed == [True, False, True, True]
+
+        # the card that is not due is returned unchanged, without a review log
+        assert new_cards[1] is cards[1]
+        assert review_logs[1] is None
+
+        # every other card matches reviewing it on its own
+        for i in [0, 2, 3]:
+            card, review_log = scheduler.review_card(
+                old_cards[i], ratings[i], review_datetimes[i], review_durations[i]
+            )
+            assert new_cards[i].to_dict() == card.to_dict()
+            assert review_logs[i].to_dict() == review_log.to_dict()
+
+        # the input cards are left untouched
+        assert [card.to_dict() for card in cards] == [
+            card.to_dict() for card in old_cards
+        ]
+
+        with pytest.raises(ValueError):
+            scheduler.review_cards(cards, ratings[:2])
+
+    @pytest.mark.parametrize("timezone_", [None, ZoneInfo("Europe/Berlin")])
+    @pytest.mark.parametrize("on_fail", ["first_box", "prev_box"])
+    def test_review_cards_matches_review_card(self, timezone_, on_fail):
+        scheduler = Scheduler(
+            box_intervals=[1, 2, 5, 9],
+            start_datetime=datetime(2024, 3, 1, 14, 30),
+            on_fail=on_fail,
+            timezone=timezone_,
+        )
+        rng = random.Random(5)
+        shared_review_datetime = datetime(2024, 3, 31, 1, 30, tzinfo=timezone.utc)
+
+        cards = []
+        ratings = []
+        review_datetimes = []
+        for card_id in range(500):
+            due = rng.choice([None, datetime(2024, 3, 30, rng.choice([0, 12]))])
+            if due is not None:
+                due += timedelta(days=rng.randint(0, 2))
+            if due is not None and timezone_ is not None:
+                due = due.replace(tzinfo=timezone_)
+            cards.append(Card(card_id=card_id, box=rng.randint(1, 4), due=due))
+            ratings.append(rng.choice([Rating.Fail, Rating.Pass]))
+            review_datetimes.append(
+                rng.choice(
+                    [
+                        shared_review_datetime,
+                        datetime(2024, 3, 31, rng.randint(0, 23), 0),
+                        datetime(
+                            2024, 4, 1, rng.randint(0, 23), 0, tzinfo=timezone.utc
+                        ),
+                    ]
+                )
+            )
+
+        new_cards, review_logs, reviewed = scheduler.review_cards(
+            cards, ratings, review_datetimes
+        )
+
+        assert 0 < sum(reviewed) < len(cards)
+        for i, card in enumerate(cards):
+            try:
+                expected_card, expected_review_log = scheduler.review_card(
+                    card, ratings[i], review_datetimes[i]
+                )
+            except RuntimeError:
+                assert not reviewed[i]
+                assert new_cards[i] is card
+                continue
+
+            assert reviewed[i]
+            assert new_cards[i].to_dict() == expected_card.to_dict()
+            assert new_cards[i].due == expected_card.due
+            assert review_logs[i].to_dict() == expected_review_log.to_dict()
+
+    def test_card_copy(self):
+        card = Card(card_id=1, box=2, due=datetime(2024, 1, 4, 0, 0, 0, 0))
+
+        for copied_card in [card.copy(), copy(card), deepcopy(card)]:
+            assert copied_card is not card
+            assert copied_card.to_dict() == card.to_dict()
+
+            copied_card.box = 3
+            assert card.box == 2
+
+        # the review log and the reviewed card don't share the card that was passed in
+        scheduler = Scheduler(start_datetime=datetime(2024, 1, 1, 14, 30, 0, 0))
+        new_card, review_log = scheduler.review_card(
+            card, Rating.Pass, datetime(2024, 1, 4, 0, 0, 0, 0)
+        )
+        card.box = 1
+
+        assert review_log.card.box == 2
+        assert new_card.box == 3
+
+    def test_slots(self):
+        scheduler = Scheduler()
+        card, review_log = scheduler.review_card(Card(), Rating.Pass)
+
+        for obj in [scheduler, card, review_log]:
+            assert not hasattr(obj, "__dict__")
+
+            # slotted objects can still be pickled, e.g. to send them to other processes
+            copied_obj = pickle.loads(pickle.dumps(obj))
+            assert copied_obj.to_dict() == obj.to_dict()
+
+    def test_serialize_bytes(self):
+        scheduler = Scheduler(
+            box_intervals=[1, 2, 3, 5],
+            start_datetime=datetime(2024, 1, 1, 14, 30, 0, 123456),
+            on_fail="prev_box",
+        )
+
+        # the scheduler round-trips through bytes the same way it does through a dict
+        copied_scheduler = Scheduler.from_bytes(scheduler.to_bytes())
+        assert copied_scheduler.to_dict() == scheduler.to_dict()
+        assert (
+            copied_scheduler.to_dict()
+            == Scheduler.from_dict(scheduler.to_dict()).to_dict()
+        )
+
+        cards = [Card(card_id=1), Card(card_id=-5, box=4)]
+        review_logs = []
+        review_datetimes = [
+            datetime(2024, 1, 1, 14, 35, 0, 1),
+            datetime(2024, 1, 3, 9, 0, 0, 0, timezone.utc),
+            datetime(2024, 1, 5, 9, 0, 0, 0, timezone(timedelta(hours=-8))),
+        ]
+        for i, review_datetime in enumerate(review_datetimes):
+            card, review_log = scheduler.review_card(
+                cards[-1],
+                Rating.Pass if i % 2 else Rating.Fail,
+                review_datetime,
+                review_duration=None if i % 2 else 2500,
+            )
+            cards.append(card)
+            review_logs.append(review_log)
+
+        for card in cards:
+            card_bytes = card.to_bytes()
+            assert len(card_bytes) == 21
+            assert Card.from_bytes(card_bytes).to_dict() == card.to_dict()
+            assert (
+                Card.from_bytes(card_bytes).to_dict()
+                == Card.from_dict(card.to_dict()).to_dict()
+            )
+
+        for review_log in review_logs:
+            review_log_bytes = review_log.to_bytes()
+            copied_review_log = ReviewLog.from_bytes(review_log_bytes)
+            assert len(review_log_bytes) == 42
+            assert copied_review_log.to_dict() == review_log.to_dict()
+            assert (
+                copied_review_log.to_dict()
+                == ReviewLog.from_dict(review_log.to_dict()).to_dict()
+            )
+
+        # many cards can be packed into one contiguous buffer
+        buffer = Card.pack_many(cards)
+        assert len(buffer) == 21 * len(cards)
+        assert [card.to_dict() for card in Card.unpack_many(buffer)] == [
+            card.to_dict() for card in cards
+        ]
+        assert [card.to_dict() for card in Card.unpack_many(memoryview(buffer))] == [
+            card.to_dict() for card in cards
+        ]
+        assert Card.unpack_many(b"") == []
+
+        with pytest.raises(ValueError):
+            Card.unpack_many(buffer[:-1])
+        with pytest.raises(ValueError):
+            Card.from_bytes(buffer)
+        with pytest.raises(ValueError):
+            Scheduler.from_bytes(scheduler.to_bytes()[:-1])
+
+        # due dates that can't be encoded as whole epoch seconds are rejected
+        with pytest.raises(ValueError):
+            Card(card_id=1, due=datetime(2024, 1, 1, 0, 0, 0, 1)).to_bytes()
+        with pytest.raises(ValueError):
+            Card(
+                card_id=1, due=datetime(2024, 1, 1, 0, 0, 0, 1, timezone.utc)
+            ).to_bytes()
+
+    def test_serialize_bytes_with_timezone(self):
+        # the due dates set by a scheduler with a timezone are read back with a fixed utc offset
+        berlin = ZoneInfo("Europe/Berlin")
+        scheduler = Scheduler(start_datetime=datetime(2024, 3, 1), timezone=berlin)
+        card = Card(card_id=1)
+        cards = []
+        review_logs = []
+        review_datetime = datetime(2024, 3, 29, 9, 0, tzinfo=berlin)
+        for _ in range(3):
+            card, review_log = scheduler.review_card(card, Rating.Pass, review_datetime)
+            cards.append(card)
+            review_logs.append(review_log)
+            review_datetime = card.due + timedelta(hours=9)
+
+        for card in cards + [Card(card_id=2, due=datetime(2024, 1, 1))]:
+            copied_card = Card.from_bytes(card.to_bytes())
+            assert copied_card.due == card.due
+            assert copied_card.due.utcoffset() == card.due.utcoffset()
+            assert copied_card.to_dict() == card.to_dict()
+
+        assert [card.to_dict() for card in Card.unpack_many(Card.pack_many(cards))] == [
+            card.to_dict() for card in cards
+        ]
+        for review_log in review_logs:
+            copied_review_log = ReviewLog.from_bytes(review_log.to_bytes())
+            assert copied_review_log.to_dict() == review_log.to_dict()
+
+    def test_box_calendar(self):
+        box_intervals = [1, 2, 7]
+        scheduler = Scheduler(
+            box_intervals=box_intervals, start_datetime=datetime(2024, 1, 1, 14, 30)
+        )
+        calendar = scheduler.box_calendar
+
+        # equivalent schedulers share one calendar
+        assert (
+            Scheduler(
+                box_intervals=[1, 2, 7], start_datetime=datetime(2024, 1, 1, 9, 0)
+            ).box_calendar
+            is calendar
+        )
+        assert BoxCalendar.get((1, 2, 7), datetime(2024, 1, 1)) is calendar
+        assert (
+            Scheduler(
+                box_intervals=[1, 2, 7], start_datetime=datetime(2024, 1, 2, 9, 0)
+            ).box_calendar
+            is not calendar
+        )
+
+        for box, interval in enumerate(box_intervals, start=1):
+            review_days = {
+                loop_next_due(
+                    scheduler.start_datetime,
+                    interval,
+                    datetime(2023, 12, 25) + timedelta(days=i),
+                ).date()
+                for i in range(60)
+            }
+
+            for i in range(60):
+                day = date(2023, 12, 25) + timedelta(days=i)
+                assert calendar.is_review_day(box, day) == (day in review_days)
+
+                after = datetime(2023, 12, 25, 13, 0) + timedelta(days=i)
+                assert calendar.next_due(box, after) == loop_next_due(
+                    scheduler.start_datetime, interval, after
+                )
+
+    def test_forecast(self):
+        scheduler = Scheduler(
+            box_intervals=[1, 2, 7], start_datetime=datetime(2024, 1, 1)
+        )
+        start_datetime = datetime(2024, 1, 3, 8, 0)
+        cards = [
+            Card(card_id=1),
+            Card(card_id=2, box=2, due=datetime(2024, 1, 1)),
+            Card(card_id=3, box=3, due=datetime(2024, 1, 8)),
+            Card(card_id=4, box=2, due=datetime(2024, 1, 5)),
+            Card(card_id=5, box=3, due=datetime(2024, 3, 1)),
+        ]
+
+        # when every review passes or fails, the forecast is what reviewing gives
+        for rating, pass_rate in ((Rating.Pass, 1.0), (Rating.Fail, 0.0)):
+            expected = [[0.0] * 3 for _ in range(30)]
+            for card in cards:
+                review_datetime = max(card.due or start_datetime, start_datetime)
+                while review_datetime.date() < date(2024, 2, 2):
+                    day = (review_datetime.date() - start_datetime.date()).days
+                    expected[day][card.box - 1] += 1
+                    card, _ = scheduler.review_card(card, rating, review_datetime)
+                    review_datetime = card.due
+
+            forecast = scheduler.forecast(
+                cards, days=30, pass_rate=pass_rate, start_datetime=start_datetime
+            )
+            assert forecast == expected
+
+        forecast = scheduler.forecast(
+            cards, days=30, pass_rate=0.8, start_datetime=start_datetime
+        )
+        assert len(forecast) == 30
+        assert all(len(boxes) == 3 for boxes in forecast)
+        # cards 1 and 2 are due on the first day. a fifth of the time, they fail back
+        # to box 1, otherwise card 1 moves up to box 2, which is due the next day
+        assert forecast[0] == [1.0, 1.0, 0.0]
+        assert forecast[1] == pytest.approx([0.4, 0.8, 0.0])
+        monte_carlo = scheduler.forecast(
+            cards,
+            days=30,
+            pass_rate=0.8,
+            start_datetime=start_datetime,
+            num_simulations=2000,
+            seed=42,
+        )
+        assert monte_carlo == scheduler.forecast(
+            cards,
+            days=30,
+            pass_rate=0.8,
+            start_datetime=start_datetime,
+            num_simulations=2000,
+            seed=42,
+        )
+        for day in range(30):
+            assert monte_carlo[day] == pytest.approx(forecast[day], abs=0.1)
+
+        assert scheduler.forecast([], days=3) == [[0.0] * 3] * 3
+
+    def test_timezone(self):
+        new_york = ZoneInfo("America/New_York")
+        scheduler = Scheduler(
+            box_intervals=[1, 2, 7],
+            start_datetime=datetime(2024, 3, 1, 3, 0, tzinfo=timezone.utc),
+            timezone=new_york,
+        )
+        # 3am utc is still Feb 29 in New York
+        assert scheduler.start_datetime == datetime(2024, 2, 29, 22, 0, tzinfo=new_york)
+        naive_scheduler = Scheduler(
+            box_intervals=[1, 2, 7], start_datetime=datetime(2024, 2, 29, 22, 0)
+        )
+
+        # review across the start of daylight saving time on Mar 10 and its end on Nov 3
+        rng = random.Random(8)
+        for start in [datetime(2024, 3, 1), datetime(2024, 10, 25)]:
+            card = naive_card = Card(card_id=1)
+            review_datetime = start.replace(tzinfo=timezone.utc)
+            for _ in range(20):
+                rating = rng.choice([Rating.Fail, Rating.Pass])
+                card, review_log = scheduler.review_card(card, rating, review_datetime)
+                naive_card, _ = naive_scheduler.review_card(
+                    naive_card,
+                    rating,
+                    review_datetime.astimezone(new_york).replace(tzinfo=None),
+                )
+
+                assert review_log.review_datetime == review_datetime
+                assert card.box == naive_card.box
+                # due at local midnight, with the utc offset of that midnight
+                assert card.due.tzinfo is new_york
+                assert card.due.replace(tzinfo=None) == naive_card.due
+                assert card.due == naive_card.due.replace(tzinfo=new_york)
+
+                # a minute before local midnight, the card isn't due yet
+                with pytest.raises(RuntimeError):
+                    scheduler.review_card(
+                        card, Rating.Pass, card.due - timedelta(minutes=1)
+                    )
+
+                review_datetime = card.due.astimezone(timezone.utc) + timedelta(
+                    minutes=rng.randint(0, 2000)
+                )
+
+        # naive datetimes are taken to be in the scheduler's timezone
+        card, _ = scheduler.review_card(
+            Card(card_id=2), Rating.Pass, datetime(2024, 3, 9, 23, 30)
+        )
+        assert card.due == datetime(2024, 3, 11, tzinfo=new_york)
+
+        # on Sep 11 2022, clocks in Santiago skipped from midnight to 1am
+        santiago = ZoneInfo("America/Santiago")
+        santiago_scheduler = Scheduler(
+            start_datetime=datetime(2022, 9, 1), timezone=santiago
+        )
+        card, _ = santiago_scheduler.review_card(
+            Card(card_id=3), Rating.Fail, datetime(2022, 9, 10, 12, 0)
+        )
+        assert card.due == datetime(2022, 9, 11, 4, 0, tzinfo=timezone.utc)
+        assert card.due.replace(tzinfo=None) == datetime(2022, 9, 11, 1, 0)
+
+    def test_timezone_serialization(self):
+        for timezone_ in [ZoneInfo("Europe/Berlin"), timezone.utc]:
+            scheduler = Scheduler(
+                box_intervals=[1, 3, 5],
+                start_datetime=datetime(2024, 6, 1, 23, 30, tzinfo=timezone.utc),
+                timezone=timezone_,
+            )
+
+            for copied_scheduler in [
+                Scheduler.from_dict(json.loads(json.dumps(scheduler.to_dict()))),
+                Scheduler.from_bytes(scheduler.to_bytes()),
+                pickle.loads(pickle.dumps(scheduler)),
+            ]:
+                assert copied_scheduler.timezone == timezone_
+                assert copied_scheduler.start_datetime == scheduler.start_datetime
+                assert copied_scheduler.box_calendar is scheduler.box_calendar
+                assert copied_scheduler.to_dict() == scheduler.to_dict()
+
+        assert "timezone" not in Scheduler().to_dict()
+        assert Scheduler.from_bytes(Scheduler().to_bytes()).timezone is None
+        with pytest.raises(ValueError):
+            Scheduler.from_bytes(scheduler.to_bytes()[:-1])
+
+        fixed_offset_scheduler = Scheduler(timezone=timezone(timedelta(hours=2)))
+        with pytest.raises(ValueError):
+            fixed_offset_scheduler.to_dict()
+        with pytest.raises(ValueError):
+            fixed_offset_scheduler.to_bytes()
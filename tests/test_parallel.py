@@ -0,0 +1,67 @@
+from leitner_box import Scheduler, Card, replay, reschedule_parallel
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+import random
+import pytest
+
+
+def sample_card_ids(num_cards):
+    # card ids spread over a large range, like snowflake ids
+    return random.Random(11).sample(range(10**12), num_cards)
+
+
+class TestParallel:
+    @pytest.mark.parametrize("workers", [1, 2, 3])
+    def test_matches_replay(self, review_history, workers):
+        scheduler = Scheduler(start_datetime=datetime(2024, 1, 1, 14, 30, 0, 0))
+        _, review_logs = review_history(
+            scheduler, sample_card_ids(200), 10, timezones=(timezone.utc,)
+        )
+
+        new_scheduler = Scheduler(
+            box_intervals=[1, 3, 5, 10],
+            start_datetime=scheduler.start_datetime,
+            on_fail="prev_box",
+        )
+        initial_cards = {
+            review_logs[0].card.card_id: Card(
+                card_id=review_logs[0].card.card_id, box=3
+            )
+        }
+
+        cards = reschedule_parallel(
+            new_scheduler, review_logs, workers=workers, initial_cards=initial_cards
+        )
+        expected_cards = sorted(
+            replay(new_scheduler, review_logs, initial_cards=initial_cards),
+            key=lambda card: card.card_id,
+        )
+
+        assert [card.to_dict() for card in cards] == [
+            card.to_dict() for card in expected_cards
+        ]
+
+    def test_timezone(self, review_history):
+        scheduler = Scheduler(
+            start_datetime=datetime(2024, 1, 1, 14, 30, 0, 0),
+            timezone=ZoneInfo("Asia/Kolkata"),
+        )
+        _, review_logs = review_history(
+            scheduler, sample_card_ids(50), 10, timezones=(timezone.utc,)
+        )
+
+        cards = reschedule_parallel(scheduler, review_logs, workers=2)
+        expected_cards = sorted(
+            replay(scheduler, review_logs), key=lambda card: card.card_id
+        )
+
+        assert [card.to_dict() for card in cards] == [
+            card.to_dict() for card in expected_cards
+        ]
+        assert all(card.due.tzinfo == scheduler.timezone for card in cards)
+
+    def test_no_review_logs(self):
+        assert reschedule_parallel(Scheduler(), [], workers=2) == []
+
+        with pytest.raises(ValueError):
+            reschedule_parallel(Scheduler(), [], workers=0)
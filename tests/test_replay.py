@@ -0,0 +1,117 @@
+from leitner_box import (
+    Card,
+    Rating,
+    ReviewLog,
+    Scheduler,
+    replay,
+    iter_review_logs,
+    write_review_logs,
+)
+from datetime import datetime
+from zoneinfo import ZoneInfo
+import io
+import pytest
+
+
+class TestReplay:
+    def test_replay_matches_review_card(self, review_history):
+        scheduler = Scheduler(start_datetime=datetime(2024, 1, 1, 14, 30, 0, 0))
+        cards, review_logs = review_history(scheduler, range(50), 30)
+
+        replayed_cards = list(replay(scheduler, review_logs))
+
+        assert [card.to_dict() for card in replayed_cards] == [
+            card.to_dict() for card in cards.values()
+        ]
+
+    def test_replay_with_timezone(self, review_history):
+        scheduler = Scheduler(
+            start_datetime=datetime(2024, 3, 1, 14, 30, 0, 0),
+            timezone=ZoneInfo("Australia/Sydney"),
+        )
+        cards, review_logs = review_history(scheduler, range(20), 30)
+
+        replayed_cards = list(replay(scheduler, review_logs))
+
+        assert [card.to_dict() for card in replayed_cards] == [
+            card.to_dict() for card in cards.values()
+        ]
+
+    def test_replay_with_new_scheduler(self, review_history):
+        scheduler = Scheduler(start_datetime=datetime(2024, 1, 1, 14, 30, 0, 0))
+        _, review_logs = review_history(scheduler, range(20), 15)
+
+        new_scheduler = Scheduler(
+            box_intervals=[1, 3, 5, 10],
+            start_datetime=scheduler.start_datetime,
+            on_fail="prev_box",
+        )
+        replayed_cards = list(replay(new_scheduler, review_logs))
+
+        # replaying applies the new rules to every review, even ones that would now be early
+        for replayed_card in replayed_cards:
+            box = 1
+            for review_log in review_logs:
+                if review_log.card.card_id != replayed_card.card_id:
+                    continue
+                box = new_scheduler._next_box(box, review_log.rating)
+                due = new_scheduler.box_calendar.next_due(
+                    box, review_log.review_datetime
+                )
+
+            assert replayed_card.box == box
+            assert replayed_card.due == due
+
+    def test_replay_tuples(self, review_history):
+        scheduler = Scheduler(start_datetime=datetime(2024, 1, 1, 14, 30, 0, 0))
+        cards, review_logs = review_history(scheduler, [3, 1, 2], 10)
+
+        fileobj = io.StringIO()
+        write_review_logs(fileobj, review_logs)
+        fileobj.seek(0)
+
+        replayed_cards = list(replay(scheduler, iter_review_logs(fileobj, raw=True)))
+
+        assert [card.to_dict() for card in replayed_cards] == [
+            cards[card_id].to_dict() for card_id in [3, 1, 2]
+        ]
+
+    def test_resume_from_checkpoint(self, review_history):
+        scheduler = Scheduler(start_datetime=datetime(2024, 1, 1, 14, 30, 0, 0))
+        cards, review_logs = review_history(scheduler, range(10), 20)
+
+        # split each card's history at a different point
+        first_logs = []
+        later_logs = []
+        for card_id in range(10):
+            card_logs = [log for log in review_logs if log.card.card_id == card_id]
+            first_logs += card_logs[: card_id + 5]
+            later_logs += card_logs[card_id + 5 :]
+
+        checkpoint = {card.card_id: card for card in replay(scheduler, first_logs)}
+        resumed_cards = list(replay(scheduler, later_logs, initial_cards=checkpoint))
+
+        assert [card.to_dict() for card in resumed_cards] == [
+            card.to_dict() for card in cards.values()
+        ]
+
+        assert list(replay(scheduler, [])) == []
+
+    def test_first_box_out_of_range(self):
+        scheduler = Scheduler(start_datetime=datetime(2024, 1, 1, 14, 30, 0, 0))
+        review_datetime = datetime(2024, 1, 1, 15, 0, 0, 0)
+        num_boxes = len(scheduler.box_intervals)
+
+        for box in [0, num_boxes + 1]:
+            review_logs = [
+                ReviewLog(Card(1, 1), Rating.Pass, review_datetime),
+                ReviewLog(Card(7, box), Rating.Pass, review_datetime),
+            ]
+            with pytest.raises(ValueError, match="card 7"):
+                list(replay(scheduler, review_logs))
+
+            # a card starting from initial_cards doesn't use the box in its first log
+            replayed_cards = replay(
+                scheduler, review_logs, initial_cards={7: Card(7, num_boxes)}
+            )
+            assert [card.box for card in replayed_cards] == [2, num_boxes]
@@ -0,0 +1,135 @@
+from leitner_box import Scheduler, Card, Rating, ReviewSession
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+import random
+import pytest
+
+
+class TestReviewSession:
+    def test_next_card(self):
+        scheduler = Scheduler(start_datetime=datetime(2024, 1, 1))
+        session = ReviewSession(
+            scheduler,
+            [
+                Card(card_id=3, box=2, due=datetime(2024, 1, 3)),
+                Card(card_id=2),
+                Card(card_id=1, box=2, due=datetime(2024, 1, 3)),
+                Card(card_id=4, box=3, due=datetime(2024, 1, 8)),
+            ],
+        )
+        now = datetime(2024, 1, 3, 9, 0)
+
+        order = []
+        while (card := session.next_card(now)) is not None:
+            order.append(card.card_id)
+            new_card, _ = session.review_card(card.card_id, Rating.Pass, now)
+            assert session.get(card.card_id) is new_card
+
+        # cards without a due date come first, then cards by due date and card_id
+        assert order == [2, 1, 3]
+        assert session.num_reviews == 3
+        assert session.next_card(now) is None
+        assert session.get(4).due == datetime(2024, 1, 8)
+        assert len(session) == 4
+
+        with pytest.raises(RuntimeError):
+            session.review_card(1, Rating.Pass, now)
+        with pytest.raises(KeyError):
+            session.review_card(5, Rating.Pass, now)
+
+    def test_timezone(self):
+        berlin = ZoneInfo("Europe/Berlin")
+        scheduler = Scheduler(start_datetime=datetime(2024, 1, 1), timezone=berlin)
+        session = ReviewSession(
+            scheduler,
+            [Card(card_id=1), Card(card_id=2, due=datetime(2024, 1, 2, tzinfo=berlin))],
+        )
+        # 11pm on Jan 1 in utc, midnight on Jan 2 in Berlin
+        now = datetime(2024, 1, 1, 23, 0, tzinfo=timezone.utc)
+
+        order = []
+        while (card := session.next_card(now)) is not None:
+            order.append(card.card_id)
+            new_card, _ = session.review_card(card.card_id, Rating.Pass, now)
+            assert new_card.due.tzinfo is berlin
+
+        assert order == [1, 2]
+        assert session.next_card(now) is None
+
+        # due at midnight in Berlin, whichever timezone now is in
+        due = session.get(1).due
+        assert due == datetime(2024, 1, 4, tzinfo=berlin)
+        assert session.next_card(due - timedelta(minutes=1)) is None
+        assert session.next_card(due.astimezone(timezone.utc)).card_id == 1
+        assert session.next_card(datetime(2024, 1, 4)).card_id == 1
+
+    def test_matches_rescanning(self):
+        rng = random.Random(5)
+        scheduler = Scheduler(start_datetime=datetime(2024, 1, 1))
+        cards = [
+            Card(
+                card_id=card_id,
+                box=rng.randint(1, 3),
+                due=datetime(2024, 1, rng.randint(1, 10)),
+            )
+            for card_id in rng.sample(range(10**6), 500)
+        ]
+        session = ReviewSession(scheduler, cards)
+        deck = {card.card_id: card for card in cards}
+
+        now = datetime(2024, 1, 1, 12, 0)
+        for _ in range(2000):
+            card = session.next_card(now)
+            due = [c for c in deck.values() if c.due <= now]
+            if not due:
+                assert card is None
+                now += timedelta(days=1)
+                continue
+
+            expected = min(due, key=lambda c: (c.due, c.card_id))
+            assert card.card_id == expected.card_id
+
+            rating = rng.choice([Rating.Pass, Rating.Fail])
+            deck[card.card_id], _ = scheduler.review_card(card, rating, now)
+            session.review_card(card.card_id, rating, now)
+
+        assert {card.card_id: card.to_dict() for card in session} == {
+            card_id: card.to_dict() for card_id, card in deck.items()
+        }
+
+    def test_bounded_session(self):
+        scheduler = Scheduler(start_datetime=datetime(2024, 1, 1))
+        cards = [
+            Card(card_id=i, box=2, due=datetime(2024, 1, 1) + timedelta(days=i % 5))
+            for i in range(100)
+        ]
+
+        session = ReviewSession(scheduler, cards, max_cards=10, max_reviews=3)
+        assert len(session) == 10
+        assert sorted(card.card_id for card in session) == list(range(0, 50, 5))
+
+        now = datetime(2024, 1, 1, 9, 0)
+        for _ in range(3):
+            card = session.next_card(now)
+            session.review_card(card.card_id, Rating.Fail, now)
+
+        assert session.next_card(now) is None
+        assert session.num_reviews == 3
+
+    def test_add_and_remove(self):
+        scheduler = Scheduler(start_datetime=datetime(2024, 1, 1))
+        session = ReviewSession(scheduler, [Card(card_id=1), Card(card_id=2)])
+
+        session.remove(1)
+        assert 1 not in session
+        assert session.next_card(datetime(2024, 1, 1)).card_id == 2
+
+        session.add(Card(card_id=0, box=2, due=datetime(2023, 12, 31)))
+        assert session.next_card(datetime(2024, 1, 1)).card_id == 2
+        session.review_card(2, Rating.Pass, datetime(2024, 1, 1))
+        assert session.next_card(datetime(2024, 1, 1)).card_id == 0
+
+        with pytest.raises(ValueError):
+            session.add(Card(card_id=0))
+        with pytest.raises(ValueError):
+            ReviewSession(scheduler, [Card(card_id=1), Card(card_id=1)])
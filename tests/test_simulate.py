@@ -0,0 +1,128 @@
+from leitner_box import Scheduler, Card, Rating, simulate, simulate_grid
+from leitner_box.leitner_box import _binomial
+from datetime import datetime, timedelta
+import random
+import statistics
+import pytest
+
+
+def review_every_card(scheduler, num_cards, days, new_cards_per_day, rating):
+    # reviews each card on the day it's due with Scheduler.review_card
+    start_datetime = scheduler.start_datetime
+    end_datetime = start_datetime.replace(hour=0, minute=0) + timedelta(days=days)
+    reviews = [[0] * len(scheduler.box_intervals) for _ in range(days)]
+    box_counts = [0] * len(scheduler.box_intervals)
+    for i in range(num_cards):
+        card = Card(card_id=i)
+        review_datetime = start_datetime + timedelta(days=i // new_cards_per_day)
+        while review_datetime < end_datetime:
+            reviews[(review_datetime - start_datetime).days][card.box - 1] += 1
+            card, _ = scheduler.review_card(card, rating, review_datetime)
+            review_datetime = max(card.due, start_datetime)
+        if i // new_cards_per_day < days:
+            box_counts[card.box - 1] += 1
+
+    return reviews, box_counts
+
+
+class TestSimulate:
+    @pytest.mark.parametrize("on_fail", ["first_box", "prev_box"])
+    @pytest.mark.parametrize(
+        "rating, recall_probabilities",
+        [(Rating.Pass, [1.0, 1.0, 1.0, 1.0]), (Rating.Fail, lambda box: 0.0)],
+    )
+    def test_matches_review_card(self, on_fail, rating, recall_probabilities):
+        scheduler = Scheduler(
+            box_intervals=[1, 2, 5, 9],
+            start_datetime=datetime(2024, 1, 1),
+            on_fail=on_fail,
+        )
+
+        result = simulate(
+            scheduler,
+            num_cards=20,
+            days=40,
+            recall_probabilities=recall_probabilities,
+            new_cards_per_day=3,
+            seed=1,
+        )
+        reviews, box_counts = review_every_card(scheduler, 20, 40, 3, rating)
+
+        assert result.reviews == reviews
+        assert result.box_counts == box_counts
+        assert result.total_reviews == sum(map(sum, reviews))
+        assert result.retention == (1.0 if rating == Rating.Pass else 0.0)
+
+    def test_random_recall(self):
+        scheduler = Scheduler(
+            box_intervals=[1, 2, 7], start_datetime=datetime(2024, 1, 1)
+        )
+
+        result = simulate(
+            scheduler, 100_000, 365, [0.8, 0.85, 0.9], new_cards_per_day=1000, seed=3
+        )
+        assert sum(result.box_counts) == 100_000
+        assert result.reviews_per_day[0] == 1000
+        assert result.max_daily_reviews == max(result.reviews_per_day)
+        assert 0.8 < result.retention < 0.9
+        for day in range(365):
+            for box in range(3):
+                assert 0 <= result.passes[day][box] <= result.reviews[day][box]
+
+        again = simulate(
+            scheduler, 100_000, 365, [0.8, 0.85, 0.9], new_cards_per_day=1000, seed=3
+        )
+        assert again.reviews == result.reviews
+        assert again.passes == result.passes
+
+    @pytest.mark.parametrize(
+        "n, p", [(20, 0.3), (50, 0.95), (1000, 0.5), (1_000_000, 0.85)]
+    )
+    def test_binomial_fallback(self, n, p):
+        # the sampler used before python 3.12, whose random.Random has no binomialvariate
+        class OnlyRandom:
+            random = random.Random(7).random
+
+        samples = [_binomial(OnlyRandom(), n, p) for _ in range(5000)]
+
+        assert all(0 <= sample <= n for sample in samples)
+        # the sample mean and variance are within a few standard errors of the distribution's
+        variance = n * p * (1 - p)
+        assert abs(statistics.mean(samples) - n * p) < 5 * (variance / 5000) ** 0.5
+        assert abs(statistics.variance(samples) / variance - 1) < 0.1
+
+    def test_invalid_recall_probabilities(self):
+        scheduler = Scheduler(box_intervals=[1, 2, 7])
+
+        with pytest.raises(ValueError):
+            simulate(scheduler, 10, 10, [0.9, 0.9])
+
+        with pytest.raises(ValueError):
+            simulate(scheduler, 10, 10, lambda box: 1.5)
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_simulate_grid(self, workers):
+        schedulers = [
+            Scheduler(
+                box_intervals=box_intervals,
+                start_datetime=datetime(2024, 1, 1),
+                on_fail=on_fail,
+            )
+            for box_intervals in ([1, 2, 7], [1, 3, 5, 10])
+            for on_fail in ("first_box", "prev_box")
+        ]
+        recall_probabilities = [0.7, 0.8, 0.9, 0.95]
+
+        results = simulate_grid(
+            schedulers, 5000, 60, recall_probabilities, seed=7, workers=workers
+        )
+
+        assert len(results) == 4
+        for scheduler, result in zip(schedulers, results):
+            expected = simulate(scheduler, 5000, 60, recall_probabilities, seed=7)
+            assert result.scheduler.to_dict() == scheduler.to_dict()
+            assert result.reviews == expected.reviews
+            assert result.passes == expected.passes
+
+        with pytest.raises(ValueError):
+            simulate_grid(schedulers, 10, 10, recall_probabilities, workers=0)
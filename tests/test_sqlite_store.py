@@ -0,0 +1,158 @@
+from leitner_box import Scheduler, Card, Rating, SQLiteStore
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+import sqlite3
+import pytest
+
+
+class TestSQLiteStore:
+    def test_upsert_and_read(self, tmp_path):
+        path = tmp_path / "cards.db"
+        cards = [
+            Card(card_id=i, box=i % 3 + 1, due=datetime(2024, 1, 1 + i % 5))
+            for i in range(100)
+        ]
+        cards.append(Card(card_id=100))
+
+        with SQLiteStore(path) as store:
+            store.upsert_cards(cards)
+            store.upsert_cards([Card(card_id=0, box=3, due=datetime(2024, 2, 1))])
+
+            assert len(store) == 101
+            assert store.get(0).to_dict() == {
+                "card_id": 0,
+                "box": 3,
+                "due": "2024-02-01T00:00:00",
+            }
+            assert store.get(100).due is None
+            with pytest.raises(KeyError):
+                store.get(101)
+
+            due_cards = store.due_cards(datetime(2024, 1, 2, 12, 0))
+            # cards without a due date come first, then by due date and card_id
+            assert [card.card_id for card in due_cards] == [100] + sorted(
+                (i for i in range(1, 100) if i % 5 < 2), key=lambda i: (i % 5, i)
+            )
+            assert len(store.due_cards(datetime(2024, 1, 2), limit=5)) == 5
+
+            with pytest.raises(ValueError):
+                store.upsert_cards(
+                    [Card(card_id=1, due=datetime(2024, 1, 1, tzinfo=timezone.utc))]
+                )
+
+        with sqlite3.connect(path) as connection:
+            assert connection.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+
+        with SQLiteStore(path) as store:
+            assert len(store) == 101
+
+    def test_review_and_persist(self, tmp_path):
+        path = tmp_path / "cards.db"
+        scheduler = Scheduler(start_datetime=datetime(2024, 1, 1))
+
+        review_logs = []
+        with SQLiteStore(path, batch_size=7) as store:
+            for card_id in range(10):
+                card = Card(card_id=card_id)
+                review_datetime = datetime(2024, 1, 1, 9, 0, tzinfo=timezone.utc)
+                for i in range(5):
+                    rating = Rating.Fail if (card_id + i) % 3 == 0 else Rating.Pass
+                    card, review_log = store.review_and_persist(
+                        scheduler, card, rating, review_datetime, review_duration=i
+                    )
+                    review_logs.append(review_log)
+                    review_datetime = card.due + timedelta(hours=10)
+                    if card_id == 0:
+                        review_datetime = review_datetime.astimezone(
+                            ZoneInfo("Asia/Tokyo")
+                        )
+
+            # reads see buffered reviews
+            assert store.get(9).to_dict() == card.to_dict()
+
+            with pytest.raises(RuntimeError):
+                store.review_and_persist(
+                    scheduler, card, Rating.Pass, datetime(2024, 1, 1)
+                )
+
+        with SQLiteStore(path) as store:
+            assert len(store) == 10
+            assert store.get(9).to_dict() == card.to_dict()
+
+            # named timezones are read back as fixed utc offsets
+            stored_review_logs = list(store.iter_review_logs())
+            assert [review_log.to_dict() for review_log in stored_review_logs] == [
+                review_log.to_dict() for review_log in review_logs
+            ]
+            assert [
+                review_log.review_datetime
+                for review_log in store.iter_review_logs(card_id=0)
+            ] == [review_log.review_datetime for review_log in review_logs[:5]]
+
+    def test_invalid_batch_size(self, tmp_path):
+        with pytest.raises(ValueError):
+            SQLiteStore(tmp_path / "cards.db", batch_size=0)
+
+    def test_timezone(self, tmp_path):
+        path = tmp_path / "cards.db"
+        berlin = ZoneInfo("Europe/Berlin")
+        scheduler = Scheduler(start_datetime=datetime(2024, 3, 1), timezone=berlin)
+
+        cards = {}
+        review_logs = []
+        with SQLiteStore(path, batch_size=3, timezone=berlin) as store:
+            # the reviews cross the start of daylight saving time on March 31st
+            for card_id in range(5):
+                card = Card(card_id=card_id)
+                review_datetime = datetime(2024, 3, 25, 9, 0, tzinfo=berlin)
+                for _ in range(4):
+                    card, review_log = store.review_and_persist(
+                        scheduler, card, Rating.Pass, review_datetime
+                    )
+                    review_logs.append(review_log)
+                    review_datetime = card.due + timedelta(hours=card_id)
+                cards[card_id] = card
+
+            now = datetime(2024, 4, 2, tzinfo=berlin)
+            assert [card.card_id for card in store.due_cards(now)] == [
+                card_id for card_id, card in cards.items() if card.due <= now
+            ]
+            assert store.due_cards(now.replace(tzinfo=None)) == store.due_cards(now)
+
+        with SQLiteStore(path, timezone=berlin) as store:
+            for card_id, card in cards.items():
+                stored_card = store.get(card_id)
+                assert stored_card.due == card.due
+                assert stored_card.due.tzinfo is berlin
+                assert stored_card.to_dict() == card.to_dict()
+
+            assert [
+                review_log.card.to_dict() for review_log in store.iter_review_logs()
+            ] == [review_log.card.to_dict() for review_log in review_logs]
+
+        with pytest.raises(ValueError):
+            SQLiteStore(path)
+        with pytest.raises(ValueError):
+            SQLiteStore(path, timezone=ZoneInfo("Asia/Tokyo"))
+
+    def test_mismatched_scheduler(self, tmp_path):
+        berlin = ZoneInfo("Europe/Berlin")
+        card = Card(card_id=0)
+        review_datetime = datetime(2024, 1, 1, 9, 0, tzinfo=berlin)
+
+        with SQLiteStore(tmp_path / "naive.db") as store:
+            with pytest.raises(ValueError):
+                store.review_and_persist(
+                    Scheduler(timezone=berlin), card, Rating.Pass, review_datetime
+                )
+            assert len(store) == 0
+            assert list(store.iter_review_logs()) == []
+
+        with SQLiteStore(tmp_path / "aware.db", timezone=berlin) as store:
+            with pytest.raises(ValueError):
+                store.review_and_persist(
+                    Scheduler(), card, Rating.Pass, review_datetime
+                )
+            with pytest.raises(ValueError):
+                store.upsert_cards([Card(card_id=0, due=datetime(2024, 1, 1))])
+            assert len(store) == 0
@@ -0,0 +1,131 @@
+from leitner_box import (
+    Scheduler,
+    Card,
+    Rating,
+    ReviewLog,
+    ReviewStats,
+    compute_stats,
+    iter_review_logs,
+    write_review_logs,
+)
+from datetime import date, datetime, timezone
+import io
+import json
+import pickle
+
+import pytest
+
+
+class TestReviewStats:
+    def test_aggregates(self):
+        due = datetime(2024, 1, 1, 0, 0, 0, 0)
+        review_logs = [
+            ReviewLog(Card(1, 1), Rating.Pass, datetime(2024, 1, 1, 9), 1000),
+            ReviewLog(Card(2, 1), Rating.Fail, datetime(2024, 1, 1, 23), 3000),
+            ReviewLog(Card(1, 2, due), Rating.Pass, datetime(2024, 1, 3, 1), None),
+        ]
+
+        stats = compute_stats(review_logs)
+
+        assert stats.num_reviews == 3
+        assert stats.box_reviews == {1: 2, 2: 1}
+        assert stats.pass_rates == {1: 0.5, 2: 1.0}
+        assert stats.daily_reviews == {date(2024, 1, 1): 2, date(2024, 1, 3): 1}
+        assert stats.mean_review_duration == 2000
+        assert ReviewStats().mean_review_duration is None
+
+    def test_failed_update_leaves_stats_unchanged(self):
+        stats = compute_stats(
+            [ReviewLog(Card(1, 1), Rating.Pass, datetime(2024, 1, 1, 9), 1000)]
+        )
+        expected = stats.to_dict()
+
+        def review_logs():
+            yield ReviewLog(Card(2, 1), Rating.Fail, datetime(2024, 1, 1, 23), 3000)
+            yield (3, 2, None, Rating.Pass, "2024-01-02T09:00:00", 500)
+            raise OSError("the review history is unreadable")
+
+        with pytest.raises(OSError):
+            stats.update(review_logs())
+        assert stats.to_dict() == expected
+
+        # the ISO 8601 review datetimes are only parsed after the loop
+        with pytest.raises(ValueError):
+            stats.update(
+                [
+                    ReviewLog(Card(2, 1), Rating.Fail, datetime(2024, 1, 1, 23)),
+                    (3, 2, None, Rating.Pass, "not a datetime", None),
+                ]
+            )
+        assert stats.to_dict() == expected
+
+    def test_transition_matrix(self):
+        review_logs = [
+            ReviewLog(Card(1, 1), Rating.Pass, datetime(2024, 1, 1)),
+            ReviewLog(Card(2, 3), Rating.Pass, datetime(2024, 1, 1)),
+            ReviewLog(Card(3, 3), Rating.Fail, datetime(2024, 1, 1)),
+            ReviewLog(Card(4, 2), Rating.Fail, datetime(2024, 1, 1)),
+        ]
+        stats = compute_stats(review_logs)
+
+        assert stats.transition_matrix(Scheduler()) == [
+            [0, 1, 0],
+            [1, 0, 0],
+            [1, 0, 1],
+        ]
+        assert stats.transition_matrix(Scheduler(on_fail="prev_box")) == [
+            [0, 1, 0],
+            [1, 0, 0],
+            [0, 1, 1],
+        ]
+
+        with pytest.raises(ValueError):
+            stats.transition_matrix(Scheduler(box_intervals=[1, 2]))
+
+    def test_raw_streams_match_review_logs(self, review_history):
+        _, review_logs = review_history(
+            Scheduler(), range(30), 20, review_durations=True
+        )
+        expected = compute_stats(review_logs)
+
+        review_logs_file = io.StringIO()
+        write_review_logs(review_logs_file, review_logs)
+        lines = review_logs_file.getvalue().splitlines()
+
+        assert compute_stats(json.loads(line) for line in lines) == expected
+        review_logs_file.seek(0)
+        assert compute_stats(iter_review_logs(review_logs_file, raw=True)) == expected
+
+    def test_merge_shards(self, review_history):
+        _, review_logs = review_history(
+            Scheduler(), range(30), 20, review_durations=True
+        )
+        expected = compute_stats(review_logs)
+
+        stats = ReviewStats()
+        for shard in range(3):
+            shard_stats = compute_stats(review_logs[shard::3])
+            stats.merge(pickle.loads(pickle.dumps(shard_stats)))
+
+        assert stats == expected
+        assert stats.num_reviews == len(review_logs)
+
+        stats = ReviewStats()
+        stats.update(review_logs[:100])
+        stats.update(review_logs[100:])
+        assert stats == expected
+
+    def test_serialize(self, review_history):
+        _, review_logs = review_history(
+            Scheduler(), range(10), 10, review_durations=True
+        )
+        review_datetime = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        review_logs.append(ReviewLog(Card(1, 1), Rating.Pass, review_datetime))
+        stats = compute_stats(review_logs)
+
+        stats_dict = json.loads(json.dumps(stats.to_dict()))
+        copied_stats = ReviewStats.from_dict(stats_dict)
+
+        assert copied_stats == stats
+        assert copied_stats.pass_rates == stats.pass_rates
+        assert copied_stats.daily_reviews == stats.daily_reviews
@@ -0,0 +1,128 @@
+from leitner_box import Scheduler, Card, Rating
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+import random
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from leitner_box.vectorized import (
+    NO_DUE,
+    datetimes_to_days,
+    dues_to_days,
+    days_to_datetimes,
+    next_boxes,
+    review,
+)
+
+
+class TestVectorized:
+    @pytest.mark.parametrize("on_fail", ["first_box", "prev_box"])
+    @pytest.mark.parametrize("timezone_", [None, ZoneInfo("America/Los_Angeles")])
+    def test_review_matches_scheduler(self, on_fail, timezone_):
+        rng = random.Random(7)
+        scheduler = Scheduler(
+            box_intervals=[1, 2, 5, 9],
+            start_datetime=datetime(2021, 6, 3, 17, 45, 0, 0),
+            on_fail=on_fail,
+            timezone=timezone_,
+        )
+        # with a timezone, due dates are local midnights and reviews are recorded in utc,
+        # so a review's local day can differ from its utc day
+        first_due = datetime(2024, 1, 1, tzinfo=timezone_)
+        first_review = datetime(
+            2024, 1, 1, tzinfo=None if timezone_ is None else timezone.utc
+        )
+
+        cards = []
+        ratings = []
+        review_datetimes = []
+        for card_id in range(5000):
+            due = None
+            if rng.random() < 0.8:
+                due = first_due + timedelta(days=rng.randint(0, 60))
+            cards.append(Card(card_id=card_id, box=rng.randint(1, 4), due=due))
+            ratings.append(rng.choice([Rating.Fail, Rating.Pass]))
+            review_datetimes.append(
+                first_review + timedelta(seconds=rng.randint(0, 60 * 86400))
+            )
+
+        new_boxes, new_dues, reviewed = review(
+            scheduler,
+            np.array([card.box for card in cards]),
+            dues_to_days((card.due for card in cards), scheduler),
+            np.array(ratings),
+            datetimes_to_days(review_datetimes, scheduler),
+        )
+        new_due_datetimes = days_to_datetimes(new_dues, scheduler)
+
+        for i, card in enumerate(cards):
+            try:
+                new_card, _ = scheduler.review_card(
+                    card, ratings[i], review_datetimes[i]
+                )
+            except RuntimeError:
+                assert not reviewed[i]
+                assert new_boxes[i] == card.box
+                assert new_due_datetimes[i] == card.due
+            else:
+                assert reviewed[i]
+                assert new_boxes[i] == new_card.box
+                assert new_due_datetimes[i] == new_card.due
+
+    def test_next_boxes(self):
+        scheduler = Scheduler(box_intervals=[1, 2, 7], on_fail="prev_box")
+
+        boxes = np.array([1, 2, 3, 1, 2, 3])
+        ratings = np.array([0, 0, 0, 1, 1, 1])
+
+        assert next_boxes(scheduler, boxes, ratings).tolist() == [1, 1, 2, 2, 3, 3]
+
+    def test_day_conversion(self):
+        datetimes = [datetime(1970, 1, 1), None, datetime(1969, 12, 31, 23, 59)]
+
+        days = datetimes_to_days(datetimes)
+
+        assert days.dtype == np.int64
+        assert days.tolist() == [0, NO_DUE, -1]
+        assert days_to_datetimes(days) == [
+            datetime(1970, 1, 1),
+            None,
+            datetime(1969, 12, 31),
+        ]
+
+    def test_day_conversion_with_timezone(self):
+        # failing a new card at 9pm on Jan 2 in Los Angeles, which is Jan 3 in utc
+        scheduler = Scheduler(
+            start_datetime=datetime(2024, 1, 1, 9, 0),
+            timezone=ZoneInfo("America/Los_Angeles"),
+        )
+        review_datetime = datetime(2024, 1, 3, 5, 0, tzinfo=timezone.utc)
+        card, _ = scheduler.review_card(Card(), Rating.Fail, review_datetime)
+
+        review_days = datetimes_to_days([review_datetime], scheduler)
+        _, new_dues, _ = review(
+            scheduler, np.array([1]), np.array([NO_DUE]), np.array([0]), review_days
+        )
+
+        assert days_to_datetimes(new_dues, scheduler) == [card.due]
+
+    @pytest.mark.parametrize("timezone_", [None, ZoneInfo("America/Sao_Paulo")])
+    def test_dues_must_be_at_the_beginning_of_a_day(self, timezone_):
+        scheduler = Scheduler(start_datetime=datetime(2018, 10, 1), timezone=timezone_)
+        # the scalar scheduler doesn't review a card due at noon on the morning of its due
+        # day, which can't be told apart from a review after noon by day numbers
+        card = Card(box=2, due=datetime(2024, 1, 3, 12, tzinfo=timezone_))
+        with pytest.raises(RuntimeError):
+            scheduler.review_card(card, Rating.Pass, datetime(2024, 1, 3, 9))
+        with pytest.raises(ValueError):
+            dues_to_days([card.due], scheduler)
+
+        # clocks in Sao Paulo skipped midnight on Nov 4 2018, so that day began at 1am
+        midnight = datetime(2018, 11, 4, 1 if timezone_ else 0, tzinfo=timezone_)
+        dues = [None, datetime(2024, 1, 3, tzinfo=timezone_), midnight]
+        assert dues_to_days(dues, scheduler).tolist() == [
+            NO_DUE,
+            datetimes_to_days([dues[1]], scheduler)[0],
+            datetimes_to_days([midnight], scheduler)[0],
+        ]